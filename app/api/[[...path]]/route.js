@@ -1,36 +1,81 @@
 import { NextResponse } from 'next/server';
-import { connectToDatabase } from '@/lib/mongodb';
+import { connectToDatabase, SESSION_TTL_SECONDS } from '@/lib/mongodb';
 import { v4 as uuidv4 } from 'uuid';
-import bcrypt from 'bcryptjs';
+import { createHash } from 'crypto';
+import { hashPassword, verifyPassword, needsRehash } from '@/lib/password';
 import { GoogleGenAI } from '@google/genai';
+import { runStageGraph } from '@/lib/scheduler';
+import { createLruCache } from '@/lib/lru';
+import { createJobQueue, LeaseLostError } from '@/lib/jobs';
+import { publishBriefEvent, subscribeBriefEvents, replayBriefEvents, isTerminalBriefEvent } from '@/lib/brief-events';
+import { geminiCacheKey, getCachedResponse, setCachedResponse, invalidateCachedResponses, getGeminiCacheStats } from '@/lib/gemini-cache';
+import { createStubGenAI } from '@/lib/model-backend';
+import { createModelRouter, perModelLimits, isRateLimitError } from '@/lib/model-router';
+import { keysetPage, clampLimit } from '@/lib/keyset';
+import { historyPush, appendBriefHistory, recordRegenerationDiff, listBriefHistory, getRegenerationDiff, deleteBriefHistory, HISTORY_COLLECTIONS } from '@/lib/brief-history';
+import { parseNdjson, parseCsv, validateImportRow } from '@/lib/brief-import';
+import { metrics, tokenUsage, renderMetrics } from '@/lib/metrics';
+import { READINESS_SCHEMA, READINESS_FACTORS, READINESS_INPUTS, READINESS_PROJECTION, computeReadinessScore } from '@/lib/readiness';
+import { EXPORT_FORMATS, EXPORT_PROJECTION, renderExport, exportDocument, exportFilename, createZipWriter } from '@/lib/export';
+
+// 'sdk' (default) calls Gemini; 'stub' answers locally for offline benchmarking
+const MODEL_BACKEND = process.env.GEMINI_BACKEND || 'sdk';
 
 let _genAI = null;
 function getGenAI() {
   if (!_genAI) {
-    _genAI = new GoogleGenAI({ apiKey: process.env.GEMINI_API_KEY });
+    _genAI = MODEL_BACKEND === 'stub' ? createStubGenAI() : new GoogleGenAI({ apiKey: process.env.GEMINI_API_KEY });
   }
   return _genAI;
 }
 
+function getModelBackendStats() {
+  return { backend: MODEL_BACKEND, ...(_genAI?.stats?.() || {}) };
+}
+
 // ========== AUTH HELPERS ==========
+const sessionCache = createLruCache({
+  max: parseInt(process.env.SESSION_CACHE_SIZE || '1000', 10),
+  ttlMs: parseInt(process.env.SESSION_CACHE_TTL_MS || '30000', 10),
+});
+const sessionCacheStats = { hits: 0, misses: 0, invalidations: 0 };
+
+function newSession(userId) {
+  return { id: uuidv4(), user_id: userId, token: uuidv4(), created_at: new Date().toISOString(), expires_at: new Date(Date.now() + SESSION_TTL_SECONDS * 1000) };
+}
+
 async function getUser(request) {
   try {
     const token = request.cookies.get('session_token')?.value;
     if (!token) return null;
+    const cached = sessionCache.get(token);
+    if (cached && cached.expiresAt > Date.now()) { sessionCacheStats.hits++; return cached.user; }
+    sessionCacheStats.misses++;
     const db = await connectToDatabase();
-    const session = await db.collection('sessions').findOne({ token });
+    // Session and user in one round trip
+    const [session] = await db.collection('sessions').aggregate([
+      { $match: { token, expires_at: { $gt: new Date() } } },
+      { $limit: 1 },
+      { $lookup: { from: 'users', localField: 'user_id', foreignField: 'id', as: 'user' } },
+      { $unwind: '$user' },
+      { $project: { _id: 0, expires_at: 1, user: 1 } },
+      { $unset: 'user.password' },
+    ]).toArray();
     if (!session) return null;
-    const user = await db.collection('users').findOne({ id: session.user_id });
-    if (!user) return null;
-    const { password, ...safeUser } = user;
-    return safeUser;
+    sessionCache.set(token, { user: session.user, expiresAt: new Date(session.expires_at).getTime() });
+    return session.user;
   } catch { return null; }
 }
 
+function getSessionCacheStats() {
+  const lookups = sessionCacheStats.hits + sessionCacheStats.misses;
+  return { ...sessionCacheStats, hit_rate: lookups > 0 ? sessionCacheStats.hits / lookups : 0, entries: sessionCache.size };
+}
+
 function corsHeaders() {
   return {
     'Access-Control-Allow-Origin': '*',
-    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, DELETE, OPTIONS',
     'Access-Control-Allow-Headers': 'Content-Type, Authorization',
     'Access-Control-Allow-Credentials': 'true',
   };
@@ -39,41 +84,82 @@ function corsHeaders() {
 // ========== GEMINI AI ==========
 const MODELS = ['gemini-2.5-flash', 'gemini-2.0-flash', 'gemini-2.0-flash-lite'];
 
-async function callGemini(prompt, retries = 3) {
-  let lastError = null;
-  for (const model of MODELS) {
-    for (let attempt = 0; attempt < retries; attempt++) {
+const GEMINI_CONFIG = { responseMimeType: 'application/json', temperature: 0.7 };
+const RETRY_BASE_MS = parseInt(process.env.GEMINI_RETRY_BASE_MS || '1000', 10);
+
+// Stub responses are cached under their own keys so they never answer real calls
+const cacheModelName = model => (MODEL_BACKEND === 'sdk' ? model : `${MODEL_BACKEND}:${model}`);
+
+// Shared by every request, so one caller's 429s steer the others away from
+// that model instead of each sleeping through the same backoff
+const modelRouter = createModelRouter({
+  models: MODELS,
+  rpm: perModelLimits(process.env.GEMINI_RPM, MODELS),
+  maxInFlight: parseInt(process.env.GEMINI_MAX_IN_FLIGHT || '8', 10),
+  retryBaseMs: RETRY_BASE_MS,
+  failureThreshold: parseInt(process.env.GEMINI_BREAKER_THRESHOLD || '2', 10),
+  cooldownMs: parseInt(process.env.GEMINI_BREAKER_COOLDOWN_MS || '30000', 10),
+});
+
+// cache: 'use' reads and writes the response cache, 'refresh' skips the read
+// but stores the fresh response, 'bypass' skips the cache entirely
+// `onCall` receives one summary per call: model, attempts, cache hit, sizes,
+// tokens, wall time (see stage_metrics in runFullPipeline) and the call's cache keys
+async function callGemini(prompt, { retries = 3, cache = 'use', signal, onCall } = {}) {
+  const started = performance.now();
+  const promptBytes = Buffer.byteLength(prompt);
+  const elapsed = () => (performance.now() - started) / 1000;
+  const keys = MODELS.map(model => geminiCacheKey(cacheModelName(model), prompt, GEMINI_CONFIG));
+  if (cache === 'use') {
+    const hit = await getCachedResponse(keys);
+    if (hit) {
+      metrics.geminiCalls.observe({ outcome: 'cache_hit' }, elapsed());
+      onCall?.({ model: hit.model, cache_hit: true, attempts: 0, prompt_bytes: promptBytes, response_bytes: 0, tokens: null, duration_ms: Math.round(elapsed() * 1000), cache_keys: keys });
+      return hit.value;
+    }
+  }
+  let attempts = 0;
+  let result;
+  try {
+    result = await modelRouter.call(async model => {
+      attempts++;
+      const attemptStarted = performance.now();
+      const observe = outcome => metrics.geminiAttempts.observe({ model, outcome }, (performance.now() - attemptStarted) / 1000);
+      metrics.geminiPromptBytes.observe({ model }, promptBytes);
       try {
         const response = await getGenAI().models.generateContent({
           model,
           contents: prompt,
-          config: {
-            responseMimeType: 'application/json',
-            temperature: 0.7,
-          },
+          config: GEMINI_CONFIG,
         });
-        const text = response.text;
-        return JSON.parse(text);
+        const parsed = JSON.parse(response.text);
+        observe('success');
+        const responseBytes = Buffer.byteLength(response.text);
+        metrics.geminiResponseBytes.observe({ model }, responseBytes);
+        const tokens = tokenUsage(response.usageMetadata);
+        if (tokens) Object.entries(tokens).forEach(([type, n]) => metrics.geminiTokens.inc({ model, type }, n));
+        return { model, parsed, responseBytes, tokens };
       } catch (error) {
-        lastError = error;
-        const errMsg = error?.message || String(error);
-        const is429 = errMsg.includes('429') || errMsg.includes('RESOURCE_EXHAUSTED') || errMsg.includes('quota');
-        if (is429 && attempt < retries - 1) {
-          const delay = Math.pow(2, attempt) * 1000 + Math.random() * 500;
-          console.log(`Rate limited on ${model}, retrying in ${Math.round(delay)}ms (attempt ${attempt + 1}/${retries})`);
-          await new Promise(r => setTimeout(r, delay));
-          continue;
-        }
-        if (is429) break; // Try next model
-        throw error; // Non-rate-limit error, throw immediately
+        observe(isRateLimitError(error) ? 'rate_limited' : 'error');
+        throw error;
       }
-    }
+    }, { retries, signal });
+  } catch (error) {
+    metrics.geminiCalls.observe({ outcome: 'error' }, elapsed());
+    metrics.geminiRetries.inc({}, attempts - 1);
+    onCall?.({ model: null, cache_hit: false, attempts, prompt_bytes: promptBytes, response_bytes: 0, tokens: null, duration_ms: Math.round(elapsed() * 1000), error: true });
+    throw error;
   }
-  throw lastError || new Error('All AI models exhausted. Please try again later.');
+  const { model, parsed, responseBytes, tokens } = result;
+  if (cache !== 'bypass') await setCachedResponse(keys[MODELS.indexOf(model)], cacheModelName(model), parsed);
+  metrics.geminiCalls.observe({ outcome: 'success' }, elapsed());
+  metrics.geminiRetries.inc({}, attempts - 1);
+  onCall?.({ model, cache_hit: false, attempts, prompt_bytes: promptBytes, response_bytes: responseBytes, tokens, duration_ms: Math.round(elapsed() * 1000), cache_keys: keys });
+  return parsed;
 }
 
 // ========== AI PIPELINE STAGES ==========
-async function stage1ExtractEntities(brief) {
+async function stage1ExtractEntities(brief, ai = {}) {
   const prompt = `You are a product analysis AI. Analyze this product decision and extract structured entities.
 
 Product Decision:
@@ -96,7 +182,7 @@ Return a JSON object with exactly this structure:
   "metrics": [{"name": "metric name", "type": "success", "description": "description"}],
   "rollout_hints": ["hint1", "hint2"]
 }`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
 function stage2BuildGraph(entities, brief) {
@@ -136,7 +222,7 @@ function stage2BuildGraph(entities, brief) {
   return { nodes, edges };
 }
 
-async function stage3GeneratePRD(entities, graph, brief) {
+async function stage3GeneratePRD(entities, graph, brief, ai = {}) {
   const prompt = `Generate a comprehensive PRD for this product decision. Use markdown formatting.
 
 Feature: ${brief.title}
@@ -162,10 +248,10 @@ Return JSON with these exact keys, each value being detailed markdown text (3-8
   "metrics": "...",
   "open_questions": "..."
 }`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
-async function stage4GenerateStakeholders(entities, graph, brief) {
+async function stage4GenerateStakeholders(entities, graph, brief, ai = {}) {
   const prompt = `Generate stakeholder critique packs for this product decision.
 
 Feature: ${brief.title}
@@ -186,10 +272,10 @@ Return JSON with exactly these stakeholder keys. Each has arrays of strings:
   "Support": {"concerns": ["..."], "required_controls": ["..."], "required_approvals": ["..."], "questions": ["..."]}
 }
 Make each detailed and realistic for ${brief.industry_context}.`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
-async function stage5GenerateChecklist(entities, graph, brief) {
+async function stage5GenerateChecklist(entities, graph, brief, ai = {}) {
   const prompt = `Generate a launch and compliance checklist for this product decision.
 
 Feature: ${brief.title}
@@ -208,10 +294,10 @@ Return JSON with checklist categories. Each category is an array of items:
   "Release Steps": [{"item": "...", "checked": false, "owner": "", "include_in_export": true}]
 }
 3-5 items per category. Make items specific and actionable.`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
-async function stage6BuildTraceability(prd, graph) {
+async function stage6BuildTraceability(prd, graph, ai = {}) {
   const prompt = `Map PRD requirements to graph nodes for traceability.
 
 PRD Sections: ${JSON.stringify(Object.keys(prd))}
@@ -219,61 +305,223 @@ Graph Nodes: ${JSON.stringify(graph.nodes.map(n => ({ id: n.id, label: n.label,
 
 Return a JSON array of 8-12 traceability mappings:
 [{"requirement": "short requirement text", "prd_section": "section_key", "linked_node_ids": ["node-id"], "rationale": "why linked"}]`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
-async function runFullPipeline(briefId) {
-  const db = await connectToDatabase();
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
-  if (!brief) throw new Error('Brief not found');
+// Stage order is used to report the earliest in-flight stage as `generation_stage`
+const PIPELINE_STAGE_ORDER = ['entities', 'graph', 'prd', 'stakeholders', 'checklist', 'traceability', 'summary'];
+const PIPELINE_CONCURRENCY = parseInt(process.env.PIPELINE_CONCURRENCY || '3', 10);
 
-  const now = () => new Date().toISOString();
-  const event = (type, label) => ({ id: uuidv4(), type, label, timestamp: now() });
+function currentGenerationStage(running) {
+  return PIPELINE_STAGE_ORDER.find(s => running.includes(s)) || 'done';
+}
+
+// ---------- Checkpoints ----------
+// Each completed stage stores `pipeline_checkpoints.<stage> = { fingerprint, completed_at, cache_keys }`,
+// `cache_keys` being the response cache entries its model calls used.
+// A fingerprint hashes the brief fields the stage reads plus its upstream
+// fingerprints, so changing an input changes that stage and everything after it.
+// Bump PIPELINE_VERSION when prompts change to invalidate every checkpoint.
+const PIPELINE_VERSION = 1;
+const PIPELINE_STAGES = {
+  entities: { deps: [], fields: ['title', 'main_input', 'input_type', 'industry_context', 'data_sensitivity', 'geography', 'launch_type', 'risk_tolerance'],
+    restore: b => b.entities },
+  graph: { deps: ['entities'], fields: ['title', 'data_sensitivity'], restore: b => b.graph },
+  prd: { deps: ['entities', 'graph'], fields: ['title', 'industry_context', 'geography', 'risk_tolerance', 'launch_type', 'data_sensitivity'],
+    restore: b => b.prd_sections },
+  stakeholders: { deps: ['entities', 'graph'], fields: ['title', 'industry_context', 'data_sensitivity', 'geography'],
+    restore: b => b.stakeholder_critiques && { stakeholder_critiques: b.stakeholder_critiques, stakeholder_risk_levels: b.stakeholder_risk_levels } },
+  checklist: { deps: ['entities', 'graph'], fields: ['title', 'industry_context', 'launch_type', 'data_sensitivity', 'geography'],
+    restore: b => b.checklist },
+  traceability: { deps: ['prd', 'graph'], fields: [], restore: b => b.traceability },
+  summary: { deps: ['entities', 'stakeholders', 'checklist'], fields: ['title', 'industry_context', 'geography', 'risk_tolerance'],
+    restore: b => b.executive_summary },
+};
+
+function stageFingerprints(brief) {
+  const fingerprints = {};
+  for (const name of PIPELINE_STAGE_ORDER) { // topological order
+    const { deps, fields } = PIPELINE_STAGES[name];
+    fingerprints[name] = createHash('sha256')
+      .update(JSON.stringify([PIPELINE_VERSION, name, fields.map(f => brief[f] ?? null), deps.map(d => fingerprints[d])]))
+      .digest('hex').slice(0, 32);
+  }
+  return fingerprints;
+}
 
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { status: 'generating', generation_stage: 'entities', updated_at: now() }, $push: { timeline_events: event('generation_started', 'AI pipeline initiated') } });
+// `names` plus every stage that (transitively) consumes one of them
+function downstreamStages(names) {
+  const affected = new Set(names);
+  for (const name of PIPELINE_STAGE_ORDER) {
+    if (PIPELINE_STAGES[name].deps.some(d => affected.has(d))) affected.add(name);
+  }
+  return PIPELINE_STAGE_ORDER.filter(s => affected.has(s));
+}
 
-  // Stage 1
-  const entities = await stage1ExtractEntities(brief);
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { entities, generation_stage: 'graph' }, $push: { timeline_events: event('entities_extracted', 'Entities and risks extracted') } });
+// Stages whose checkpoint matches and whose output is still on the brief
+function reusableStages(brief, fingerprints) {
+  const stale = PIPELINE_STAGE_ORDER.filter(name =>
+    brief.pipeline_checkpoints?.[name]?.fingerprint !== fingerprints[name] || PIPELINE_STAGES[name].restore(brief) == null);
+  const rerun = new Set(downstreamStages(stale));
+  return PIPELINE_STAGE_ORDER.filter(s => !rerun.has(s));
+}
 
-  // Stage 2
-  const graph = stage2BuildGraph(entities, brief);
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { graph, generation_stage: 'prd' }, $push: { timeline_events: event('graph_built', 'Dependency graph constructed') } });
+const GENERATION_STATE_PROJECTION = { _id: 0, generation_seq: 1, status: 1, generation_stage: 1, generation_running: 1, generation_job_id: 1, error_message: 1 };
 
-  // Stage 3
-  const prd_sections = await stage3GeneratePRD(entities, graph, brief);
-  const section_statuses = {};
-  Object.keys(prd_sections).forEach(k => { section_statuses[k] = 'needs_review'; });
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { prd_sections, section_statuses, generation_stage: 'stakeholders' }, $push: { timeline_events: event('prd_generated', 'PRD sections generated') } });
+// Applies a generation progress write and publishes it to /briefs/:id/events subscribers
+async function recordGenerationProgress(briefId, type, update, extra = {}) {
+  const db = await connectToDatabase();
+  const state = await db.collection('decision_briefs').findOneAndUpdate({ id: briefId }, { ...update, $inc: { ...update.$inc, generation_seq: 1, version: 1 } }, { returnDocument: 'after', projection: GENERATION_STATE_PROJECTION });
+  if (state) publishBriefEvent(briefId, { seq: state.generation_seq, type, ...state, ...extra });
+  return state;
+}
 
-  // Stage 4 - with risk levels
-  const stakeholder_critiques = await stage4GenerateStakeholders(entities, graph, brief);
-  const stakeholder_risk_levels = computeStakeholderRiskLevels(stakeholder_critiques, entities);
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { stakeholder_critiques, stakeholder_risk_levels, generation_stage: 'checklist' }, $push: { timeline_events: event('stakeholders_generated', 'Stakeholder critiques generated') } });
+// resume: reuse stages whose checkpoint fingerprint still matches (the default);
+// false reruns every stage
+async function runFullPipeline(briefId, { cache = 'use', resume = true, signal } = {}) {
+  const db = await connectToDatabase();
+  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
+  if (!brief) throw new Error('Brief not found');
 
-  // Stage 5
-  const checklist = await stage5GenerateChecklist(entities, graph, brief);
-  await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { checklist, generation_stage: 'traceability' }, $push: { timeline_events: event('checklist_generated', 'Compliance checklist generated') } });
+  const now = () => new Date().toISOString();
+  const event = (type, label) => ({ id: uuidv4(), type, label, timestamp: now() });
+  const pipelineStarted = performance.now();
+  const startedAt = now();
+
+  const fingerprints = stageFingerprints(brief);
+  const reused = new Set(resume ? reusableStages(brief, fingerprints) : []);
+  const firstStage = PIPELINE_STAGE_ORDER.find(s => !reused.has(s)) || 'done';
+  // Checkpoints of stages about to rerun are dropped up front, so a failure
+  // part-way never leaves a checkpoint vouching for output built on stale input
+  const $unset = Object.fromEntries(PIPELINE_STAGE_ORDER.filter(s => !reused.has(s)).map(s => [`pipeline_checkpoints.${s}`, '']));
+  const startLabel = reused.size > 0 ? `AI pipeline resumed at ${firstStage} (${reused.size} stages reused)` : 'AI pipeline initiated';
+  const started = event('generation_started', startLabel);
+  await recordGenerationProgress(briefId, 'started', {
+    $set: { status: 'generating', generation_stage: firstStage, generation_running: firstStage === 'done' ? [] : [firstStage], updated_at: now() },
+    ...(Object.keys($unset).length ? { $unset } : {}),
+    $push: historyPush({ timeline_events: [started] }),
+  }, { reused: [...reused] });
+  await appendBriefHistory(db, briefId, { timeline_events: [started] });
+
+  // Independent stages run concurrently (deps come from PIPELINE_STAGES); `update`
+  // builds each stage's $set and timeline event. `ai` carries the stage's metrics sink.
+  const stages = [
+    { name: 'entities', run: (r, ai) => stage1ExtractEntities(brief, ai),
+      update: entities => ({ $set: { entities }, event: event('entities_extracted', 'Entities and risks extracted') }) },
+    { name: 'graph', run: r => stage2BuildGraph(r.entities, brief),
+      update: graph => ({ $set: { graph }, event: event('graph_built', 'Dependency graph constructed') }) },
+    { name: 'prd', run: (r, ai) => stage3GeneratePRD(r.entities, r.graph, brief, ai),
+      update: prd_sections => {
+        const section_statuses = {};
+        Object.keys(prd_sections).forEach(k => { section_statuses[k] = 'needs_review'; });
+        return { $set: { prd_sections, section_statuses }, event: event('prd_generated', 'PRD sections generated') };
+      } },
+    { name: 'stakeholders',
+      run: async (r, ai) => {
+        const stakeholder_critiques = await stage4GenerateStakeholders(r.entities, r.graph, brief, ai);
+        return { stakeholder_critiques, stakeholder_risk_levels: computeStakeholderRiskLevels(stakeholder_critiques, r.entities) };
+      },
+      update: value => ({ $set: value, event: event('stakeholders_generated', 'Stakeholder critiques generated') }) },
+    { name: 'checklist', run: (r, ai) => stage5GenerateChecklist(r.entities, r.graph, brief, ai),
+      update: checklist => ({ $set: { checklist: withChecklistIds(checklist) }, $inc: { checklist_version: 1 }, event: event('checklist_generated', 'Compliance checklist generated') }) },
+    { name: 'traceability', run: (r, ai) => stage6BuildTraceability(r.prd, r.graph, ai),
+      update: traceability => ({ $set: { traceability }, event: event('traceability_built', 'Requirement traceability mapped') }) },
+    { name: 'summary',
+      run: (r, ai) => generateExecutiveSummary(brief, r.entities, r.stakeholders.stakeholder_critiques, r.checklist, r.stakeholders.stakeholder_risk_levels, ai),
+      update: executive_summary => ({ $set: { executive_summary }, event: event('summary_generated', 'Executive summary generated') }) },
+  ];
+  const stageByName = Object.fromEntries(stages.map(s => [s.name, s]));
+  // Per-stage timings and model usage, persisted as the brief's stage_metrics
+  const stageMetrics = {};
+  const stageCacheKeys = {};
+  const stageMetricsRecord = outcome => {
+    const totals = { duration_ms: Math.round(performance.now() - pipelineStarted), calls: 0, attempts: 0, cache_hits: 0, prompt_bytes: 0, response_bytes: 0, tokens: 0 };
+    Object.values(stageMetrics).forEach(m => ['calls', 'attempts', 'cache_hits', 'prompt_bytes', 'response_bytes', 'tokens'].forEach(k => { totals[k] += m[k]; }));
+    return { outcome, pipeline_version: PIPELINE_VERSION, started_at: startedAt, finished_at: now(), reused: [...reused], totals, stages: stageMetrics };
+  };
 
-  // Stage 6
-  const traceability = await stage6BuildTraceability(prd_sections, graph);
+  // Reused stages hand their persisted output downstream without a model call
+  const runnable = stages.map(s => ({
+    ...s,
+    deps: PIPELINE_STAGES[s.name].deps,
+    run: async r => {
+      const m = { duration_ms: 0, reused: reused.has(s.name), model: null, calls: 0, attempts: 0, cache_hits: 0, prompt_bytes: 0, response_bytes: 0, tokens: 0 };
+      stageMetrics[s.name] = m;
+      stageCacheKeys[s.name] = [];
+      const onCall = c => {
+        stageCacheKeys[s.name].push(...(c.cache_keys || []));
+        m.calls++;
+        m.attempts += c.attempts;
+        if (c.cache_hit) m.cache_hits++;
+        m.prompt_bytes += c.prompt_bytes;
+        m.response_bytes += c.response_bytes;
+        m.tokens += c.tokens?.total || 0;
+        if (c.model) m.model = c.model;
+      };
+      const t0 = performance.now();
+      let outcome = m.reused ? 'reused' : 'ok';
+      try {
+        return m.reused ? PIPELINE_STAGES[s.name].restore(brief) : await s.run(r, { cache, signal, onCall });
+      } catch (error) {
+        outcome = 'error';
+        throw error;
+      } finally {
+        m.duration_ms = Math.round(performance.now() - t0);
+        metrics.pipelineStages.observe({ stage: s.name, outcome }, m.duration_ms / 1000);
+      }
+    },
+  }));
 
-  // Stage 7 - Executive Summary
-  const executive_summary = await generateExecutiveSummary(brief, entities, stakeholder_critiques, checklist, stakeholder_risk_levels);
+  // Stage writes are chained so progress fields land in completion order
+  let writes = Promise.resolve();
+  try {
+    await runStageGraph(runnable, {
+      concurrency: PIPELINE_CONCURRENCY,
+      signal,
+      onComplete: (name, value, state) => {
+        if (reused.has(name)) return;
+        const { $set, $inc, event: ev } = stageByName[name].update(value);
+        const generation_running = PIPELINE_STAGE_ORDER.filter(s => state.running.includes(s));
+        const checkpoint = { fingerprint: fingerprints[name], completed_at: now(), cache_keys: stageCacheKeys[name] || [] };
+        writes = writes.then(() => recordGenerationProgress(briefId, 'stage', {
+          $set: { ...$set, [`pipeline_checkpoints.${name}`]: checkpoint, generation_stage: currentGenerationStage(generation_running), generation_running },
+          ...($inc ? { $inc } : {}),
+          $push: historyPush({ timeline_events: [ev] }),
+        }, { stage: name, payload: $set })).then(() => appendBriefHistory(db, briefId, { timeline_events: [ev] }));
+        return writes;
+      },
+    });
+  } catch (error) {
+    const outcome = signal?.aborted ? 'cancelled' : 'error';
+    metrics.pipelineRuns.observe({ outcome }, (performance.now() - pipelineStarted) / 1000);
+    // Stage writes must land before the failure is recorded, or they could overwrite it
+    await writes.catch(() => {});
+    if (signal?.reason instanceof LeaseLostError) throw error;
+    await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { stage_metrics: stageMetricsRecord(outcome) }, $inc: { version: 1 } })
+      .catch(err => console.error(`stage_metrics not recorded for ${briefId}:`, err?.message || err));
+    throw error;
+  }
+  metrics.pipelineRuns.observe({ outcome: 'complete' }, (performance.now() - pipelineStarted) / 1000);
 
   // Save revision + final timeline event
-  const revision = { id: uuidv4(), timestamp: now(), type: 'full_generation', summary: 'Initial AI generation complete' };
+  const revision = reused.size > 0
+    ? { id: uuidv4(), timestamp: now(), type: 'resumed_generation', summary: `Generation resumed: ${PIPELINE_STAGE_ORDER.length - reused.size} stages rerun, ${reused.size} reused` }
+    : { id: uuidv4(), timestamp: now(), type: 'full_generation', summary: 'Initial AI generation complete' };
+  const history = { revisions: [revision], timeline_events: [event('generation_complete', 'All stages complete — ready for review')] };
+  const generated = await db.collection('decision_briefs').findOne({ id: briefId }, { projection: READINESS_PROJECTION });
 
-  await db.collection('decision_briefs').updateOne({ id: briefId }, {
+  await recordGenerationProgress(briefId, 'complete', {
     $set: {
-      traceability,
-      executive_summary,
       status: 'complete',
       generation_stage: 'done',
+      generation_running: [],
+      readiness: computeReadinessScore({ ...generated, status: 'complete' }),
+      stage_metrics: stageMetricsRecord('complete'),
       updated_at: now(),
     },
-    $push: { revisions: revision, timeline_events: event('generation_complete', 'All stages complete — ready for review') }
+    $push: historyPush(history)
   });
+  await appendBriefHistory(db, briefId, history);
 
   return await db.collection('decision_briefs').findOne({ id: briefId });
 }
@@ -297,48 +545,23 @@ function computeStakeholderRiskLevels(critiques, entities) {
   return levels;
 }
 
-function computeReadinessScore(brief) {
-  if (!brief || brief.status !== 'complete') return { score: 0, tier: 'low', factors: [] };
-  const factors = [];
-  let score = 100;
-
-  // Checklist completion
-  if (brief.checklist) {
-    let total = 0, checked = 0;
-    Object.values(brief.checklist).forEach(items => { items.forEach(i => { total++; if (i.checked) checked++; }); });
-    const pct = total > 0 ? Math.round((checked / total) * 100) : 0;
-    if (pct < 50) { score -= 25; factors.push(`Checklist ${pct}% complete`); }
-    else if (pct < 100) { score -= 10; factors.push(`Checklist ${pct}% complete`); }
-  }
-
-  // Stakeholder risk levels
-  if (brief.stakeholder_risk_levels) {
-    const highCount = Object.values(brief.stakeholder_risk_levels).filter(v => v === 'high').length;
-    const medCount = Object.values(brief.stakeholder_risk_levels).filter(v => v === 'medium').length;
-    if (highCount > 0) { score -= highCount * 10; factors.push(`${highCount} high-risk stakeholder concern(s)`); }
-    if (medCount > 0) { score -= medCount * 5; factors.push(`${medCount} medium-risk stakeholder concern(s)`); }
-  }
-
-  // Section statuses
-  if (brief.section_statuses) {
-    const riskCount = Object.values(brief.section_statuses).filter(v => v === 'risk_identified').length;
-    const needsReview = Object.values(brief.section_statuses).filter(v => v === 'needs_review').length;
-    if (riskCount > 0) { score -= riskCount * 8; factors.push(`${riskCount} section(s) with identified risk`); }
-    if (needsReview > 0) { score -= needsReview * 3; factors.push(`${needsReview} section(s) pending review`); }
-  }
-
-  // Unresolved assumptions
-  if (brief.assumptions?.length > 0) {
-    const lowConf = brief.assumptions.filter(a => a.confidence === 'low').length;
-    if (lowConf > 0) { score -= lowConf * 5; factors.push(`${lowConf} low-confidence assumption(s)`); }
-  }
-
-  score = Math.max(0, Math.min(100, score));
-  const tier = score >= 75 ? 'high' : score >= 45 ? 'medium' : 'low';
-  return { score, tier, factors };
+// Stores readiness computed from a post-write snapshot. Conditional on
+// updated_at, so when writes race the newest write's own refresh wins.
+// Bumps `version` like any other write: an ETag handed out between the
+// mutation and this refresh must not revalidate the old score.
+// `version` is left as passed in if another write got there first.
+async function storeReadiness(db, brief) {
+  if (!brief) return brief;
+  const readiness = computeReadinessScore(brief);
+  const stored = await db.collection('decision_briefs').findOneAndUpdate(
+    { id: brief.id, updated_at: brief.updated_at },
+    { $set: { readiness }, $inc: { version: 1 } },
+    { returnDocument: 'after', projection: { _id: 0, version: 1 } }
+  );
+  return { ...brief, readiness, version: stored ? stored.version : brief.version };
 }
 
-async function generateExecutiveSummary(brief, entities, stakeholders, checklist, riskLevels) {
+async function generateExecutiveSummary(brief, entities, stakeholders, checklist, riskLevels, ai = {}) {
   const highRiskStakeholders = Object.entries(riskLevels || {}).filter(([, v]) => v === 'high').map(([k]) => k);
   const prompt = `Generate a concise executive decision summary for this product decision.
 
@@ -361,7 +584,7 @@ Return JSON:
 }
 
 recommendation must be one of: "go", "go_with_conditions", "no_go", "needs_further_review"`;
-  return await callGemini(prompt);
+  return await callGemini(prompt, ai);
 }
 
 // ========== AUTH HANDLERS ==========
@@ -374,14 +597,14 @@ async function handleSignup(request) {
     const db = await connectToDatabase();
     const exists = await db.collection('users').findOne({ email });
     if (exists) return NextResponse.json({ error: 'Email already registered' }, { status: 409 });
-    const hashedPw = bcrypt.hashSync(password, 10);
+    const hashedPw = await hashPassword(password);
     const user = { id: uuidv4(), email, password: hashedPw, name: name || email.split('@')[0], created_at: new Date().toISOString() };
     await db.collection('users').insertOne(user);
-    const token = uuidv4();
-    await db.collection('sessions').insertOne({ id: uuidv4(), user_id: user.id, token, created_at: new Date().toISOString() });
+    const session = newSession(user.id);
+    await db.collection('sessions').insertOne(session);
     const safeUser = { id: user.id, email: user.email, name: user.name, created_at: user.created_at };
     const response = NextResponse.json({ user: safeUser });
-    response.cookies.set('session_token', token, { httpOnly: true, sameSite: 'lax', maxAge: 60 * 60 * 24 * 7, path: '/' });
+    response.cookies.set('session_token', session.token, { httpOnly: true, sameSite: 'lax', maxAge: SESSION_TTL_SECONDS, path: '/' });
     return response;
   } catch (error) {
     console.error('Signup error:', error);
@@ -397,14 +620,20 @@ async function handleLogin(request) {
     if (!email || !password) return NextResponse.json({ error: 'Email and password required' }, { status: 400 });
     const db = await connectToDatabase();
     const user = await db.collection('users').findOne({ email });
-    if (!user || !bcrypt.compareSync(password, user.password)) {
+    if (!user || !(await verifyPassword(password, user.password))) {
       return NextResponse.json({ error: 'Invalid credentials' }, { status: 401 });
     }
-    const token = uuidv4();
-    await db.collection('sessions').insertOne({ id: uuidv4(), user_id: user.id, token, created_at: new Date().toISOString() });
+    if (needsRehash(user.password)) {
+      // Upgrade hashes made with an older BCRYPT_COST without delaying the login
+      hashPassword(password)
+        .then(rehashed => db.collection('users').updateOne({ id: user.id, password: user.password }, { $set: { password: rehashed } }))
+        .catch(err => console.error('Password rehash failed:', err?.message || err));
+    }
+    const session = newSession(user.id);
+    await db.collection('sessions').insertOne(session);
     const safeUser = { id: user.id, email: user.email, name: user.name, created_at: user.created_at };
     const response = NextResponse.json({ user: safeUser });
-    response.cookies.set('session_token', token, { httpOnly: true, sameSite: 'lax', maxAge: 60 * 60 * 24 * 7, path: '/' });
+    response.cookies.set('session_token', session.token, { httpOnly: true, sameSite: 'lax', maxAge: SESSION_TTL_SECONDS, path: '/' });
     return response;
   } catch (error) {
     console.error('Login error:', error);
@@ -415,6 +644,8 @@ async function handleLogin(request) {
 async function handleLogout(request) {
   const token = request.cookies.get('session_token')?.value;
   if (token) {
+    sessionCache.delete(token);
+    sessionCacheStats.invalidations++;
     const db = await connectToDatabase();
     await db.collection('sessions').deleteMany({ token });
   }
@@ -430,22 +661,41 @@ async function handleMe(request) {
 }
 
 // ========== BRIEF HANDLERS ==========
+// Summary fields for list views; everything else is fetched per brief
+const BRIEF_LIST_PROJECTION = {
+  _id: 0, id: 1, title: 1, status: 1, input_type: 1, industry_context: 1, geography: 1, launch_type: 1,
+  risk_tolerance: 1, data_sensitivity: 1, generation_stage: 1, created_at: 1, updated_at: 1,
+  'readiness.score': 1, 'readiness.tier': 1,
+};
+const BRIEF_LIST_MAX_LIMIT = 100;
+
+// Keyset-paginated on (updated_at, id), newest first:
+// ?limit= (default 50), ?cursor= (previous next_cursor), ?status=, ?industry=, ?q= (title search)
 async function handleListBriefs(request) {
   const user = await getUser(request);
   if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
   const db = await connectToDatabase();
-  const briefs = await db.collection('decision_briefs').find({ user_id: user.id }).sort({ updated_at: -1 }).project({ prd_sections: 0, stakeholder_critiques: 0, checklist: 0, traceability: 0, entities: 0 }).toArray();
-  return NextResponse.json({ briefs });
+  const params = new URL(request.url).searchParams;
+  const query = { user_id: user.id };
+  if (params.get('status')) query.status = params.get('status');
+  if (params.get('industry')) query.industry_context = params.get('industry');
+  if (params.get('q')) query.title = { $regex: params.get('q').replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), $options: 'i' };
+  const { items, next_cursor } = await keysetPage(db.collection('decision_briefs'), query, {
+    field: 'updated_at',
+    cursor: params.get('cursor'),
+    limit: clampLimit(params.get('limit'), 50, BRIEF_LIST_MAX_LIMIT),
+    projection: BRIEF_LIST_PROJECTION,
+  });
+  return NextResponse.json({ briefs: items, next_cursor });
 }
 
-async function handleCreateBrief(request) {
-  const user = await getUser(request);
-  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-  const body = await request.json();
-  const db = await connectToDatabase();
-  const brief = {
+// A new draft brief with its 'created' timeline event; `extra` overrides fields
+function newBriefDocument(userId, body, { label = 'Decision brief created', ...extra } = {}) {
+  const now = new Date().toISOString();
+  const created = { id: uuidv4(), type: 'created', label, timestamp: now };
+  return {
     id: uuidv4(),
-    user_id: user.id,
+    user_id: userId,
     title: body.title || 'Untitled Brief',
     status: 'draft',
     input_type: body.input_type || 'feature_idea',
@@ -462,28 +712,84 @@ async function handleCreateBrief(request) {
     checklist: null,
     traceability: null,
     revisions: [],
-    timeline_events: [{ id: uuidv4(), type: 'created', label: 'Decision brief created', timestamp: new Date().toISOString() }],
+    timeline_events: [created],
     section_statuses: {},
     assumptions: [],
     executive_summary: null,
     stakeholder_risk_levels: {},
     regeneration_diffs: {},
-    created_at: new Date().toISOString(),
-    updated_at: new Date().toISOString(),
+    version: 1,
+    created_at: now,
+    updated_at: now,
+    ...extra,
   };
+}
+
+async function handleCreateBrief(request) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const body = await request.json();
+  const db = await connectToDatabase();
+  const brief = newBriefDocument(user.id, body);
   await db.collection('decision_briefs').insertOne(brief);
+  await appendBriefHistory(db, brief.id, { timeline_events: brief.timeline_events });
   return NextResponse.json({ brief });
 }
 
+// Top-level fields GET /briefs/:id?fields= can select
+const BRIEF_FIELDS = new Set([
+  'title', 'status', 'input_type', 'main_input', 'industry_context', 'data_sensitivity', 'geography', 'launch_type', 'risk_tolerance',
+  'entities', 'graph', 'prd_sections', 'section_statuses', 'stakeholder_critiques', 'stakeholder_risk_levels', 'checklist', 'checklist_version',
+  'traceability', 'executive_summary', 'assumptions', 'readiness', 'timeline_events', 'revisions', 'regeneration_diffs',
+  'generation_stage', 'generation_running', 'generation_job_id', 'error_message', 'stage_metrics', 'created_at', 'updated_at', 'version',
+]);
+const BRIEF_ALWAYS_FIELDS = ['id', 'version', 'status', 'updated_at'];
+// Browsers revalidate with If-None-Match on every fetch and reuse the body on 304
+const BRIEF_CACHE_CONTROL = 'private, no-cache';
+
+// Strong ETag for one representation: the brief's version (bumped by every
+// mutation) plus the field selection
+function briefETag(version, fields) {
+  const variant = fields ? createHash('sha1').update(fields.join(',')).digest('base64url').slice(0, 12) : 'full';
+  return `"${version || 0}-${variant}"`;
+}
+
+function etagMatches(header, etag) {
+  return header.split(',').map(t => t.trim().replace(/^W\//, '')).some(t => t === etag || t === '*');
+}
+
+// ?fields=a,b selects top-level fields (id, version, status and updated_at are
+// always included); If-None-Match is answered from a version-only read
 async function handleGetBrief(request, briefId) {
   const user = await getUser(request);
   if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const param = new URL(request.url).searchParams.get('fields');
+  const fields = param ? [...new Set(param.split(',').map(f => f.trim()).filter(Boolean))].sort() : null;
+  const unknown = (fields || []).filter(f => !BRIEF_FIELDS.has(f));
+  if (unknown.length) return NextResponse.json({ error: `Unknown fields: ${unknown.join(', ')}` }, { status: 400 });
   const db = await connectToDatabase();
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id });
+  const briefs = db.collection('decision_briefs');
+
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch) {
+    const current = await briefs.findOne({ id: briefId, user_id: user.id }, { projection: { _id: 0, version: 1 } });
+    if (!current) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+    const etag = briefETag(current.version, fields);
+    if (etagMatches(ifNoneMatch, etag)) return new NextResponse(null, { status: 304, headers: { ETag: etag, 'Cache-Control': BRIEF_CACHE_CONTROL } });
+  }
+
+  const projection = fields ? { _id: 0, ...Object.fromEntries([...BRIEF_ALWAYS_FIELDS, ...fields].map(f => [f, 1])) } : undefined;
+  let brief = await briefs.findOne({ id: briefId, user_id: user.id }, { projection });
   if (!brief) return NextResponse.json({ error: 'Not found' }, { status: 404 });
-  // Compute readiness score on the fly
-  brief.readiness = computeReadinessScore(brief);
-  return NextResponse.json({ brief });
+  // Readiness is stored by every write that affects it; briefs scored under an older schema are refreshed once
+  if ((!fields || fields.includes('readiness')) && brief.readiness?.schema !== READINESS_SCHEMA) {
+    const inputs = fields ? await briefs.findOne({ id: briefId }, { projection: READINESS_PROJECTION }) : brief;
+    const refreshed = await storeReadiness(db, inputs);
+    // A concurrent write moved the brief on: serve this response uncached
+    if (refreshed.version === inputs.version) return NextResponse.json({ brief: { ...brief, readiness: refreshed.readiness } }, { headers: { 'Cache-Control': 'no-store' } });
+    brief = { ...brief, readiness: refreshed.readiness, version: refreshed.version };
+  }
+  return NextResponse.json({ brief }, { headers: { ETag: briefETag(brief.version, fields), 'Cache-Control': BRIEF_CACHE_CONTROL } });
 }
 
 async function handleUpdateBrief(request, briefId) {
@@ -491,37 +797,204 @@ async function handleUpdateBrief(request, briefId) {
   if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
   const body = await request.json();
   const db = await connectToDatabase();
-  const { _id, id, user_id, created_at, ...updates } = body;
+  // History, checkpoints, readiness and versions are server-managed
+  const { _id, id, user_id, created_at, pipeline_checkpoints, status_before_generation, timeline_events, revisions, regeneration_diffs, readiness, checklist_version, version, ...updates } = body;
   updates.updated_at = new Date().toISOString();
-  await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, { $set: updates });
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
-  return NextResponse.json({ brief });
+  // ?invalidate=downstream drops the checkpoints of every stage that reads a
+  // changed field (and the stages after it), and their cached model responses,
+  // so the next generate reruns only those and asks the model afresh
+  let invalidated_stages = [];
+  let cacheKeys = [];
+  const update = { $set: updates, $inc: { version: 1 } };
+  if (updates.checklist) {
+    updates.checklist = withChecklistIds(updates.checklist);
+    update.$inc.checklist_version = 1;
+  }
+  if (new URL(request.url).searchParams.get('invalidate') === 'downstream') {
+    const current = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { ...Object.fromEntries(Object.keys(updates).map(k => [k, 1])), pipeline_checkpoints: 1 } });
+    if (!current) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+    const changed = Object.keys(updates).filter(k => JSON.stringify(current[k] ?? null) !== JSON.stringify(updates[k] ?? null));
+    invalidated_stages = downstreamStages(PIPELINE_STAGE_ORDER.filter(s => PIPELINE_STAGES[s].fields.some(f => changed.includes(f))));
+    if (invalidated_stages.length) update.$unset = Object.fromEntries(invalidated_stages.map(s => [`pipeline_checkpoints.${s}`, '']));
+    cacheKeys = invalidated_stages.flatMap(s => current.pipeline_checkpoints?.[s]?.cache_keys || []);
+  }
+  await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, update);
+  const invalidated_cache_entries = cacheKeys.length ? await invalidateCachedResponses([...new Set(cacheKeys)]) : 0;
+  let brief = await db.collection('decision_briefs').findOne({ id: briefId });
+  if (READINESS_INPUTS.some(f => f in updates)) brief = await storeReadiness(db, brief);
+  return NextResponse.json({ brief, invalidated_stages, invalidated_cache_entries });
 }
 
 async function handleDeleteBrief(request, briefId) {
   const user = await getUser(request);
   if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
   const db = await connectToDatabase();
-  await db.collection('decision_briefs').deleteOne({ id: briefId, user_id: user.id });
+  const { deletedCount } = await db.collection('decision_briefs').deleteOne({ id: briefId, user_id: user.id });
+  if (deletedCount) await deleteBriefHistory(db, briefId);
   return NextResponse.json({ success: true });
 }
 
+// ========== GENERATION JOBS ==========
+function friendlyGenerationError(error) {
+  const errMsg = error?.message || String(error);
+  const isQuota = isRateLimitError(error);
+  const message = isQuota
+    ? 'AI rate limit reached. The Gemini API free tier has a daily request limit. Please wait a few minutes and try again, or the limit will reset tomorrow.'
+    : `Generation failed: ${errMsg.slice(0, 200)}`;
+  return { message, isQuota };
+}
+
+// A cancelled generation hands the brief back in the status it was queued from,
+// so cancelling a regeneration leaves a generated brief 'complete'
+async function restoreCancelledBrief(briefId) {
+  const db = await connectToDatabase();
+  const brief = await db.collection('decision_briefs').findOne({ id: briefId }, { projection: { _id: 0, status_before_generation: 1 } });
+  await recordGenerationProgress(briefId, 'cancelled', {
+    $set: { status: brief?.status_before_generation || 'draft', error_message: null, generation_stage: null, generation_running: [], updated_at: new Date().toISOString() },
+  });
+}
+
+async function runGenerationJob(job, { signal }) {
+  try {
+    await runFullPipeline(job.brief_id, { ...job.options, signal });
+  } catch (error) {
+    // A lost lease means another worker is generating this brief now
+    if (signal.reason instanceof LeaseLostError) throw error;
+    if (signal.aborted) await restoreCancelledBrief(job.brief_id);
+    else {
+      await recordGenerationProgress(job.brief_id, 'error', {
+        $set: { status: 'error', error_message: friendlyGenerationError(error).message, generation_running: [], updated_at: new Date().toISOString() },
+      });
+    }
+    throw error;
+  }
+}
+
+const generationJobs = createJobQueue({
+  collection: 'generation_jobs',
+  handler: runGenerationJob,
+  concurrency: parseInt(process.env.GENERATION_WORKERS || '2', 10),
+  perUserConcurrency: parseInt(process.env.GENERATION_WORKERS_PER_USER || '1', 10),
+  leaseMs: parseInt(process.env.GENERATION_JOB_LEASE_MS || '60000', 10),
+  // Jobs abandoned by dead workers too many times never reach runGenerationJob's error path
+  onExpired: async job => {
+    if (job.status === 'cancelled') return restoreCancelledBrief(job.brief_id);
+    await recordGenerationProgress(job.brief_id, 'error', {
+      $set: { status: 'error', error_message: 'Generation was interrupted. Please try again.', generation_running: [], updated_at: new Date().toISOString() },
+    });
+  },
+});
+
 async function handleGenerate(request, briefId) {
   const user = await getUser(request);
   if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-  try {
-    const result = await runFullPipeline(briefId);
-    return NextResponse.json({ brief: result });
-  } catch (error) {
-    const errMsg = error?.message || String(error);
-    const isQuota = errMsg.includes('429') || errMsg.includes('quota') || errMsg.includes('RESOURCE_EXHAUSTED');
-    const friendlyMsg = isQuota
-      ? 'AI rate limit reached. The Gemini API free tier has a daily request limit. Please wait a few minutes and try again, or the limit will reset tomorrow.'
-      : `Generation failed: ${errMsg.slice(0, 200)}`;
-    const db = await connectToDatabase();
-    await db.collection('decision_briefs').updateOne({ id: briefId }, { $set: { status: 'error', error_message: friendlyMsg, updated_at: new Date().toISOString() } });
-    return NextResponse.json({ error: friendlyMsg }, { status: isQuota ? 429 : 500 });
+  const body = await request.json().catch(() => ({}));
+  const db = await connectToDatabase();
+  const brief = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { id: 1, status: 1 } });
+  if (!brief) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  // Resumes from checkpoints by default; { fresh: true } or { resume: false } reruns every stage
+  const options = { cache: body?.fresh ? 'refresh' : 'use', resume: !body?.fresh && body?.resume !== false };
+  const { job, created } = await generationJobs.enqueue({ type: 'generate', brief_id: briefId, user_id: user.id, options });
+  if (created) {
+    // A brief left 'generating' by a lost job keeps the status recorded when that job was queued
+    const previous = brief.status === 'generating' ? {} : { status_before_generation: brief.status || 'draft' };
+    await recordGenerationProgress(briefId, 'queued', { $set: { status: 'generating', generation_stage: 'queued', generation_running: [], generation_job_id: job.id, error_message: null, ...previous, updated_at: new Date().toISOString() } });
   }
+  return NextResponse.json({ job }, { status: 202 });
+}
+
+async function handleGetJob(request, jobId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const job = await generationJobs.get(jobId, user.id);
+  if (!job) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  return NextResponse.json({ job });
+}
+
+async function handleCancelJob(request, jobId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const job = await generationJobs.cancel(jobId, user.id);
+  if (!job) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  if (job.status === 'cancelled') await restoreCancelledBrief(job.brief_id);
+  return NextResponse.json({ job });
+}
+
+// ========== GENERATION EVENTS (SSE) ==========
+const SSE_HEARTBEAT_MS = 15000;
+const SSE_STATE_CHECK_MS = 3000;
+const GENERATED_FIELDS = ['entities', 'graph', 'prd_sections', 'section_statuses', 'stakeholder_critiques', 'stakeholder_risk_levels', 'checklist', 'traceability', 'executive_summary'];
+
+async function handleBriefEvents(request, briefId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const db = await connectToDatabase();
+  const owned = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { id: 1 } });
+  if (!owned) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+
+  const lastEventId = parseInt(request.headers.get('last-event-id') || '', 10);
+  const encoder = new TextEncoder();
+  let cleanup = () => {};
+  let closed = false;
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      let lastSent = Number.isFinite(lastEventId) ? lastEventId : -1;
+      const write = chunk => { if (!closed) controller.enqueue(encoder.encode(chunk)); };
+      const close = () => {
+        if (closed) return;
+        closed = true;
+        cleanup();
+        try { controller.close(); } catch {}
+      };
+      const send = ev => {
+        if (ev.seq <= lastSent && ev.type !== 'snapshot') return;
+        lastSent = Math.max(lastSent, ev.seq);
+        write(`id: ${ev.seq}\nevent: ${ev.type}\ndata: ${JSON.stringify(ev)}\n\n`);
+        if (isTerminalBriefEvent(ev)) close();
+      };
+      // Full state, for new connections and when the replay buffer cannot cover a gap
+      const sendSnapshot = async () => {
+        const brief = await db.collection('decision_briefs').findOne({ id: briefId }, { projection: { ...GENERATION_STATE_PROJECTION, ...Object.fromEntries(GENERATED_FIELDS.map(f => [f, 1])) } });
+        if (!brief) return close();
+        const { generation_seq = 0, status, generation_stage, generation_running, generation_job_id, error_message, ...payload } = brief;
+        send({ seq: generation_seq, type: 'snapshot', status, generation_stage, generation_running, generation_job_id, error_message, payload });
+        if (status !== 'generating') close();
+      };
+
+      const buffered = [];
+      let replaying = true;
+      const unsubscribe = subscribeBriefEvents(briefId, ev => { if (replaying) buffered.push(ev); else send(ev); });
+      // Events from a worker in another process only reach us through the document
+      const stateCheck = setInterval(async () => {
+        try {
+          const state = await db.collection('decision_briefs').findOne({ id: briefId }, { projection: { generation_seq: 1 } });
+          if ((state?.generation_seq || 0) > lastSent) await sendSnapshot();
+        } catch {}
+      }, SSE_STATE_CHECK_MS);
+      const heartbeat = setInterval(() => write(': heartbeat\n\n'), SSE_HEARTBEAT_MS);
+      cleanup = () => { unsubscribe(); clearInterval(stateCheck); clearInterval(heartbeat); };
+      request.signal?.addEventListener('abort', close);
+
+      write(`retry: 3000\n\n`);
+      const missed = lastSent >= 0 ? replayBriefEvents(briefId, lastSent) : null;
+      // Nothing missed still needs a snapshot: it is what closes the stream of a finished run
+      if (missed?.length) missed.forEach(send);
+      else await sendSnapshot();
+      replaying = false;
+      buffered.forEach(send);
+    },
+    cancel() { closed = true; cleanup(); },
+  });
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no',
+    },
+  });
 }
 
 async function handleRegenerate(request, briefId) {
@@ -536,30 +1009,75 @@ async function handleRegenerate(request, briefId) {
     if (type === 'section' && target && brief.entities && brief.graph) {
       const oldContent = brief.prd_sections?.[target] || '';
       const sectionPrompt = `Regenerate ONLY the "${target}" section of a PRD for: ${brief.title}\n\nContext: ${brief.entities.feature_summary}\nIndustry: ${brief.industry_context}\n\nReturn JSON: {"${target}": "detailed markdown content for this section"}`;
-      const result = await callGemini(sectionPrompt);
+      const result = await callGemini(sectionPrompt, { cache: 'refresh' });
       const newContent = result[target] || '';
       const updateKey = `prd_sections.${target}`;
       const diffKey = `regeneration_diffs.${target}`;
+      // Full old/new text goes to brief_regeneration_diffs; the brief keeps a reference
+      const diffRef = await recordRegenerationDiff(db, briefId, target, { old_content: oldContent, new_content: newContent, timestamp: now });
+      const history = {
+        revisions: [{ id: uuidv4(), timestamp: now, type: 'section_regeneration', summary: `Regenerated ${target}`, diff_id: diffRef.id }],
+        timeline_events: [{ id: uuidv4(), type: 'section_regenerated', label: `PRD section "${target}" regenerated`, timestamp: now, target }],
+      };
       await db.collection('decision_briefs').updateOne({ id: briefId }, {
-        $set: { [updateKey]: newContent, [diffKey]: { old_content: oldContent, new_content: newContent, timestamp: now }, [`section_statuses.${target}`]: 'needs_review', updated_at: now },
-        $push: { revisions: { id: uuidv4(), timestamp: now, type: 'section_regeneration', summary: `Regenerated ${target}` }, timeline_events: { id: uuidv4(), type: 'section_regenerated', label: `PRD section "${target}" regenerated`, timestamp: now, target } }
+        $set: { [updateKey]: newContent, [diffKey]: diffRef, [`section_statuses.${target}`]: 'needs_review', updated_at: now },
+        $inc: { version: 1 },
+        $push: historyPush(history)
       });
+      await appendBriefHistory(db, briefId, history);
     } else if (type === 'stakeholder' && target && brief.entities) {
       const shPrompt = `Regenerate critique for the ${target} stakeholder regarding: ${brief.title}\n\nContext: ${brief.entities.feature_summary}\nIndustry: ${brief.industry_context}\n\nReturn JSON: {"concerns": ["..."], "required_controls": ["..."], "required_approvals": ["..."], "questions": ["..."]}`;
-      const result = await callGemini(shPrompt);
+      const result = await callGemini(shPrompt, { cache: 'refresh' });
       const updateKey = `stakeholder_critiques.${target}`;
+      const history = {
+        revisions: [{ id: uuidv4(), timestamp: now, type: 'stakeholder_regeneration', summary: `Regenerated ${target} critique` }],
+        timeline_events: [{ id: uuidv4(), type: 'stakeholder_regenerated', label: `${target} critique regenerated`, timestamp: now, target }],
+      };
       await db.collection('decision_briefs').updateOne({ id: briefId }, {
         $set: { [updateKey]: result, updated_at: now },
-        $push: { revisions: { id: uuidv4(), timestamp: now, type: 'stakeholder_regeneration', summary: `Regenerated ${target} critique` }, timeline_events: { id: uuidv4(), type: 'stakeholder_regenerated', label: `${target} critique regenerated`, timestamp: now, target } }
+        $inc: { version: 1 },
+        $push: historyPush(history)
       });
+      await appendBriefHistory(db, briefId, history);
     }
-    const updated = await db.collection('decision_briefs').findOne({ id: briefId });
+    const updated = await storeReadiness(db, await db.collection('decision_briefs').findOne({ id: briefId }));
     return NextResponse.json({ brief: updated });
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 });
   }
 }
 
+// ========== HISTORY HANDLERS ==========
+// Newest-first pages over the append-only history collections:
+// ?limit= (max 200) and ?cursor= (the previous page's next_cursor)
+async function handleBriefHistory(request, briefId, kind) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const db = await connectToDatabase();
+  const brief = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { _id: 1 } });
+  if (!brief) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  const params = new URL(request.url).searchParams;
+  const section = params.get('section');
+  const page = await listBriefHistory(db, kind, briefId, {
+    cursor: params.get('cursor'),
+    limit: params.get('limit'),
+    // Diff listings stay light; fetch /diffs/:diffId for the text
+    ...(kind === 'regeneration_diffs' ? { filter: section ? { section } : {}, projection: { old_content: 0, new_content: 0 } } : {}),
+  });
+  return NextResponse.json(page);
+}
+
+async function handleGetRegenerationDiff(request, briefId, diffId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const db = await connectToDatabase();
+  const brief = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { _id: 1 } });
+  if (!brief) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  const diff = await getRegenerationDiff(db, briefId, diffId);
+  if (!diff) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  return NextResponse.json({ diff });
+}
+
 // ========== SECTION STATUS HANDLER ==========
 async function handleSectionStatus(request, briefId) {
   const user = await getUser(request);
@@ -570,14 +1088,130 @@ async function handleSectionStatus(request, briefId) {
   }
   const db = await connectToDatabase();
   const updateKey = `section_statuses.${section}`;
-  await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, {
+  const history = { timeline_events: [{ id: uuidv4(), type: 'status_changed', label: `"${section}" marked as ${status.replace('_', ' ')}`, timestamp: new Date().toISOString(), target: section, status }] };
+  const { matchedCount } = await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, {
     $set: { [updateKey]: status, updated_at: new Date().toISOString() },
-    $push: { timeline_events: { id: uuidv4(), type: 'status_changed', label: `"${section}" marked as ${status.replace('_', ' ')}`, timestamp: new Date().toISOString(), target: section, status } }
+    $inc: { version: 1 },
+    $push: historyPush(history)
   });
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
+  if (matchedCount) await appendBriefHistory(db, briefId, history);
+  const brief = await storeReadiness(db, await db.collection('decision_briefs').findOne({ id: briefId }));
   return NextResponse.json({ brief });
 }
 
+// ========== CHECKLIST PATCH ==========
+// Item fields PATCH /briefs/:id/checklist may set, with their types
+const CHECKLIST_ITEM_FIELDS = { checked: 'boolean', owner: 'string', include_in_export: 'boolean' };
+const CHECKLIST_MAX_OPS = 100;
+
+// Gives every checklist item a stable id, so edits can target it by id
+function withChecklistIds(checklist) {
+  if (!checklist || typeof checklist !== 'object') return checklist;
+  return Object.fromEntries(Object.entries(checklist).map(([category, items]) => [
+    category,
+    Array.isArray(items) ? items.map(item => (item && !item.id ? { ...item, id: uuidv4() } : item)) : items,
+  ]));
+}
+
+// Folds PATCH ops into one update: $set paths per item, arrayFilters for
+// id targets, and query conditions that only match if every target exists
+function checklistPatch(ops) {
+  const $set = {};
+  const arrayFilters = [];
+  const conditions = [];
+  const targets = new Map();
+  const filterNames = new Map();
+  for (const op of ops) {
+    const category = op?.category;
+    if (typeof category !== 'string' || !category || category.includes('.') || category.startsWith('$')) {
+      return { error: `Invalid checklist category "${category}"` };
+    }
+    const fields = Object.keys(CHECKLIST_ITEM_FIELDS).filter(f => f in op);
+    if (!fields.length) return { error: `Each operation must set one of ${Object.keys(CHECKLIST_ITEM_FIELDS).join(', ')}` };
+    const invalid = fields.find(f => typeof op[f] !== CHECKLIST_ITEM_FIELDS[f]);
+    if (invalid) return { error: `"${invalid}" must be a ${CHECKLIST_ITEM_FIELDS[invalid]}` };
+
+    let itemPath;
+    if (typeof op.id === 'string' && op.id) {
+      const key = `${category}\u0000${op.id}`;
+      if (!filterNames.has(key)) {
+        filterNames.set(key, `i${filterNames.size}`);
+        arrayFilters.push({ [`${filterNames.get(key)}.id`]: op.id });
+        conditions.push({ [`checklist.${category}.id`]: op.id });
+      }
+      itemPath = `checklist.${category}.$[${filterNames.get(key)}]`;
+      targets.set(key, { category, id: op.id });
+    } else if (Number.isInteger(op.index) && op.index >= 0) {
+      itemPath = `checklist.${category}.${op.index}`;
+      conditions.push({ [itemPath]: { $type: 'object' } });
+      targets.set(`${category}\u0000${op.index}`, { category, index: op.index });
+    } else {
+      return { error: 'Each operation needs an item id or index' };
+    }
+    fields.forEach(f => { $set[`${itemPath}.${f}`] = op[f]; });
+  }
+  return { $set, arrayFilters, conditions, targets: [...targets.values()] };
+}
+
+// PATCH { version?, ops: [{ category, id | index, checked?, owner?, include_in_export? }] }
+// applies every op in one atomic update. With `version` (the brief's
+// checklist_version) the batch only applies if nobody changed the checklist
+// since; otherwise ops are per-item sets and concurrent edits to other items merge.
+// Returns the new version and just the touched items.
+async function handlePatchChecklist(request, briefId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const body = await request.json().catch(() => null);
+  const ops = body?.ops;
+  if (!Array.isArray(ops) || ops.length === 0 || ops.length > CHECKLIST_MAX_OPS) {
+    return NextResponse.json({ error: `ops must be an array of 1-${CHECKLIST_MAX_OPS} operations` }, { status: 400 });
+  }
+  const { version } = body;
+  if (version !== undefined && !(Number.isInteger(version) && version >= 0)) {
+    return NextResponse.json({ error: 'version must be a non-negative integer' }, { status: 400 });
+  }
+  const patch = checklistPatch(ops);
+  if (patch.error) return NextResponse.json({ error: patch.error }, { status: 400 });
+
+  const db = await connectToDatabase();
+  const filter = { id: briefId, user_id: user.id, $and: patch.conditions };
+  // Briefs saved before versioning have no checklist_version; they count as 0
+  if (version !== undefined) filter.checklist_version = version === 0 ? { $in: [0, null] } : version;
+  let doc;
+  try {
+    doc = await db.collection('decision_briefs').findOneAndUpdate(filter, {
+      $set: { ...patch.$set, updated_at: new Date().toISOString() },
+      $inc: { checklist_version: 1, version: 1 },
+    }, {
+      returnDocument: 'after',
+      projection: { ...READINESS_PROJECTION, checklist_version: 1 },
+      ...(patch.arrayFilters.length ? { arrayFilters: patch.arrayFilters } : {}),
+    });
+  } catch (error) {
+    // The same item addressed by both id and index
+    if (error.code === 40) return NextResponse.json({ error: 'Operations target the same item more than once' }, { status: 400 });
+    throw error;
+  }
+
+  if (!doc) {
+    const current = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id }, { projection: { _id: 0, checklist: 1, checklist_version: 1 } });
+    if (!current) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+    const currentVersion = current.checklist_version || 0;
+    if (version !== undefined && currentVersion !== version) {
+      return NextResponse.json({ error: 'Checklist was changed by someone else', checklist_version: currentVersion, checklist: current.checklist }, { status: 409 });
+    }
+    return NextResponse.json({ error: 'Checklist item not found' }, { status: 404 });
+  }
+
+  const { readiness, version: storedVersion } = await storeReadiness(db, doc);
+  const items = patch.targets.map(({ category, id, index }) => {
+    const list = doc.checklist?.[category] || [];
+    const i = id ? list.findIndex(item => item?.id === id) : index;
+    return { category, index: i, ...list[i] };
+  });
+  return NextResponse.json({ version: storedVersion, checklist_version: doc.checklist_version, updated_at: doc.updated_at, items, readiness });
+}
+
 // ========== ASSUMPTIONS HANDLER ==========
 async function handleAssumptions(request, briefId) {
   const user = await getUser(request);
@@ -586,11 +1220,14 @@ async function handleAssumptions(request, briefId) {
   if (!description) return NextResponse.json({ error: 'Description required' }, { status: 400 });
   const db = await connectToDatabase();
   const assumption = { id: uuidv4(), description, source: source || 'user', confidence: confidence || 'medium', created_at: new Date().toISOString() };
-  await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, {
-    $push: { assumptions: assumption, timeline_events: { id: uuidv4(), type: 'assumption_added', label: `Assumption added: "${description.slice(0, 60)}..."`, timestamp: new Date().toISOString() } },
-    $set: { updated_at: new Date().toISOString() }
+  const history = { timeline_events: [{ id: uuidv4(), type: 'assumption_added', label: `Assumption added: "${description.slice(0, 60)}..."`, timestamp: new Date().toISOString() }] };
+  const { matchedCount } = await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, {
+    $push: { assumptions: assumption, ...historyPush(history) },
+    $set: { updated_at: new Date().toISOString() },
+    $inc: { version: 1 }
   });
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
+  if (matchedCount) await appendBriefHistory(db, briefId, history);
+  const brief = await storeReadiness(db, await db.collection('decision_briefs').findOne({ id: briefId }));
   return NextResponse.json({ brief });
 }
 
@@ -600,9 +1237,10 @@ async function handleDeleteAssumption(request, briefId, assumptionId) {
   const db = await connectToDatabase();
   await db.collection('decision_briefs').updateOne({ id: briefId, user_id: user.id }, {
     $pull: { assumptions: { id: assumptionId } },
-    $set: { updated_at: new Date().toISOString() }
+    $set: { updated_at: new Date().toISOString() },
+    $inc: { version: 1 }
   });
-  const brief = await db.collection('decision_briefs').findOne({ id: briefId });
+  const brief = await storeReadiness(db, await db.collection('decision_briefs').findOne({ id: briefId }));
   return NextResponse.json({ brief });
 }
 
@@ -613,16 +1251,367 @@ async function handleRefreshSummary(request, briefId) {
   const db = await connectToDatabase();
   const brief = await db.collection('decision_briefs').findOne({ id: briefId, user_id: user.id });
   if (!brief || !brief.entities) return NextResponse.json({ error: 'Brief not generated' }, { status: 400 });
+  const body = await request.json().catch(() => ({}));
   const riskLevels = brief.stakeholder_risk_levels || computeStakeholderRiskLevels(brief.stakeholder_critiques, brief.entities);
-  const summary = await generateExecutiveSummary(brief, brief.entities, brief.stakeholder_critiques, brief.checklist, riskLevels);
+  // A refresh asks the model again unless the caller opts into the cache with { fresh: false }
+  const summary = await generateExecutiveSummary(brief, brief.entities, brief.stakeholder_critiques, brief.checklist, riskLevels, { cache: body?.fresh === false ? 'use' : 'refresh' });
+  const history = { timeline_events: [{ id: uuidv4(), type: 'summary_refreshed', label: 'Executive summary refreshed', timestamp: new Date().toISOString() }] };
   await db.collection('decision_briefs').updateOne({ id: briefId }, {
     $set: { executive_summary: summary, updated_at: new Date().toISOString() },
-    $push: { timeline_events: { id: uuidv4(), type: 'summary_refreshed', label: 'Executive summary refreshed', timestamp: new Date().toISOString() } }
+    $inc: { version: 1 },
+    $push: historyPush(history)
   });
+  await appendBriefHistory(db, briefId, history);
   const updated = await db.collection('decision_briefs').findOne({ id: briefId });
   return NextResponse.json({ brief: updated });
 }
 
+// ========== PORTFOLIO ==========
+const READINESS_BUCKETS = [0, 20, 40, 60, 80, 101];
+
+// Readiness across all of the user's briefs, from the stored `readiness`
+// field in one read-only aggregation. Complete briefs whose score predates
+// READINESS_SCHEMA are counted as `unscored` until they are opened or
+// scripts/backfill-readiness.mjs runs.
+async function handleReadinessPortfolio(request) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const db = await connectToDatabase();
+  const briefs = db.collection('decision_briefs');
+
+  const complete = { $match: { status: 'complete', 'readiness.schema': READINESS_SCHEMA } };
+  const [result] = await briefs.aggregate([
+    { $match: { user_id: user.id } },
+    { $project: { _id: 0, id: 1, title: 1, status: 1, industry_context: 1, updated_at: 1, readiness: 1 } },
+    {
+      $facet: {
+        statuses: [{ $group: { _id: '$status', count: { $sum: 1 } } }],
+        unscored: [{ $match: { status: 'complete', 'readiness.schema': { $ne: READINESS_SCHEMA } } }, { $count: 'count' }],
+        tiers: [complete, { $group: { _id: '$readiness.tier', count: { $sum: 1 } } }],
+        distribution: [complete, { $bucket: { groupBy: '$readiness.score', boundaries: READINESS_BUCKETS, default: 'other', output: { count: { $sum: 1 } } } }],
+        summary: [complete, { $group: { _id: null, briefs: { $sum: 1 }, average: { $avg: '$readiness.score' }, min: { $min: '$readiness.score' }, max: { $max: '$readiness.score' } } }],
+        blockers: [
+          complete,
+          { $unwind: '$readiness.blockers' },
+          { $group: { _id: '$readiness.blockers.key', briefs: { $sum: 1 }, total_penalty: { $sum: '$readiness.blockers.penalty' } } },
+          { $sort: { total_penalty: -1, briefs: -1 } },
+          { $limit: 10 },
+        ],
+        by_industry: [
+          complete,
+          { $group: { _id: '$industry_context', briefs: { $sum: 1 }, average: { $avg: '$readiness.score' } } },
+          { $sort: { average: 1 } },
+        ],
+        lowest: [
+          complete,
+          { $sort: { 'readiness.score': 1, updated_at: -1 } },
+          { $limit: 5 },
+          { $project: { id: 1, title: 1, score: '$readiness.score', tier: '$readiness.tier' } },
+        ],
+      },
+    },
+  ]).toArray();
+
+  const counts = rows => Object.fromEntries(rows.map(r => [r._id, r.count]));
+  const summary = result.summary[0] || { briefs: 0, average: null, min: null, max: null };
+  return NextResponse.json({
+    briefs: result.statuses.reduce((n, r) => n + r.count, 0),
+    statuses: counts(result.statuses),
+    scored: summary.briefs,
+    unscored: result.unscored[0]?.count || 0,
+    average_score: summary.average === null ? null : Math.round(summary.average),
+    min_score: summary.min,
+    max_score: summary.max,
+    tiers: { high: 0, medium: 0, low: 0, ...counts(result.tiers) },
+    distribution: READINESS_BUCKETS.slice(0, -1).map((min, i) => ({
+      min,
+      max: READINESS_BUCKETS[i + 1] - 1,
+      count: result.distribution.find(b => b._id === min)?.count || 0,
+    })),
+    top_blockers: result.blockers.map(b => ({
+      key: b._id, label: READINESS_FACTORS[b._id] || b._id, briefs: b.briefs, total_penalty: b.total_penalty,
+    })),
+    by_industry: result.by_industry.map(i => ({ industry: i._id, briefs: i.briefs, average_score: Math.round(i.average) })),
+    lowest: result.lowest,
+  });
+}
+
+// ========== BULK IMPORT ==========
+const IMPORT_CHUNK_SIZE = parseInt(process.env.BRIEF_IMPORT_CHUNK_SIZE || '100', 10);
+const IMPORT_MAX_ROWS = parseInt(process.env.BRIEF_IMPORT_MAX_ROWS || '1000', 10);
+
+// Inserts one chunk of validated rows and, with `generate`, queues them.
+// Returns a progress line per row; a failed row or chunk write never throws.
+async function importChunk(db, rows, { user, importId, generate }) {
+  const briefs = rows.map(({ line, fields }) => newBriefDocument(user.id, fields, {
+    label: 'Decision brief imported',
+    import_id: importId,
+    import_line: line,
+    // Queued up front, so a brief is never visible as a draft that is about to generate
+    ...(generate ? { status: 'generating', generation_stage: 'queued', generation_running: [], generation_job_id: uuidv4(), error_message: null, status_before_generation: 'draft' } : {}),
+  }));
+  const failed = new Map();
+  try {
+    await db.collection('decision_briefs').insertMany(briefs, { ordered: false });
+  } catch (error) {
+    const writeErrors = [].concat(error?.writeErrors || []);
+    if (!writeErrors.length) writeErrors.push(...briefs.map((_, index) => ({ index, errmsg: error?.message })));
+    writeErrors.forEach(e => failed.set(briefs[e.index].id, e.errmsg || 'Insert failed'));
+  }
+  const inserted = briefs.filter(b => !failed.has(b.id));
+  if (inserted.length) {
+    await db.collection(HISTORY_COLLECTIONS.timeline_events)
+      .insertMany(inserted.map(b => ({ ...b.timeline_events[0], brief_id: b.id })), { ordered: false })
+      .catch(error => console.error(`Import ${importId}: timeline events not recorded:`, error?.message || error));
+  }
+
+  let queueError = null;
+  let skipped = new Set();
+  if (generate && inserted.length) {
+    // Shares the generation workers (and their per-user cap) and the model router's quota with every other job
+    const unqueue = ids => db.collection('decision_briefs').updateMany({ id: { $in: ids } }, {
+      $set: { status: 'draft', generation_stage: null, generation_job_id: null, updated_at: new Date().toISOString() },
+      $inc: { version: 1 },
+    });
+    try {
+      const result = await generationJobs.enqueueMany(inserted.map(b => ({ id: b.generation_job_id, type: 'generate', brief_id: b.id, user_id: user.id, options: { cache: 'use', resume: true } })));
+      skipped = new Set(result.skipped);
+      // Briefs whose job was not created would otherwise sit in 'generating' forever
+      if (skipped.size) await unqueue(inserted.filter(b => skipped.has(b.generation_job_id)).map(b => b.id));
+    } catch (error) {
+      queueError = error?.message || String(error);
+      await unqueue(inserted.map(b => b.id));
+    }
+  }
+
+  return briefs.map((b, i) => {
+    const { line } = rows[i];
+    if (failed.has(b.id)) return { type: 'row', line, status: 'failed', error: failed.get(b.id) };
+    if (!generate) return { type: 'row', line, status: 'created', brief_id: b.id };
+    if (queueError) return { type: 'row', line, status: 'created', brief_id: b.id, error: `Not queued for generation: ${queueError}` };
+    if (skipped.has(b.generation_job_id)) return { type: 'row', line, status: 'skipped', brief_id: b.id, error: 'Not queued for generation: the brief already has an active job' };
+    return { type: 'row', line, status: 'queued', brief_id: b.id, job_id: b.generation_job_id };
+  });
+}
+
+// Streams NDJSON (default) or CSV (?format=csv or a text/csv body) into briefs,
+// IMPORT_CHUNK_SIZE rows per insertMany; ?generate=true queues each imported
+// brief for generation. The response is NDJSON: one progress line per row
+// ({ type: 'row', line, status: created | queued | skipped | invalid | failed }), then a
+// summary. A skipped row's brief was created but not queued.
+async function handleImportBriefs(request) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  if (!request.body) return NextResponse.json({ error: 'Request body required' }, { status: 400 });
+  const params = new URL(request.url).searchParams;
+  const format = params.get('format') || ((request.headers.get('content-type') || '').includes('csv') ? 'csv' : 'ndjson');
+  if (!['csv', 'ndjson'].includes(format)) return NextResponse.json({ error: 'format must be csv or ndjson' }, { status: 400 });
+  const generate = ['1', 'true'].includes(params.get('generate'));
+  const db = await connectToDatabase();
+  const imports = db.collection('brief_imports');
+  const batch = {
+    id: uuidv4(), user_id: user.id, format, generate, status: 'running',
+    rows: 0, created: 0, queued: 0, skipped: 0, invalid: 0, failed: 0, error: null,
+    created_at: new Date().toISOString(), finished_at: null,
+  };
+  await imports.insertOne(batch);
+
+  const encoder = new TextEncoder();
+  const stream = new ReadableStream({
+    async start(controller) {
+      let open = true;
+      const emit = obj => {
+        if (!open) return;
+        try { controller.enqueue(encoder.encode(`${JSON.stringify(obj)}\n`)); } catch { open = false; }
+      };
+      const totals = { rows: 0, created: 0, queued: 0, skipped: 0, invalid: 0, failed: 0 };
+      const record = lines => {
+        const delta = { rows: lines.length, created: 0, queued: 0, skipped: 0, invalid: 0, failed: 0 };
+        lines.forEach(l => {
+          if (l.status === 'queued' || l.status === 'skipped') delta.created++;
+          delta[l.status]++;
+          emit(l);
+        });
+        Object.keys(delta).forEach(k => { totals[k] += delta[k]; });
+        return imports.updateOne({ id: batch.id }, { $inc: delta });
+      };
+
+      emit({ type: 'started', import_id: batch.id, format, generate });
+      let error = null;
+      let pending = [];
+      let invalid = [];
+      const flush = async () => {
+        const rows = pending;
+        pending = [];
+        const lines = [...invalid, ...(rows.length ? await importChunk(db, rows, { user, importId: batch.id, generate }) : [])];
+        invalid = [];
+        if (lines.length) await record(lines.sort((a, b) => a.line - b.line));
+      };
+      try {
+        for await (const { line, row, error: parseError } of (format === 'csv' ? parseCsv : parseNdjson)(request.body)) {
+          if (totals.rows + pending.length + invalid.length >= IMPORT_MAX_ROWS) {
+            error = `Import is limited to ${IMPORT_MAX_ROWS} rows; rows from line ${line} on were not read`;
+            break;
+          }
+          const result = parseError ? { error: parseError } : validateImportRow(row);
+          if (result.error) invalid.push({ type: 'row', line, status: 'invalid', error: result.error });
+          else pending.push({ line, fields: result.brief });
+          if (pending.length + invalid.length >= IMPORT_CHUNK_SIZE) await flush();
+        }
+      } catch (readError) {
+        error = readError?.message || String(readError);
+      }
+      try {
+        await flush();
+      } catch (writeError) {
+        error = error || writeError?.message || String(writeError);
+      }
+
+      const status = error && totals.created === 0 ? 'failed' : 'complete';
+      await imports.updateOne({ id: batch.id }, { $set: { status, error, finished_at: new Date().toISOString() } })
+        .catch(err => console.error(`Import ${batch.id}: status not recorded:`, err?.message || err));
+      emit({ type: 'summary', import_id: batch.id, status, error, ...totals });
+      if (open) { open = false; controller.close(); }
+    },
+  });
+
+  return new Response(stream, {
+    status: 202,
+    headers: { 'Content-Type': 'application/x-ndjson; charset=utf-8', 'Cache-Control': 'no-cache, no-transform' },
+  });
+}
+
+// Batch counters plus the current status of every brief it created
+async function handleGetImport(request, importId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const db = await connectToDatabase();
+  const batch = await db.collection('brief_imports').findOne({ id: importId, user_id: user.id }, { projection: { _id: 0, user_id: 0 } });
+  if (!batch) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  const briefs = await db.collection('decision_briefs')
+    .find({ user_id: user.id, import_id: importId }, { projection: { _id: 0, id: 1, title: 1, status: 1, generation_stage: 1, generation_job_id: 1, error_message: 1, import_line: 1 } })
+    .sort({ import_line: 1 })
+    .toArray();
+  const statuses = {};
+  briefs.forEach(b => { statuses[b.status] = (statuses[b.status] || 0) + 1; });
+  return NextResponse.json({ import: batch, statuses, briefs });
+}
+
+// ========== EXPORTS ==========
+// Renderings are keyed by brief version, which every mutation bumps, so an
+// entry is never stale and nothing has to invalidate it
+const exportCache = createLruCache({ max: parseInt(process.env.EXPORT_CACHE_SIZE || '200', 10) });
+const exportCacheStats = { hits: 0, misses: 0 };
+const EXPORT_ARCHIVE_BATCH_SIZE = parseInt(process.env.EXPORT_ARCHIVE_BATCH_SIZE || '50', 10);
+
+const exportCacheKey = (brief, format) => `${brief.id}:${brief.version || 0}:${brief.updated_at}:${format}`;
+
+function getExportCacheStats() {
+  const lookups = exportCacheStats.hits + exportCacheStats.misses;
+  return { ...exportCacheStats, hit_rate: lookups > 0 ? exportCacheStats.hits / lookups : 0, entries: exportCache.size };
+}
+
+// `store: false` reads the cache without filling it, so a full archive pass
+// doesn't evict the renderings of briefs being worked on
+function cachedExport(brief, format, { store = true } = {}) {
+  const key = exportCacheKey(brief, format);
+  const hit = exportCache.get(key);
+  if (hit !== undefined) { exportCacheStats.hits++; return hit; }
+  exportCacheStats.misses++;
+  const body = renderExport(brief, format);
+  if (store) exportCache.set(key, body);
+  return body;
+}
+
+const contentDisposition = (type, filename) => `${type}; filename="${filename}"`;
+
+// GET /briefs/:id/export?format=md|json|csv[&download=1]
+async function handleExportBrief(request, briefId) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const params = new URL(request.url).searchParams;
+  const format = params.get('format') || 'md';
+  if (!EXPORT_FORMATS[format]) return NextResponse.json({ error: `format must be one of ${Object.keys(EXPORT_FORMATS).join(', ')}` }, { status: 400 });
+  const db = await connectToDatabase();
+  const briefs = db.collection('decision_briefs');
+
+  // Cache hits and revalidations only read the version
+  const head = await briefs.findOne({ id: briefId, user_id: user.id }, { projection: { _id: 0, id: 1, title: 1, version: 1, updated_at: 1 } });
+  if (!head) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  const headers = brief => ({
+    ETag: briefETag(brief.version, [`export:${format}`]),
+    'Cache-Control': BRIEF_CACHE_CONTROL,
+    'Content-Type': EXPORT_FORMATS[format].contentType,
+    'Content-Disposition': contentDisposition(params.get('download') ? 'attachment' : 'inline', exportFilename(brief, format)),
+  });
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch && etagMatches(ifNoneMatch, headers(head).ETag)) return new NextResponse(null, { status: 304, headers: headers(head) });
+
+  let body = exportCache.get(exportCacheKey(head, format));
+  let brief = head;
+  if (body !== undefined) {
+    exportCacheStats.hits++;
+  } else {
+    brief = await briefs.findOne({ id: briefId, user_id: user.id }, { projection: EXPORT_PROJECTION });
+    if (!brief) return NextResponse.json({ error: 'Not found' }, { status: 404 });
+    body = cachedExport(brief, format);
+  }
+  return new NextResponse(body, { headers: headers(brief) });
+}
+
+// GET /exports?format=ndjson|zip — every brief the user owns, newest first.
+// Briefs are read through a cursor and rendered one at a time as the client
+// pulls, so memory stays at one cursor batch however large the portfolio.
+// NDJSON lines are JSON export documents; the zip holds a .md and .json per brief.
+async function handleExportArchive(request) {
+  const user = await getUser(request);
+  if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const format = new URL(request.url).searchParams.get('format') || 'ndjson';
+  if (!['ndjson', 'zip'].includes(format)) return NextResponse.json({ error: 'format must be ndjson or zip' }, { status: 400 });
+  const db = await connectToDatabase();
+  const cursor = db.collection('decision_briefs')
+    .find({ user_id: user.id }, { projection: EXPORT_PROJECTION })
+    .sort({ updated_at: -1, id: -1 })
+    .batchSize(EXPORT_ARCHIVE_BATCH_SIZE);
+
+  const encoder = new TextEncoder();
+  const zip = format === 'zip' ? createZipWriter() : null;
+  const stream = new ReadableStream({
+    async pull(controller) {
+      try {
+        const brief = await cursor.next();
+        if (!brief) {
+          if (zip) controller.enqueue(zip.finish());
+          controller.close();
+          return;
+        }
+        if (!zip) {
+          controller.enqueue(encoder.encode(`${JSON.stringify(exportDocument(brief))}\n`));
+          return;
+        }
+        const modified = new Date(brief.updated_at || brief.created_at);
+        ['md', 'json'].forEach(f => controller.enqueue(zip.entry(`briefs/${exportFilename(brief, f)}`, cachedExport(brief, f, { store: false }), modified)));
+      } catch (error) {
+        console.error('Export archive failed:', error?.message || error);
+        await cursor.close().catch(() => {});
+        controller.error(error);
+      }
+    },
+    async cancel() {
+      await cursor.close();
+    },
+  });
+
+  const filename = `regulapm-briefs-${new Date().toISOString().slice(0, 10)}.${format}`;
+  return new Response(stream, {
+    headers: {
+      'Content-Type': format === 'zip' ? 'application/zip' : 'application/x-ndjson; charset=utf-8',
+      'Content-Disposition': contentDisposition('attachment', filename),
+      'Cache-Control': 'no-store, no-transform',
+    },
+  });
+}
+
 // ========== SEED HANDLER ==========
 async function handleSeed(request) {
   const user = await getUser(request);
@@ -637,21 +1626,21 @@ async function handleSeed(request) {
       input_type: 'feature_idea', main_input: 'Enable instant payouts for small and medium business customers, allowing them to receive funds within minutes instead of the standard 2-3 business day settlement. This involves integrating with real-time payment rails (RTP/FedNow), implementing fraud detection for instant transactions, and building a tiered eligibility system based on merchant risk profiles.',
       industry_context: 'Fintech', data_sensitivity: ['PII', 'Financial transactions'], geography: 'US', launch_type: 'beta', risk_tolerance: 'low',
       entities: null, graph: null, prd_sections: null, stakeholder_critiques: null, checklist: null, traceability: null,
-      revisions: [], created_at: new Date().toISOString(), updated_at: new Date().toISOString()
+      revisions: [], version: 1, created_at: new Date().toISOString(), updated_at: new Date().toISOString()
     },
     {
       id: uuidv4(), user_id: user.id, title: 'Patient Appointment Reminders via SMS', status: 'draft',
       input_type: 'feature_idea', main_input: 'Implement automated SMS appointment reminders for patients, including confirmation, rescheduling options, and no-show follow-ups. Must comply with HIPAA for PHI handling, support multiple languages, and integrate with existing EHR systems. Include opt-in/opt-out management and audit trails.',
       industry_context: 'Healthcare', data_sensitivity: ['PII', 'Health data'], geography: 'US', launch_type: 'GA', risk_tolerance: 'low',
       entities: null, graph: null, prd_sections: null, stakeholder_critiques: null, checklist: null, traceability: null,
-      revisions: [], created_at: new Date().toISOString(), updated_at: new Date().toISOString()
+      revisions: [], version: 1, created_at: new Date().toISOString(), updated_at: new Date().toISOString()
     },
     {
       id: uuidv4(), user_id: user.id, title: 'Enterprise SSO Rollout', status: 'draft',
       input_type: 'feature_idea', main_input: 'Roll out SAML-based Single Sign-On for enterprise customers, supporting identity providers like Okta, Azure AD, and Google Workspace. Includes just-in-time user provisioning, role mapping from IdP groups, session management policies, and admin dashboard for SSO configuration. Must support multi-tenant isolation.',
       industry_context: 'Enterprise SaaS', data_sensitivity: ['PII'], geography: 'Global', launch_type: 'GA', risk_tolerance: 'medium',
       entities: null, graph: null, prd_sections: null, stakeholder_critiques: null, checklist: null, traceability: null,
-      revisions: [], created_at: new Date().toISOString(), updated_at: new Date().toISOString()
+      revisions: [], version: 1, created_at: new Date().toISOString(), updated_at: new Date().toISOString()
     }
   ];
 
@@ -659,8 +1648,38 @@ async function handleSeed(request) {
   return NextResponse.json({ message: 'Seeded 3 demo briefs', briefs: seedBriefs });
 }
 
+// ========== METRICS ==========
+// Prometheus scrape target. Scrapers send METRICS_TOKEN as a bearer token; with
+// no token configured the endpoint is off unless METRICS_PUBLIC=true.
+function handleMetrics(request) {
+  const token = process.env.METRICS_TOKEN;
+  if (!token && process.env.METRICS_PUBLIC !== 'true') return NextResponse.json({ error: 'Metrics are disabled; set METRICS_TOKEN' }, { status: 403 });
+  if (token && request.headers.get('authorization') !== `Bearer ${token}`) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  const body = renderMetrics({
+    regulapm_ai_cache: getGeminiCacheStats(),
+    regulapm_ai_backend: getModelBackendStats(),
+    regulapm_ai_router: modelRouter.stats(),
+    regulapm_session_cache: getSessionCacheStats(),
+    regulapm_export_cache: getExportCacheStats(),
+    regulapm_generation_jobs: generationJobs.stats(),
+  });
+  return new NextResponse(body, { headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Cache-Control': 'no-store' } });
+}
+
 // ========== ROUTE MATCHING ==========
+// Path segments kept verbatim in the request metrics' route label; anything else is an id
+const ROUTE_SEGMENTS = new Set([
+  'auth', 'signup', 'login', 'logout', 'me', 'briefs', 'import', 'imports', 'jobs', 'cancel', 'portfolio', 'readiness', 'seed', 'metrics',
+  'export', 'exports', 'generate', 'regenerate', 'checklist', 'section-status', 'assumptions', 'executive-summary', 'events', 'timeline', 'revisions', 'diffs',
+]);
+
+function routeLabel(p) {
+  if (p.length > 4) return 'other';
+  return `/${p.map(seg => (ROUTE_SEGMENTS.has(seg) ? seg : ':id')).join('/')}`;
+}
+
 async function routeRequest(request, path, method) {
+  generationJobs.start(); // idempotent; picks up queued and orphaned jobs after a restart
   const p = path || [];
   const pathStr = p.join('/');
 
@@ -673,6 +1692,7 @@ async function routeRequest(request, path, method) {
   // Briefs collection
   if (pathStr === 'briefs' && method === 'GET') return handleListBriefs(request);
   if (pathStr === 'briefs' && method === 'POST') return handleCreateBrief(request);
+  if (pathStr === 'briefs/import' && method === 'POST') return handleImportBriefs(request);
 
   // Single brief
   if (p.length === 2 && p[0] === 'briefs') {
@@ -685,43 +1705,79 @@ async function routeRequest(request, path, method) {
   if (p.length === 3 && p[0] === 'briefs') {
     if (p[2] === 'generate' && method === 'POST') return handleGenerate(request, p[1]);
     if (p[2] === 'regenerate' && method === 'POST') return handleRegenerate(request, p[1]);
+    if (p[2] === 'checklist' && method === 'PATCH') return handlePatchChecklist(request, p[1]);
     if (p[2] === 'section-status' && method === 'PUT') return handleSectionStatus(request, p[1]);
     if (p[2] === 'assumptions' && method === 'POST') return handleAssumptions(request, p[1]);
     if (p[2] === 'executive-summary' && method === 'POST') return handleRefreshSummary(request, p[1]);
+    if (p[2] === 'events' && method === 'GET') return handleBriefEvents(request, p[1]);
+    if (p[2] === 'timeline' && method === 'GET') return handleBriefHistory(request, p[1], 'timeline_events');
+    if (p[2] === 'revisions' && method === 'GET') return handleBriefHistory(request, p[1], 'revisions');
+    if (p[2] === 'diffs' && method === 'GET') return handleBriefHistory(request, p[1], 'regeneration_diffs');
+    if (p[2] === 'export' && method === 'GET') return handleExportBrief(request, p[1]);
   }
 
   // Brief sub-resource actions
   if (p.length === 4 && p[0] === 'briefs' && p[2] === 'assumptions' && method === 'DELETE') {
     return handleDeleteAssumption(request, p[1], p[3]);
   }
+  if (p.length === 4 && p[0] === 'briefs' && p[2] === 'diffs' && method === 'GET') {
+    return handleGetRegenerationDiff(request, p[1], p[3]);
+  }
+
+  // Import batches
+  if (p.length === 2 && p[0] === 'imports' && method === 'GET') return handleGetImport(request, p[1]);
+
+  // Generation jobs
+  if (p.length === 2 && p[0] === 'jobs' && method === 'GET') return handleGetJob(request, p[1]);
+  if (p.length === 3 && p[0] === 'jobs' && p[2] === 'cancel' && method === 'POST') return handleCancelJob(request, p[1]);
+
+  // Portfolio
+  if (pathStr === 'portfolio/readiness' && method === 'GET') return handleReadinessPortfolio(request);
+  if (pathStr === 'exports' && method === 'GET') return handleExportArchive(request);
 
   // Seed
   if (pathStr === 'seed' && method === 'POST') return handleSeed(request);
 
-  // Health check
+  // Metrics
+  if (pathStr === 'metrics' && method === 'GET') return handleMetrics(request);
+
+  // Health check (public; cache, router and queue stats are on /api/metrics)
   if (pathStr === '' && method === 'GET') return NextResponse.json({ status: 'ok', app: 'RegulaPM Nexus' });
 
   return NextResponse.json({ error: 'Not found' }, { status: 404 });
 }
 
+// Latency until the handler returns its response; streamed bodies are not included
+async function timedRequest(request, path, method) {
+  const started = performance.now();
+  let status = 500;
+  try {
+    const response = await routeRequest(request, path, method);
+    status = response.status;
+    return response;
+  } finally {
+    metrics.httpRequests.observe({ method, route: routeLabel(path || []), status }, (performance.now() - started) / 1000);
+  }
+}
+
 export async function GET(request, { params }) {
-  const { path } = params;
-  return routeRequest(request, path, 'GET');
+  return timedRequest(request, params.path, 'GET');
 }
 
 export async function POST(request, { params }) {
-  const { path } = params;
-  return routeRequest(request, path, 'POST');
+  return timedRequest(request, params.path, 'POST');
 }
 
 export async function PUT(request, { params }) {
-  const { path } = params;
-  return routeRequest(request, path, 'PUT');
+  return timedRequest(request, params.path, 'PUT');
+}
+
+export async function PATCH(request, { params }) {
+  return timedRequest(request, params.path, 'PATCH');
 }
 
 export async function DELETE(request, { params }) {
-  const { path } = params;
-  return routeRequest(request, path, 'DELETE');
+  return timedRequest(request, params.path, 'DELETE');
 }
 
 export async function OPTIONS() {
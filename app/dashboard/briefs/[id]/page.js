@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect, useMemo, useCallback } from 'react';
+import { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import { useRouter, useParams } from 'next/navigation';
 import { ReactFlow, Background, Controls, MiniMap } from '@xyflow/react';
 import '@xyflow/react/dist/style.css';
@@ -12,19 +12,7 @@ import {
   CircleDot, ArrowUpRight, Info
 } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
-
-const SECTION_LABELS = {
-  problem_statement: 'Problem Statement',
-  goals: 'Goals',
-  non_goals: 'Non-Goals',
-  user_stories: 'User Stories',
-  functional_requirements: 'Functional Requirements',
-  compliance_risk_requirements: 'Compliance & Risk Requirements',
-  stakeholder_notes: 'Stakeholder Notes',
-  rollout_plan: 'Rollout Plan',
-  metrics: 'Metrics',
-  open_questions: 'Open Questions',
-};
+import { SECTION_LABELS } from '@/lib/brief-sections';
 
 const STAKEHOLDER_ICONS = {
   Security: Shield, Compliance: Scale, Legal: Landmark,
@@ -93,6 +81,19 @@ const RECOMMENDATION_LABELS = {
   no_go: 'No-Go', needs_further_review: 'Needs Further Review',
 };
 
+const GENERATION_STAGE_LABELS = {
+  queued: 'Waiting for a generation worker', entities: 'Extracting entities', graph: 'Building dependency graph', prd: 'Generating PRD sections',
+  stakeholders: 'Generating stakeholder critiques', checklist: 'Generating checklists',
+  traceability: 'Building traceability', summary: 'Writing executive summary', done: 'Complete!',
+};
+
+// Several pipeline stages can be in flight at once; list all of them
+function describeGenerationStage(brief) {
+  const running = brief.generation_running?.length ? brief.generation_running : [brief.generation_stage];
+  if (running[0] === 'done') return GENERATION_STAGE_LABELS.done;
+  return `${running.map(s => GENERATION_STAGE_LABELS[s] || s).join(' · ')}...`;
+}
+
 // ========== READINESS SCORE COMPONENT ==========
 function ReadinessBar({ readiness }) {
   if (!readiness) return null;
@@ -132,7 +133,7 @@ function DecisionTimeline({ events }) {
   const typeIcons = {
     created: CircleDot, generation_started: RefreshCw, entities_extracted: Eye,
     graph_built: GitBranch, prd_generated: FileText, stakeholders_generated: Users,
-    checklist_generated: CheckSquare, generation_complete: Check,
+    checklist_generated: CheckSquare, traceability_built: GitBranch, summary_generated: Gauge, generation_complete: Check,
     section_regenerated: RefreshCw, stakeholder_regenerated: RefreshCw,
     status_changed: ArrowUpRight, assumption_added: BookOpen, summary_refreshed: Gauge,
   };
@@ -166,6 +167,35 @@ function DecisionTimeline({ events }) {
   );
 }
 
+// Each tab fetches only the brief fields it renders (?fields=); the header,
+// readiness bar and generation state need the core fields on every fetch
+const BRIEF_CORE_FIELDS = ['title', 'status', 'industry_context', 'geography', 'risk_tolerance', 'launch_type', 'readiness', 'generation_stage', 'generation_running', 'generation_job_id', 'error_message'];
+const TAB_FIELDS = {
+  summary: ['executive_summary', 'stakeholder_risk_levels'],
+  prd: ['prd_sections', 'section_statuses', 'regeneration_diffs'],
+  stakeholders: ['stakeholder_critiques', 'stakeholder_risk_levels'],
+  checklist: ['checklist', 'checklist_version'],
+  graph: ['graph'],
+  assumptions: ['assumptions'],
+  history: ['timeline_events', 'revisions'],
+  // Rendered by GET /api/briefs/:id/export
+  export: [],
+};
+
+// Checklist edits are batched: rapid toggles are coalesced per item and sent
+// as one PATCH after the user pauses
+const CHECKLIST_DEBOUNCE_MS = 400;
+
+const checklistOpKey = (op) => `${op.category}:${op.id ?? op.index}`;
+
+function applyChecklistOp(checklist, op) {
+  const items = checklist?.[op.category];
+  const index = op.id ? items?.findIndex(i => i.id === op.id) : op.index;
+  if (!items?.[index]) return checklist;
+  const { category, id, index: _, ...fields } = op;
+  return { ...checklist, [category]: items.map((item, i) => (i === index ? { ...item, ...fields } : item)) };
+}
+
 export default function BriefWorkspace() {
   const router = useRouter();
   const params = useParams();
@@ -183,48 +213,126 @@ export default function BriefWorkspace() {
   const [genStage, setGenStage] = useState('');
   const [newAssumption, setNewAssumption] = useState({ description: '', source: 'user', confidence: 'medium' });
   const [showDiff, setShowDiff] = useState(null);
+  // The brief embeds only its latest events; older pages come from /timeline
+  const [timelinePages, setTimelinePages] = useState({ items: [], cursor: null, loaded: false, loading: false });
+  const [exportPreview, setExportPreview] = useState({ key: null, text: '' });
+
+  const checklistOps = useRef(new Map());
+  const checklistTimer = useRef(null);
+  const checklistSync = useRef(Promise.resolve());
+  const checklistVersion = useRef(0);
 
   useEffect(() => { setMounted(true); }, []);
+  useEffect(() => { checklistVersion.current = brief?.checklist_version ?? 0; }, [brief?.checklist_version]);
+
+  // Fields that are current for `loaded.version`; a full brief from a mutation marks everything loaded
+  const loaded = useRef({ version: null, fields: new Set(), all: false });
+  const activeTabRef = useRef(activeTab);
+  activeTabRef.current = activeTab;
 
-  const fetchBrief = useCallback(async () => {
+  const applyBrief = useCallback((next) => {
+    loaded.current = { version: next.version ?? 0, fields: new Set(), all: true };
+    setBrief(next);
+  }, []);
+
+  // Unchanged briefs come back as 304s: the API sends an ETag and the browser revalidates
+  const fetchBrief = useCallback(async (fields = TAB_FIELDS[activeTabRef.current]) => {
     if (!briefId) return;
     try {
-      const res = await fetch(`/api/briefs/${briefId}`);
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); }
+      const selected = [...new Set([...BRIEF_CORE_FIELDS, ...fields])];
+      const res = await fetch(`/api/briefs/${briefId}?fields=${selected.join(',')}`);
+      if (res.ok) {
+        const data = await res.json();
+        if (loaded.current.version !== (data.brief.version ?? 0)) loaded.current = { version: data.brief.version ?? 0, fields: new Set(), all: false };
+        selected.forEach(f => loaded.current.fields.add(f));
+        setBrief(prev => ({ ...(prev?.id === data.brief.id ? prev : {}), ...data.brief }));
+        if (data.brief.status === 'generating') setGenerating(true);
+      }
     } catch {} finally { setLoading(false); }
   }, [briefId]);
 
   useEffect(() => { fetchBrief(); }, [fetchBrief]);
 
+  useEffect(() => {
+    if (!brief || loaded.current.all) return;
+    const missing = TAB_FIELDS[activeTab].filter(f => !loaded.current.fields.has(f));
+    if (missing.length) fetchBrief(missing);
+  }, [activeTab, brief, fetchBrief]);
+
+  const loadTimelinePage = useCallback(async (cursor) => {
+    setTimelinePages(prev => ({ ...prev, loading: true }));
+    try {
+      const res = await fetch(`/api/briefs/${briefId}/timeline${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`);
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error);
+      setTimelinePages(prev => ({ items: cursor ? [...prev.items, ...data.items] : data.items, cursor: data.next_cursor, loaded: true, loading: false }));
+    } catch { setTimelinePages(prev => ({ ...prev, loaded: true, loading: false })); }
+  }, [briefId]);
+
+  useEffect(() => {
+    if (activeTab === 'history' && !timelinePages.loaded && !timelinePages.loading) loadTimelinePage(null);
+  }, [activeTab, timelinePages.loaded, timelinePages.loading, loadTimelinePage]);
+
+  // The export preview is the server's Markdown rendering; refetched when the brief changes
+  const exportKey = brief ? `${brief.version ?? 0}:${brief.updated_at}` : null;
+  const loadExportPreview = useCallback(async () => {
+    const res = await fetch(`/api/briefs/${briefId}/export?format=md`);
+    if (!res.ok) return '';
+    const text = await res.text();
+    setExportPreview({ key: exportKey, text });
+    return text;
+  }, [briefId, exportKey]);
+
+  useEffect(() => {
+    if (activeTab === 'export' && exportKey && exportPreview.key !== exportKey) loadExportPreview().catch(() => {});
+  }, [activeTab, exportKey, exportPreview.key, loadExportPreview]);
+
+  // Embedded tail (kept live by every mutation) merged with the fetched pages
+  const timelineEvents = useMemo(() => {
+    const byKey = new Map();
+    [...timelinePages.items, ...(brief?.timeline_events || [])].forEach(ev => byKey.set(`${ev.type}:${ev.timestamp}:${ev.label}`, ev));
+    return [...byKey.values()];
+  }, [timelinePages.items, brief?.timeline_events]);
+
+  // Generation runs as a background job; follow its progress over the SSE stream
+  useEffect(() => {
+    if (!generating || !briefId) return;
+    const source = new EventSource(`/api/briefs/${briefId}/events`);
+    const onProgress = (e) => {
+      const d = JSON.parse(e.data);
+      if (d.status && d.status !== 'generating') { onDone(); return; }
+      if (d.generation_stage) setGenStage(describeGenerationStage(d));
+      setBrief(prev => ({ ...prev, ...d.payload, generation_job_id: d.generation_job_id ?? prev.generation_job_id }));
+    };
+    const onDone = () => { source.close(); setGenerating(false); fetchBrief(); };
+    ['snapshot', 'queued', 'started', 'stage'].forEach(t => source.addEventListener(t, onProgress));
+    ['complete', 'error', 'cancelled'].forEach(t => source.addEventListener(t, onDone));
+    source.onerror = () => { if (source.readyState === EventSource.CLOSED) onDone(); };
+    return () => source.close();
+  }, [generating, briefId, fetchBrief]);
+
   async function handleGenerate() {
     setGenerating(true);
     setGenStage('Starting pipeline...');
-    // Reset error status before retrying
-    await fetch(`/api/briefs/${briefId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ status: 'draft', error_message: null }) }).catch(() => {});
-    const pollInterval = setInterval(async () => {
-      try {
-        const r = await fetch(`/api/briefs/${briefId}`);
-        const d = await r.json();
-        const stageMap = { entities: 'Extracting entities...', graph: 'Building dependency graph...', prd: 'Generating PRD sections...', stakeholders: 'Generating stakeholder critiques...', checklist: 'Generating checklists...', traceability: 'Building traceability...', done: 'Complete!' };
-        if (d.brief?.generation_stage) setGenStage(stageMap[d.brief.generation_stage] || d.brief.generation_stage);
-      } catch {}
-    }, 2000);
     try {
       const res = await fetch(`/api/briefs/${briefId}/generate`, { method: 'POST' });
-      clearInterval(pollInterval);
-      if (!res.ok) {
-        const text = await res.text();
-        try { const d = JSON.parse(text); setGenStage(d.error || 'Generation failed'); } catch { setGenStage('Generation failed. Please try again.'); }
-      }
-      await fetchBrief();
-    } catch {} finally { clearInterval(pollInterval); setGenerating(false); }
+      const data = await res.json().catch(() => ({}));
+      if (!res.ok) { setGenerating(false); await fetchBrief(); return; }
+      setBrief(prev => ({ ...prev, status: 'generating', generation_job_id: data.job?.id }));
+    } catch { setGenerating(false); }
+  }
+
+  async function handleCancelGeneration() {
+    if (!brief?.generation_job_id) return;
+    setGenStage('Cancelling...');
+    await fetch(`/api/jobs/${brief.generation_job_id}/cancel`, { method: 'POST' }).catch(() => {});
   }
 
   async function handleRegenerateSection(section) {
     setRegenerating(section);
     try {
       const res = await fetch(`/api/briefs/${briefId}/regenerate`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ type: 'section', target: section }) });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); setShowDiff(section); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); setShowDiff(section); }
     } catch {} finally { setRegenerating(''); }
   }
 
@@ -232,14 +340,14 @@ export default function BriefWorkspace() {
     setRegenerating(stakeholder);
     try {
       const res = await fetch(`/api/briefs/${briefId}/regenerate`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ type: 'stakeholder', target: stakeholder }) });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); }
     } catch {} finally { setRegenerating(''); }
   }
 
   async function handleSectionStatus(section, status) {
     try {
       const res = await fetch(`/api/briefs/${briefId}/section-status`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ section, status }) });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); }
     } catch {}
   }
 
@@ -247,14 +355,14 @@ export default function BriefWorkspace() {
     if (!newAssumption.description.trim()) return;
     try {
       const res = await fetch(`/api/briefs/${briefId}/assumptions`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(newAssumption) });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); setNewAssumption({ description: '', source: 'user', confidence: 'medium' }); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); setNewAssumption({ description: '', source: 'user', confidence: 'medium' }); }
     } catch {}
   }
 
   async function handleDeleteAssumption(aId) {
     try {
       const res = await fetch(`/api/briefs/${briefId}/assumptions/${aId}`, { method: 'DELETE' });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); }
     } catch {}
   }
 
@@ -262,43 +370,77 @@ export default function BriefWorkspace() {
     setRegenerating('summary');
     try {
       const res = await fetch(`/api/briefs/${briefId}/executive-summary`, { method: 'POST' });
-      if (res.ok) { const data = await res.json(); setBrief(data.brief); }
+      if (res.ok) { const data = await res.json(); applyBrief(data.brief); }
     } catch {} finally { setRegenerating(''); }
   }
 
-  async function handleChecklistToggle(category, index) {
-    if (!brief?.checklist) return;
-    const updated = { ...brief.checklist };
-    updated[category] = [...updated[category]];
-    updated[category][index] = { ...updated[category][index], checked: !updated[category][index].checked };
-    setBrief(prev => ({ ...prev, checklist: updated }));
-    await fetch(`/api/briefs/${briefId}`, { method: 'PUT', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ checklist: updated }) });
+  // Sends the queued ops as one batch; batches go out one at a time so each
+  // carries the version returned by the previous one
+  const flushChecklist = useCallback(() => {
+    clearTimeout(checklistTimer.current);
+    const ops = [...checklistOps.current.values()];
+    checklistOps.current.clear();
+    if (!ops.length) return;
+    checklistSync.current = checklistSync.current.then(async () => {
+      try {
+        const res = await fetch(`/api/briefs/${briefId}/checklist`, {
+          method: 'PATCH',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ version: checklistVersion.current, ops }),
+          keepalive: true,
+        });
+        const data = await res.json();
+        if (res.status === 409) {
+          // Someone else changed the checklist: take theirs and replay our edits on items that still exist
+          checklistVersion.current = data.checklist_version;
+          const replay = ops.filter(op => op.id && data.checklist?.[op.category]?.some(i => i.id === op.id));
+          setBrief(prev => ({ ...prev, checklist_version: data.checklist_version, checklist: replay.reduce(applyChecklistOp, data.checklist) }));
+          replay.forEach(op => { if (!checklistOps.current.has(checklistOpKey(op))) checklistOps.current.set(checklistOpKey(op), op); });
+          checklistTimer.current = setTimeout(flushChecklist, 0);
+          return;
+        }
+        if (!res.ok) { fetchBrief(); return; }
+        checklistVersion.current = data.checklist_version;
+        // Our own write: whatever else was current stays current unless someone else wrote in between
+        if (loaded.current.version != null && data.version === loaded.current.version + 1) loaded.current.version = data.version;
+        // Items toggled again while this batch was in flight keep their local state
+        const confirmed = data.items.filter(item => !checklistOps.current.has(checklistOpKey(item)));
+        setBrief(prev => ({
+          ...prev,
+          version: data.version,
+          checklist_version: data.checklist_version,
+          readiness: data.readiness,
+          checklist: confirmed.reduce(applyChecklistOp, prev.checklist),
+        }));
+      } catch { fetchBrief(); }
+    });
+  }, [briefId, fetchBrief]);
+
+  useEffect(() => () => flushChecklist(), [flushChecklist]);
+
+  function queueChecklistOp(op) {
+    const key = checklistOpKey(op);
+    checklistOps.current.set(key, { ...checklistOps.current.get(key), ...op });
+    clearTimeout(checklistTimer.current);
+    checklistTimer.current = setTimeout(flushChecklist, CHECKLIST_DEBOUNCE_MS);
   }
 
-  function generateMarkdown() {
-    if (!brief?.prd_sections) return '';
-    let md = `# ${brief.title}\n\n**Industry:** ${brief.industry_context} | **Geography:** ${brief.geography} | **Risk:** ${brief.risk_tolerance} | **Launch:** ${brief.launch_type}\n\n---\n\n`;
-    Object.entries(SECTION_LABELS).forEach(([key, label]) => { if (brief.prd_sections[key]) md += `## ${label}\n\n${brief.prd_sections[key]}\n\n`; });
-    if (brief.stakeholder_critiques) {
-      md += `---\n\n# Stakeholder Critiques\n\n`;
-      Object.entries(brief.stakeholder_critiques).forEach(([name, data]) => {
-        md += `## ${name}\n\n`;
-        if (data.concerns?.length) md += `### Concerns\n${data.concerns.map(c => `- ${c}`).join('\n')}\n\n`;
-        if (data.required_controls?.length) md += `### Required Controls\n${data.required_controls.map(c => `- ${c}`).join('\n')}\n\n`;
-        if (data.required_approvals?.length) md += `### Required Approvals\n${data.required_approvals.map(c => `- ${c}`).join('\n')}\n\n`;
-        if (data.questions?.length) md += `### Questions\n${data.questions.map(q => `- ${q}`).join('\n')}\n\n`;
-      });
-    }
-    if (brief.checklist) {
-      md += `---\n\n# Checklist\n\n`;
-      Object.entries(brief.checklist).forEach(([cat, items]) => { md += `## ${cat}\n`; items.forEach(item => { md += `- [${item.checked ? 'x' : ' '}] ${item.item}${item.owner ? ` (Owner: ${item.owner})` : ''}\n`; }); md += '\n'; });
-    }
-    return md;
+  function handleChecklistToggle(category, index) {
+    const item = brief?.checklist?.[category]?.[index];
+    if (!item) return;
+    const op = { category, ...(item.id ? { id: item.id } : { index }), checked: !item.checked };
+    setBrief(prev => ({ ...prev, checklist: applyChecklistOp(prev.checklist, op) }));
+    queueChecklistOp(op);
   }
 
-  function handleCopyMarkdown() { navigator.clipboard.writeText(generateMarkdown()); setCopied(true); setTimeout(() => setCopied(false), 2000); }
-  function handleDownloadJSON() { const b = new Blob([JSON.stringify(brief, null, 2)], { type: 'application/json' }); const u = URL.createObjectURL(b); const a = document.createElement('a'); a.href = u; a.download = `${brief.title.replace(/\s+/g, '_')}.json`; a.click(); URL.revokeObjectURL(u); }
-  function handleDownloadMarkdown() { const b = new Blob([generateMarkdown()], { type: 'text/markdown' }); const u = URL.createObjectURL(b); const a = document.createElement('a'); a.href = u; a.download = `${brief.title.replace(/\s+/g, '_')}.md`; a.click(); URL.revokeObjectURL(u); }
+  async function handleCopyMarkdown() {
+    const text = exportPreview.key === exportKey ? exportPreview.text : await loadExportPreview();
+    await navigator.clipboard.writeText(text);
+    setCopied(true);
+    setTimeout(() => setCopied(false), 2000);
+  }
+  // The server sends Content-Disposition: attachment with the file name
+  function handleDownload(format) { const a = document.createElement('a'); a.href = `/api/briefs/${briefId}/export?format=${format}&download=1`; a.click(); }
 
   const graphData = useMemo(() => {
     if (!brief?.graph) return { nodes: [], edges: [] };
@@ -327,7 +469,7 @@ export default function BriefWorkspace() {
   if (loading) return <div className="flex items-center justify-center h-full"><Loader2 className="w-8 h-8 animate-spin text-[#3B4F6B]" /></div>;
   if (!brief) return <div className="flex flex-col items-center justify-center h-full"><FileText className="w-12 h-12 text-[#E5E7EB] mb-4" /><h2 className="text-lg font-semibold text-[#111827] mb-2">Brief not found</h2><button onClick={() => router.push('/dashboard')} className="text-sm text-[#3B4F6B] hover:underline">Back to Dashboard</button></div>;
 
-  const isGenerated = brief.status === 'complete' && brief.prd_sections;
+  const isGenerated = brief.status === 'complete';
   const isError = brief.status === 'error';
   const readiness = brief.readiness;
   const execSummary = brief.executive_summary;
@@ -377,7 +519,7 @@ export default function BriefWorkspace() {
                 <div className="w-16 h-16 rounded-2xl bg-red-50 flex items-center justify-center mb-4"><AlertTriangle className="w-8 h-8 text-red-500" /></div>
                 <h2 className="text-lg font-semibold text-[#111827] mb-2">Generation failed</h2>
                 <p className="text-sm text-[#111827]/50 mb-2 max-w-md text-center">{brief.error_message || 'An error occurred during generation.'}</p>
-                <p className="text-xs text-[#111827]/30 mb-6">You can retry — the system will attempt fallback AI models automatically.</p>
+                <p className="text-xs text-[#111827]/30 mb-6">You can retry — completed stages are kept, and the pipeline resumes from where it stopped.</p>
                 <button onClick={handleGenerate} className="pill-button bg-[#3B4F6B] text-white hover:bg-[#2d3d52] flex items-center gap-2"><RefreshCw className="w-4 h-4" /> Retry Generation</button>
               </>
             ) : (
@@ -395,6 +537,7 @@ export default function BriefWorkspace() {
             <h2 className="text-lg font-semibold text-[#111827] mb-2">Generating your brief...</h2>
             <p className="text-sm text-[#111827]/40">{genStage}</p>
             <div className="mt-4 w-64 h-1.5 bg-[#E5E7EB] rounded-full overflow-hidden"><div className="h-full bg-[#3B4F6B] rounded-full animate-pulse" style={{ width: '50%' }}></div></div>
+            {brief.generation_job_id && <button onClick={handleCancelGeneration} className="mt-6 text-xs px-3 py-1.5 rounded-full border border-[#E5E7EB] text-[#111827]/40 hover:bg-[#E5E7EB]/30 flex items-center gap-1 transition-colors"><X className="w-3 h-3" /> Cancel generation</button>}
           </div>
         ) : (
           <>
@@ -589,7 +732,7 @@ export default function BriefWorkspace() {
                           </div>
                           <div className="space-y-1">
                             {items.map((item, idx) => (
-                              <div key={idx} className="flex items-start gap-3 p-2.5 rounded-[12px] hover:bg-[#E5E7EB]/20 transition-colors">
+                              <div key={item.id || idx} className="flex items-start gap-3 p-2.5 rounded-[12px] hover:bg-[#E5E7EB]/20 transition-colors">
                                 <button onClick={() => handleChecklistToggle(category, idx)} className={`w-5 h-5 rounded-md border-2 flex items-center justify-center flex-shrink-0 mt-0.5 transition-colors ${item.checked ? 'bg-[#3B4F6B] border-[#3B4F6B]' : 'border-[#E5E7EB] hover:border-[#3B4F6B]'}`}>
                                   {item.checked && <Check className="w-3 h-3 text-white" />}
                                 </button>
@@ -694,9 +837,16 @@ export default function BriefWorkspace() {
               <div className="p-8 overflow-auto tab-content">
                 <div className="max-w-3xl mx-auto">
                   <h2 className="text-xl font-bold text-[#111827] mb-6">Decision Timeline</h2>
-                  <DecisionTimeline events={brief.timeline_events} />
+                  <DecisionTimeline events={timelineEvents} />
+                  {timelinePages.cursor && (
+                    <div className="flex justify-center mt-4">
+                      <button onClick={() => loadTimelinePage(timelinePages.cursor)} disabled={timelinePages.loading} className="text-xs px-3 py-1.5 rounded-full border border-[#E5E7EB] text-[#111827]/50 hover:bg-[#E5E7EB]/30 flex items-center gap-1 disabled:opacity-50 transition-colors">
+                        {timelinePages.loading ? <Loader2 className="w-3 h-3 animate-spin" /> : <Clock className="w-3 h-3" />} Load older events
+                      </button>
+                    </div>
+                  )}
                   {/* Legacy revisions fallback */}
-                  {(!brief.timeline_events || brief.timeline_events.length === 0) && brief.revisions?.length > 0 && (
+                  {timelineEvents.length === 0 && brief.revisions?.length > 0 && (
                     <div className="mt-6">
                       <p className="text-[10px] font-semibold text-[#111827]/30 uppercase tracking-widest mb-3">Revisions</p>
                       <div className="space-y-3">
@@ -722,27 +872,33 @@ export default function BriefWorkspace() {
               <div className="p-8 overflow-auto tab-content">
                 <div className="max-w-3xl mx-auto">
                   <h2 className="text-xl font-bold text-[#111827] mb-6">Export Decision Brief</h2>
-                  <div className="grid md:grid-cols-3 gap-4">
+                  <div className="grid sm:grid-cols-2 md:grid-cols-4 gap-4">
                     <button onClick={handleCopyMarkdown} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
                       <div className="w-10 h-10 rounded-xl bg-blue-50 flex items-center justify-center mb-4">{copied ? <Check className="w-5 h-5 text-blue-600" /> : <Copy className="w-5 h-5 text-blue-600" />}</div>
                       <h3 className="font-semibold text-[#111827] mb-1">{copied ? 'Copied!' : 'Copy Markdown'}</h3>
                       <p className="text-xs text-[#111827]/40">Copy full brief as formatted Markdown</p>
                     </button>
-                    <button onClick={handleDownloadMarkdown} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
+                    <button onClick={() => handleDownload('md')} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
                       <div className="w-10 h-10 rounded-xl bg-green-50 flex items-center justify-center mb-4"><Download className="w-5 h-5 text-green-600" /></div>
                       <h3 className="font-semibold text-[#111827] mb-1">Download Markdown</h3>
                       <p className="text-xs text-[#111827]/40">Download as .md file</p>
                     </button>
-                    <button onClick={handleDownloadJSON} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
+                    <button onClick={() => handleDownload('json')} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
                       <div className="w-10 h-10 rounded-xl bg-purple-50 flex items-center justify-center mb-4"><FileText className="w-5 h-5 text-purple-600" /></div>
                       <h3 className="font-semibold text-[#111827] mb-1">Download JSON</h3>
                       <p className="text-xs text-[#111827]/40">Full structured data export</p>
                     </button>
+                    <button onClick={() => handleDownload('csv')} className="card-hover bg-white rounded-[18px] border border-[#E5E7EB] p-6 text-left transition-all">
+                      <div className="w-10 h-10 rounded-xl bg-amber-50 flex items-center justify-center mb-4"><CheckSquare className="w-5 h-5 text-amber-600" /></div>
+                      <h3 className="font-semibold text-[#111827] mb-1">Download CSV</h3>
+                      <p className="text-xs text-[#111827]/40">Sections, critiques and checklist as rows</p>
+                    </button>
                   </div>
+                  <p className="mt-4 text-xs text-[#111827]/40">Checklist items excluded from export are left out of every format. <a href="/api/exports?format=zip" className="underline hover:text-[#111827]/70">Download all briefs (.zip)</a></p>
                   <div className="mt-8 bg-white rounded-[18px] border border-[#E5E7EB] p-6">
                     <h3 className="font-semibold text-[#111827] mb-4">Export Preview</h3>
                     <div className="bg-[#E5E7EB]/20 rounded-[14px] p-5 max-h-96 overflow-auto">
-                      <pre className="text-xs text-[#111827]/50 whitespace-pre-wrap font-mono-ui leading-relaxed">{generateMarkdown().slice(0, 2000)}{generateMarkdown().length > 2000 ? '\n\n... (truncated)' : ''}</pre>
+                      <pre className="text-xs text-[#111827]/50 whitespace-pre-wrap font-mono-ui leading-relaxed">{exportPreview.text.slice(0, 2000)}{exportPreview.text.length > 2000 ? '\n\n... (truncated)' : ''}</pre>
                     </div>
                   </div>
                 </div>
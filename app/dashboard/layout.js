@@ -1,9 +1,11 @@
 'use client';
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useRouter, usePathname } from 'next/navigation';
 import { Shield, Plus, Search, FileText, LogOut, ChevronRight, Loader2 } from 'lucide-react';
 
+const PAGE_SIZE = 30;
+
 export default function DashboardLayout({ children }) {
   const router = useRouter();
   const pathname = usePathname();
@@ -12,16 +14,54 @@ export default function DashboardLayout({ children }) {
   const [search, setSearch] = useState('');
   const [filter, setFilter] = useState('all');
   const [authChecked, setAuthChecked] = useState(false);
-
-  const fetchBriefs = useCallback(async () => {
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const pagesLoaded = useRef(0);
+
+  const listUrl = useCallback((cursor) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (filter !== 'all') params.set('status', filter);
+    if (search.trim()) params.set('q', search.trim());
+    if (cursor) params.set('cursor', cursor);
+    return `/api/briefs?${params}`;
+  }, [filter, search]);
+
+  // Reloads the first page only. With more pages loaded, fresh rows are merged
+  // over the loaded ones and the cursor is kept, so the list never re-pages.
+  const fetchBriefs = useCallback(async ({ reset = false } = {}) => {
     try {
-      const res = await fetch('/api/briefs');
+      const res = await fetch(listUrl());
       if (res.ok) {
         const data = await res.json();
-        setBriefs(data.briefs || []);
+        const page = data.briefs || [];
+        if (reset || pagesLoaded.current <= 1) {
+          pagesLoaded.current = 1;
+          setBriefs(page);
+          setNextCursor(data.next_cursor || null);
+        } else {
+          const fresh = new Set(page.map(b => b.id));
+          setBriefs(prev => [...page, ...prev.filter(b => !fresh.has(b.id))].sort((a, b) => (b.updated_at || '').localeCompare(a.updated_at || '')));
+        }
       }
     } catch {}
-  }, []);
+  }, [listUrl]);
+
+  async function loadMore() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetch(listUrl(nextCursor));
+      if (res.ok) {
+        const data = await res.json();
+        pagesLoaded.current++;
+        setBriefs(prev => {
+          const seen = new Set(prev.map(b => b.id));
+          return [...prev, ...(data.briefs || []).filter(b => !seen.has(b.id))];
+        });
+        setNextCursor(data.next_cursor || null);
+      }
+    } catch {} finally { setLoadingMore(false); }
+  }
 
   useEffect(() => {
     async function checkAuth() {
@@ -31,14 +71,24 @@ export default function DashboardLayout({ children }) {
         const data = await res.json();
         setUser(data.user);
         setAuthChecked(true);
-        fetchBriefs();
       } catch { router.push('/login'); }
     }
     checkAuth();
-  }, [router, fetchBriefs]);
+  }, [router]);
+
+  // Filter and search run server-side; restart paging when they change
+  useEffect(() => {
+    if (!authChecked) return;
+    const timer = setTimeout(() => fetchBriefs({ reset: true }), search ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [filter, search, authChecked, fetchBriefs]);
 
+  // Navigating (after create, delete, generate) refreshes the first page
+  const lastPathname = useRef(pathname);
   useEffect(() => {
-    if (authChecked) fetchBriefs();
+    if (!authChecked || lastPathname.current === pathname) return;
+    lastPathname.current = pathname;
+    fetchBriefs();
   }, [pathname, authChecked, fetchBriefs]);
 
   async function handleLogout() {
@@ -48,15 +98,9 @@ export default function DashboardLayout({ children }) {
 
   async function handleSeed() {
     await fetch('/api/seed', { method: 'POST' });
-    fetchBriefs();
+    fetchBriefs({ reset: true });
   }
 
-  const filteredBriefs = briefs.filter(b => {
-    if (search && !b.title.toLowerCase().includes(search.toLowerCase())) return false;
-    if (filter !== 'all' && b.status !== filter) return false;
-    return true;
-  });
-
   const statusColors = {
     draft: 'bg-[#E5E7EB] text-[#111827]/60',
     generating: 'bg-blue-50 text-blue-700',
@@ -109,7 +153,7 @@ export default function DashboardLayout({ children }) {
         </div>
 
         <div className="flex-1 overflow-auto px-2">
-          {filteredBriefs.length === 0 ? (
+          {briefs.length === 0 ? (
             <div className="text-center py-8 px-4">
               <FileText className="w-8 h-8 text-[#E5E7EB] mx-auto mb-2" />
               <p className="text-sm text-[#111827]/30 mb-3">No briefs yet</p>
@@ -117,7 +161,7 @@ export default function DashboardLayout({ children }) {
             </div>
           ) : (
             <div className="space-y-0.5">
-              {filteredBriefs.map(b => (
+              {briefs.map(b => (
                 <button key={b.id} onClick={() => router.push(`/dashboard/briefs/${b.id}`)} className={`w-full text-left px-3 py-2.5 rounded-[12px] text-sm transition-colors group ${pathname.includes(b.id) ? 'bg-[#3B4F6B]/[0.06] text-[#3B4F6B]' : 'hover:bg-[#E5E7EB]/30 text-[#111827]/70'}`}>
                   <div className="flex items-center justify-between">
                     <span className="font-medium truncate flex-1">{b.title}</span>
@@ -129,6 +173,11 @@ export default function DashboardLayout({ children }) {
                   </div>
                 </button>
               ))}
+              {nextCursor && (
+                <button onClick={loadMore} disabled={loadingMore} className="w-full text-xs text-[#3B4F6B] hover:underline py-2 flex items-center justify-center gap-1 disabled:opacity-50">
+                  {loadingMore && <Loader2 className="w-3 h-3 animate-spin" />} Load more
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -10,6 +10,18 @@ const GEOGRAPHIES = ['US', 'EU', 'Global'];
 const LAUNCH_TYPES = ['internal', 'beta', 'GA'];
 const RISK_LEVELS = ['low', 'medium', 'high'];
 
+const GENERATION_STAGE_LABELS = {
+  queued: 'Waiting for a generation worker', entities: 'Extracting entities', graph: 'Building dependency graph', prd: 'Generating PRD sections',
+  stakeholders: 'Generating stakeholder critiques', checklist: 'Generating checklists',
+  traceability: 'Building traceability', summary: 'Writing executive summary', done: 'Finalizing',
+};
+
+// Several pipeline stages can be in flight at once; list all of them
+function describeGenerationStage(brief) {
+  const running = brief.generation_running?.length ? brief.generation_running : [brief.generation_stage];
+  return `${running.map(s => GENERATION_STAGE_LABELS[s] || s).join(' · ')}...`;
+}
+
 export default function NewBriefPage() {
   const router = useRouter();
   const [loading, setLoading] = useState(false);
@@ -52,32 +64,25 @@ export default function NewBriefPage() {
       if (!res.ok) throw new Error(data.error);
       const briefId = data.brief.id;
 
-      // Now generate
+      // Generation runs as a background job; follow its progress over the SSE stream
       setGenerating(true);
-      setStage('Extracting entities...');
-      const pollInterval = setInterval(async () => {
-        try {
-          const r = await fetch(`/api/briefs/${briefId}`);
-          const d = await r.json();
-          const stageMap = {
-            entities: 'Building dependency graph...',
-            graph: 'Generating PRD sections...',
-            prd: 'Generating stakeholder critiques...',
-            stakeholders: 'Generating checklists...',
-            checklist: 'Building traceability...',
-            traceability: 'Finalizing...',
-          };
-          if (d.brief?.generation_stage) setStage(stageMap[d.brief.generation_stage] || d.brief.generation_stage);
-        } catch {}
-      }, 2000);
-
+      setStage('Starting pipeline...');
       const genRes = await fetch(`/api/briefs/${briefId}/generate`, { method: 'POST' });
-      clearInterval(pollInterval);
       if (genRes.ok) {
-        router.push(`/dashboard/briefs/${briefId}`);
-      } else {
-        router.push(`/dashboard/briefs/${briefId}`);
+        await new Promise(resolve => {
+          const source = new EventSource(`/api/briefs/${briefId}/events`);
+          const done = () => { source.close(); resolve(); };
+          const onProgress = (e) => {
+            const d = JSON.parse(e.data);
+            if (d.status && d.status !== 'generating') return done();
+            if (d.generation_stage) setStage(describeGenerationStage(d));
+          };
+          ['snapshot', 'queued', 'started', 'stage'].forEach(t => source.addEventListener(t, onProgress));
+          ['complete', 'error', 'cancelled'].forEach(t => source.addEventListener(t, done));
+          source.onerror = () => { if (source.readyState === EventSource.CLOSED) done(); };
+        });
       }
+      router.push(`/dashboard/briefs/${briefId}`);
     } catch (err) {
       alert(err.message);
     } finally {
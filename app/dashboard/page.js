@@ -1,25 +1,42 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import { useRouter } from 'next/navigation';
 import { Plus, FileText, Zap, ArrowRight, Loader2, Sparkles } from 'lucide-react';
 
+const PAGE_SIZE = 20;
+const INDUSTRIES = ['Fintech', 'Healthcare', 'Insurance', 'Enterprise SaaS', 'Gov adjacent'];
+
 export default function DashboardPage() {
   const router = useRouter();
   const [briefs, setBriefs] = useState([]);
   const [loading, setLoading] = useState(true);
   const [seeding, setSeeding] = useState(false);
+  const [industry, setIndustry] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const fetchPage = useCallback(async (cursor) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (industry) params.set('industry', industry);
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`/api/briefs?${params}`);
+    const data = await res.json();
+    setBriefs(prev => (cursor ? [...prev, ...(data.briefs || [])] : data.briefs || []));
+    setNextCursor(data.next_cursor || null);
+  }, [industry]);
+
+  const fetchBriefs = useCallback(async () => {
+    try { await fetchPage(null); } catch {} finally { setLoading(false); }
+  }, [fetchPage]);
 
   useEffect(() => {
     fetchBriefs();
-  }, []);
+  }, [fetchBriefs]);
 
-  async function fetchBriefs() {
-    try {
-      const res = await fetch('/api/briefs');
-      const data = await res.json();
-      setBriefs(data.briefs || []);
-    } catch {} finally { setLoading(false); }
+  async function loadMore() {
+    setLoadingMore(true);
+    try { await fetchPage(nextCursor); } catch {} finally { setLoadingMore(false); }
   }
 
   async function handleSeed() {
@@ -56,10 +73,14 @@ export default function DashboardPage() {
       <div className="flex items-center justify-between mb-8">
         <div>
           <h1 className="text-2xl font-bold text-[#111827]">Decision Briefs</h1>
-          <p className="text-gray-500 text-sm mt-1">{briefs.length} brief{briefs.length !== 1 ? 's' : ''}</p>
+          <p className="text-gray-500 text-sm mt-1">{briefs.length}{nextCursor ? '+' : ''} brief{briefs.length !== 1 || nextCursor ? 's' : ''}</p>
         </div>
         <div className="flex gap-3">
-          {briefs.length === 0 && (
+          <select value={industry} onChange={(e) => setIndustry(e.target.value)} className="text-sm px-3 py-2 rounded-full border border-[#E5E7EB] bg-white text-[#111827]/60 outline-none cursor-pointer">
+            <option value="">All industries</option>
+            {INDUSTRIES.map(i => <option key={i} value={i}>{i}</option>)}
+          </select>
+          {briefs.length === 0 && !industry && (
             <button onClick={handleSeed} disabled={seeding} className="pill-button border border-gray-200 text-gray-700 hover:bg-gray-50 text-sm flex items-center gap-2">
               {seeding ? <Loader2 className="w-4 h-4 animate-spin" /> : <Sparkles className="w-4 h-4" />}
               Seed Demo Briefs
@@ -76,7 +97,7 @@ export default function DashboardPage() {
           <div className="w-16 h-16 rounded-2xl bg-[#E5E7EB]/30 flex items-center justify-center mx-auto mb-4">
             <FileText className="w-8 h-8 text-[#111827]/20" />
           </div>
-          <h2 className="text-lg font-semibold text-[#111827] mb-2">No decision briefs yet</h2>
+          <h2 className="text-lg font-semibold text-[#111827] mb-2">{industry ? `No ${industry} briefs` : 'No decision briefs yet'}</h2>
           <p className="text-[#111827]/40 text-sm mb-6 max-w-sm mx-auto">Create your first brief or seed demo data to get started.</p>
           <div className="flex items-center justify-center gap-3">
             <button onClick={() => router.push('/dashboard/new')} className="pill-button bg-[#3B4F6B] text-white text-sm hover:bg-[#2d3d52] flex items-center gap-2">
@@ -109,6 +130,11 @@ export default function DashboardPage() {
               </div>
             </button>
           ))}
+          {nextCursor && (
+            <button onClick={loadMore} disabled={loadingMore} className="pill-button border border-[#E5E7EB] text-[#111827]/60 text-sm hover:bg-[#E5E7EB]/30 flex items-center justify-center gap-2 disabled:opacity-50">
+              {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />} Load more
+            </button>
+          )}
         </div>
       )}
     </div>
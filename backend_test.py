@@ -4,23 +4,64 @@ RegulaPM Nexus Backend API Testing Suite
 Tests all backend endpoints with proper authentication flows
 """
 
+import argparse
+import io
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
 import requests
 import json
 import uuid
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote
 
 # Base configuration
-BASE_URL = "https://ai-governed-prd.preview.emergentagent.com/api"
+BASE_URL = os.environ.get("REGULAPM_BASE_URL", "https://ai-governed-prd.preview.emergentagent.com/api")
+REPORTS_DIR = Path(__file__).resolve().parent / "test_reports"
 TEST_ACCOUNT = {
     "email": "demo@regulapm.io",
     "password": "demo123"
 }
 PRE_GENERATED_BRIEF_ID = "4e6975a7-87a7-4e6b-b2af-ba1297aea11d"
+JOB_TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+REPO_ROOT = Path(__file__).resolve().parent
+
+# Library checks run lib/ modules directly under Node. The loader resolves the
+# "@/..." alias from jsconfig.json; a check script reports through
+# check(name, ok, detail), `lib(name)` imports lib/<name>.js and `tick(ms)`
+# sleeps.
+NODE_ALIAS_LOADER = """
+let root;
+export function initialize(data) { root = data.root; }
+export async function resolve(specifier, context, next) {
+  if (!specifier.startsWith('@/')) return next(specifier, context);
+  const url = new URL(specifier.slice(2), root).href;
+  return next(url.endsWith('.js') ? url : `${url}.js`, context);
+}
+"""
+NODE_CHECK_PRELUDE = """
+import { register } from 'node:module';
+import { pathToFileURL } from 'node:url';
+register('data:text/javascript,' + encodeURIComponent(%s), { data: { root: pathToFileURL(%s + '/').href } });
+const lib = name => import(`@/lib/${name}`);
+const checks = [];
+const check = (name, ok, detail = '') => checks.push({ name, ok: Boolean(ok), detail: String(detail) });
+const tick = ms => new Promise(r => setTimeout(r, ms));
+""" % (json.dumps(NODE_ALIAS_LOADER), json.dumps(str(REPO_ROOT)))
+# Last line of stdout, whatever the script itself prints
+NODE_CHECK_REPORT = "\nprocess.stdout.write(`\\n${JSON.stringify(checks)}\\n`);\n"
 
 class RegulaPMAPITester:
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
         self.session = requests.Session()
         self.session_token = None
         self.test_user = None
@@ -38,10 +79,11 @@ class RegulaPMAPITester:
         }
     
     def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                    timeout: int = 30, include_auth: bool = True) -> requests.Response:
+                    timeout: int = 30, include_auth: bool = True,
+                    extra_headers: Optional[Dict] = None) -> requests.Response:
         """Make HTTP request with proper headers and auth"""
-        url = f"{BASE_URL}{endpoint}"
-        headers = {"Content-Type": "application/json"}
+        url = f"{self.base_url}{endpoint}"
+        headers = {"Content-Type": "application/json", **(extra_headers or {})}
         
         # Include session token as cookie if available
         cookies = {}
@@ -55,6 +97,8 @@ class RegulaPMAPITester:
                 response = self.session.post(url, json=data, headers=headers, cookies=cookies, timeout=timeout)
             elif method.upper() == "PUT":
                 response = self.session.put(url, json=data, headers=headers, cookies=cookies, timeout=timeout)
+            elif method.upper() == "PATCH":
+                response = self.session.patch(url, json=data, headers=headers, cookies=cookies, timeout=timeout)
             elif method.upper() == "DELETE":
                 response = self.session.delete(url, headers=headers, cookies=cookies, timeout=timeout)
             else:
@@ -68,13 +112,23 @@ class RegulaPMAPITester:
             print(f"Request failed: {e}")
             raise
     
+    def create_scratch_brief(self, title: str, **fields) -> str:
+        """Create a throwaway brief for a test that edits it; the caller deletes it"""
+        response = self.make_request("POST", "/briefs", {"title": title, "main_input": f"{title} (automated test)"})
+        response.raise_for_status()
+        brief_id = response.json()["brief"]["id"]
+        if fields:
+            self.make_request("PUT", f"/briefs/{brief_id}", fields).raise_for_status()
+        return brief_id
+    
     def test_health_check(self):
         """Test basic health check endpoint"""
         try:
             response = self.make_request("GET", "", include_auth=False)
             if response.status_code == 200:
                 data = response.json()
-                if data.get("status") == "ok" and "RegulaPM Nexus" in data.get("app", ""):
+                # Internal stats are only exposed through /api/metrics
+                if data.get("status") == "ok" and "RegulaPM Nexus" in data.get("app", "") and set(data) == {"status", "app"}:
                     self.log_result("Health Check", True, "API is responding correctly")
                 else:
                     self.log_result("Health Check", False, f"Unexpected response: {data}")
@@ -171,6 +225,33 @@ class RegulaPMAPITester:
         
         return False
     
+    def test_session_revocation(self):
+        """Test that a logged-out session stops resolving, even after it was cached"""
+        try:
+            # A separate session, so the suite's own token is untouched
+            client = requests.Session()
+            response = client.post(f"{self.base_url}/auth/login", json=TEST_ACCOUNT, timeout=30)
+            token = response.cookies.get("session_token")
+            if response.status_code != 200 or not token:
+                self.log_result("Auth - Session Revocation", False, f"Login status: {response.status_code}")
+                return False
+            cookies = {"session_token": token}
+            
+            for _ in range(2):  # the second lookup is served from the session cache
+                if client.get(f"{self.base_url}/auth/me", cookies=cookies, timeout=30).status_code != 200:
+                    self.log_result("Auth - Session Revocation", False, "Fresh session did not resolve")
+                    return False
+            client.post(f"{self.base_url}/auth/logout", json={}, cookies=cookies, timeout=30)
+            response = requests.get(f"{self.base_url}/auth/me", cookies=cookies, timeout=30)
+            if response.status_code == 401:
+                self.log_result("Auth - Session Revocation", True, "Logged-out token rejected after a cached lookup")
+                return True
+            self.log_result("Auth - Session Revocation", False, f"Logged-out token still resolves: {response.status_code}")
+        except Exception as e:
+            self.log_result("Auth - Session Revocation", False, f"Exception: {str(e)}")
+        
+        return False
+    
     def test_list_briefs(self):
         """Test GET /api/briefs"""
         if not self.session_token:
@@ -198,6 +279,49 @@ class RegulaPMAPITester:
         
         return False
     
+    def test_list_briefs_pagination(self):
+        """Test GET /api/briefs keyset paging, filters and the slim list projection"""
+        if not self.session_token:
+            self.log_result("Briefs - List Pagination", False, "No session token available")
+            return False
+        
+        try:
+            response = self.make_request("GET", "/briefs?limit=2")
+            if response.status_code != 200:
+                self.log_result("Briefs - List Pagination", False, f"Status: {response.status_code}, Body: {response.text}")
+                return False
+            first = response.json()
+            if len(first["briefs"]) > 2 or any("prd_sections" in b or "main_input" in b for b in first["briefs"]):
+                self.log_result("Briefs - List Pagination", False, f"Page not limited to 2 slim briefs: {first['briefs']}")
+                return False
+            if not first.get("next_cursor"):
+                self.log_result("Briefs - List Pagination", True, f"Single page of {len(first['briefs'])} briefs")
+                return True
+            
+            second = self.make_request("GET", f"/briefs?limit=2&cursor={first['next_cursor']}").json()
+            keys = [(b["updated_at"], b["id"]) for b in first["briefs"] + second["briefs"]]
+            if len(set(b["id"] for b in first["briefs"] + second["briefs"])) != len(keys) or keys != sorted(keys, reverse=True):
+                self.log_result("Briefs - List Pagination", False, f"Pages overlap or are out of order: {keys}")
+                return False
+            
+            industry = first["briefs"][0]["industry_context"]
+            filtered = self.make_request("GET", f"/briefs?limit=100&industry={quote(industry)}").json()["briefs"]
+            if not filtered or any(b["industry_context"] != industry for b in filtered):
+                self.log_result("Briefs - List Pagination", False, "Industry filter returned other industries")
+                return False
+            
+            garbage = self.make_request("GET", "/briefs?limit=2&cursor=not-a-cursor")
+            if garbage.status_code != 200 or [b["id"] for b in garbage.json()["briefs"]] != [b["id"] for b in first["briefs"]]:
+                self.log_result("Briefs - List Pagination", False, f"Malformed cursor not treated as the first page: {garbage.status_code}")
+                return False
+            
+            self.log_result("Briefs - List Pagination", True, f"Two ordered pages, {len(filtered)} briefs in {industry}")
+            return True
+        except Exception as e:
+            self.log_result("Briefs - List Pagination", False, f"Exception: {str(e)}")
+        
+        return False
+    
     def test_create_brief(self):
         """Test POST /api/briefs"""
         if not self.session_token:
@@ -267,6 +391,135 @@ class RegulaPMAPITester:
         
         return False
     
+    def test_get_brief_conditional(self):
+        """Test GET /api/briefs/:id?fields= with ETag / If-None-Match"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Briefs - Conditional Get", False, "No session token or created brief available")
+            return False
+        
+        try:
+            endpoint = f"/briefs/{self.created_brief_id}?fields=title,assumptions"
+            response = self.make_request("GET", endpoint)
+            etag = response.headers.get("ETag")
+            if response.status_code != 200 or not etag:
+                self.log_result("Briefs - Conditional Get", False, f"Status: {response.status_code}, ETag: {etag}, Body: {response.text}")
+                return False
+            brief = response.json()["brief"]
+            unexpected = set(brief) - {"id", "version", "status", "updated_at", "title", "assumptions"}
+            if unexpected:
+                self.log_result("Briefs - Conditional Get", False, f"Projection returned extra fields: {sorted(unexpected)}")
+                return False
+            
+            response = self.make_request("GET", endpoint, extra_headers={"If-None-Match": etag})
+            if response.status_code != 304:
+                self.log_result("Briefs - Conditional Get", False, f"Expected 304 for matching ETag, got {response.status_code}")
+                return False
+            
+            response = self.make_request("GET", f"/briefs/{self.created_brief_id}?fields=user_id")
+            if response.status_code == 400:
+                self.log_result("Briefs - Conditional Get", True, f"Projected GET, 304 on {etag}, unknown field rejected")
+                return True
+            self.log_result("Briefs - Conditional Get", False, f"Unknown field not rejected: {response.status_code}")
+                
+        except Exception as e:
+            self.log_result("Briefs - Conditional Get", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_brief_history_paging(self):
+        """Test GET /api/briefs/:id/timeline, /revisions and /diffs keyset paging"""
+        if not self.session_token:
+            self.log_result("Briefs - History Paging", False, "No session token available")
+            return False
+        
+        brief_id = None
+        try:
+            brief_id = self.create_scratch_brief("History Paging Probe")
+            base = f"/briefs/{brief_id}"
+            # Creation plus three edits: four timeline events to page through
+            for description in ("First paging probe", "Second paging probe"):
+                self.make_request("POST", f"{base}/assumptions", {"description": description})
+            self.make_request("PUT", f"{base}/section-status", {"section": "overview", "status": "needs_review"})
+            
+            events, cursor, pages = [], None, 0
+            while pages < 5:
+                page = self.make_request("GET", f"{base}/timeline?limit=2" + (f"&cursor={cursor}" if cursor else ""))
+                if page.status_code != 200:
+                    self.log_result("Briefs - History Paging", False, f"Status: {page.status_code}, Body: {page.text}")
+                    return False
+                events += page.json()["items"]
+                cursor = page.json()["next_cursor"]
+                pages += 1
+                if not cursor:
+                    break
+            keys = [(e["timestamp"], e["id"]) for e in events]
+            if len(events) != 4 or len(set(keys)) != 4 or keys != sorted(keys, reverse=True) or any("brief_id" in e for e in events):
+                self.log_result("Briefs - History Paging", False, f"Timeline pages overlap, are out of order or leak brief_id: {keys}")
+                return False
+            
+            for kind in ("diffs", "revisions"):
+                response = self.make_request("GET", f"{base}/{kind}?limit=5")
+                if response.status_code != 200 or response.json().get("items") != []:
+                    self.log_result("Briefs - History Paging", False, f"{kind} status: {response.status_code}, Body: {response.text}")
+                    return False
+            if self.make_request("GET", f"/briefs/{uuid.uuid4()}/timeline").status_code != 404:
+                self.log_result("Briefs - History Paging", False, "Unknown brief did not 404")
+                return False
+            
+            self.log_result("Briefs - History Paging", True, f"{len(events)} timeline events over {pages} pages")
+            return True
+        except Exception as e:
+            self.log_result("Briefs - History Paging", False, f"Exception: {str(e)}")
+        finally:
+            if brief_id:
+                self.make_request("DELETE", f"/briefs/{brief_id}")
+        
+        return False
+    
+    def test_readiness_revalidation(self):
+        """Test that an edit invalidates the ETag of a cached readiness score"""
+        if not self.session_token:
+            self.log_result("Briefs - Readiness Revalidation", False, "No session token available")
+            return False
+        
+        brief_id = None
+        try:
+            # Readiness is only scored for complete briefs
+            checklist = {"Approvals": [{"item": "Security sign-off", "checked": True, "owner": ""}]}
+            brief_id = self.create_scratch_brief("Readiness Revalidation Probe", status="complete", checklist=checklist)
+            endpoint = f"/briefs/{brief_id}?fields=readiness"
+            response = self.make_request("GET", endpoint)
+            etag = response.headers.get("ETag")
+            if response.status_code != 200 or not etag:
+                self.log_result("Briefs - Readiness Revalidation", False, f"Status: {response.status_code}, ETag: {etag}")
+                return False
+            before = response.json()["brief"]["readiness"]
+            
+            # A low-confidence assumption adds a readiness penalty
+            response = self.make_request("POST", f"/briefs/{brief_id}/assumptions",
+                                         {"description": "Readiness revalidation probe", "source": "user", "confidence": "low"})
+            if response.status_code != 200:
+                self.log_result("Briefs - Readiness Revalidation", False, f"Add assumption status: {response.status_code}")
+                return False
+            
+            response = self.make_request("GET", endpoint, extra_headers={"If-None-Match": etag})
+            if response.status_code != 200:
+                self.log_result("Briefs - Readiness Revalidation", False, f"Stale ETag revalidated with {response.status_code}")
+                return False
+            after = response.json()["brief"]["readiness"]
+            if after["score"] < before["score"]:
+                self.log_result("Briefs - Readiness Revalidation", True, f"Score {before['score']} -> {after['score']} after edit")
+                return True
+            self.log_result("Briefs - Readiness Revalidation", False, f"Readiness not lowered by edit: {before} -> {after}")
+                
+        except Exception as e:
+            self.log_result("Briefs - Readiness Revalidation", False, f"Exception: {str(e)}")
+        finally:
+            if brief_id:
+                self.make_request("DELETE", f"/briefs/{brief_id}")
+        
+        return False
+    
     def test_update_brief(self):
         """Test PUT /api/briefs/:id"""
         if not self.session_token or not self.created_brief_id:
@@ -300,6 +553,162 @@ class RegulaPMAPITester:
         
         return False
     
+    def test_invalidate_downstream(self):
+        """Test PUT /api/briefs/:id?invalidate=downstream checkpoint invalidation"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Briefs - Invalidate Downstream", False, "No session token or created brief available")
+            return False
+        
+        try:
+            endpoint = f"/briefs/{self.created_brief_id}?invalidate=downstream"
+            brief = self.make_request("GET", f"/briefs/{self.created_brief_id}").json()["brief"]
+            
+            # Unchanged values invalidate nothing
+            response = self.make_request("PUT", endpoint, {"geography": brief["geography"]})
+            data = response.json()
+            if response.status_code != 200 or data.get("invalidated_stages") != [] or data.get("invalidated_cache_entries") != 0:
+                self.log_result("Briefs - Invalidate Downstream", False, f"No-op edit invalidated: {response.status_code} {data.get('invalidated_stages')}")
+                return False
+            
+            # Every stage reads geography through entities
+            response = self.make_request("PUT", endpoint, {"geography": f"{brief['geography']} + Canada"})
+            stages = response.json().get("invalidated_stages")
+            expected = ["entities", "graph", "prd", "stakeholders", "checklist", "traceability", "summary"]
+            if response.status_code != 200 or stages != expected:
+                self.log_result("Briefs - Invalidate Downstream", False, f"Expected {expected}, got {stages}")
+                return False
+            
+            self.make_request("PUT", f"/briefs/{self.created_brief_id}", {"geography": brief["geography"]})
+            self.log_result("Briefs - Invalidate Downstream", True, f"Geography edit invalidated {len(stages)} stages in pipeline order")
+            return True
+        except Exception as e:
+            self.log_result("Briefs - Invalidate Downstream", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_patch_checklist(self):
+        """Test PATCH /api/briefs/:id/checklist with a version check"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Briefs - Patch Checklist", False, "No session token or created brief available")
+            return False
+        
+        try:
+            checklist = {"Approvals": [{"item": "Security sign-off", "checked": False, "owner": ""},
+                                       {"item": "Legal sign-off", "checked": False, "owner": ""}]}
+            response = self.make_request("PUT", f"/briefs/{self.created_brief_id}", {"checklist": checklist})
+            if response.status_code != 200:
+                self.log_result("Briefs - Patch Checklist", False, f"Checklist PUT failed: {response.status_code}, Body: {response.text}")
+                return False
+            brief = response.json()["brief"]
+            version = brief.get("checklist_version", 0)
+            item_id = brief["checklist"]["Approvals"][0].get("id")
+            
+            ops = [{"category": "Approvals", "id": item_id, "checked": True},
+                   {"category": "Approvals", "index": 1, "owner": "Legal"}]
+            response = self.make_request("PATCH", f"/briefs/{self.created_brief_id}/checklist", {"version": version, "ops": ops})
+            if response.status_code != 200:
+                self.log_result("Briefs - Patch Checklist", False, f"Status: {response.status_code}, Body: {response.text}")
+                return False
+            data = response.json()
+            items = data.get("items", [])
+            if data.get("checklist_version") != version + 1 or len(items) != 2 or not items[0].get("checked") or items[1].get("owner") != "Legal":
+                self.log_result("Briefs - Patch Checklist", False, f"Unexpected patch result: {data}")
+                return False
+            
+            # Replaying against the old version must be rejected
+            response = self.make_request("PATCH", f"/briefs/{self.created_brief_id}/checklist", {"version": version, "ops": ops[:1]})
+            if response.status_code == 409 and response.json().get("checklist_version") == version + 1:
+                self.log_result("Briefs - Patch Checklist", True, f"Patched 2 items at version {version + 1}, stale version rejected")
+                return True
+            self.log_result("Briefs - Patch Checklist", False, f"Stale version not rejected: {response.status_code}, Body: {response.text}")
+                
+        except Exception as e:
+            self.log_result("Briefs - Patch Checklist", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_generation_job(self):
+        """Test POST /api/briefs/:id/generate (202 + job), job polling and cancellation"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Jobs - Generate and Cancel", False, "No session token or created brief available")
+            return False
+        
+        try:
+            before = self.make_request("GET", f"/briefs/{self.created_brief_id}").json()["brief"]["status"]
+            response = self.make_request("POST", f"/briefs/{self.created_brief_id}/generate", {})
+            if response.status_code != 202 or not response.json().get("job", {}).get("id"):
+                self.log_result("Jobs - Generate and Cancel", False, f"Status: {response.status_code}, Body: {response.text}")
+                return False
+            job_id = response.json()["job"]["id"]
+            
+            # A second request while the job is active returns the same job
+            again = self.make_request("POST", f"/briefs/{self.created_brief_id}/generate", {})
+            if again.status_code != 202 or again.json()["job"]["id"] != job_id:
+                self.log_result("Jobs - Generate and Cancel", False, f"Duplicate generate created another job: {again.text}")
+                return False
+            
+            response = self.make_request("POST", f"/jobs/{job_id}/cancel", {})
+            if response.status_code != 200:
+                self.log_result("Jobs - Generate and Cancel", False, f"Cancel status: {response.status_code}, Body: {response.text}")
+                return False
+            
+            # Running jobs stop on their next heartbeat
+            job = response.json()["job"]
+            deadline = time.time() + 120
+            while job["status"] not in JOB_TERMINAL_STATUSES and time.time() < deadline:
+                time.sleep(1)
+                job = self.make_request("GET", f"/jobs/{job_id}").json()["job"]
+            if job["status"] != "cancelled":
+                self.log_result("Jobs - Generate and Cancel", False, f"Job ended {job['status']}, expected cancelled")
+                return False
+            
+            after = self.make_request("GET", f"/briefs/{self.created_brief_id}").json()["brief"]
+            if after["status"] != before:
+                self.log_result("Jobs - Generate and Cancel", False, f"Brief status {after['status']} after cancel, was {before}")
+                return False
+            if self.make_request("GET", f"/jobs/{uuid.uuid4()}").status_code != 404:
+                self.log_result("Jobs - Generate and Cancel", False, "Unknown job did not 404")
+                return False
+            
+            self.log_result("Jobs - Generate and Cancel", True, f"Job {job_id} cancelled, brief back to {before}")
+            return True
+        except Exception as e:
+            self.log_result("Jobs - Generate and Cancel", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_generation_events(self):
+        """Test GET /api/briefs/:id/events (SSE) for a brief that is not generating"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Jobs - Generation Events", False, "No session token or created brief available")
+            return False
+        
+        try:
+            # An idle brief gets one snapshot and the stream ends
+            response = self.make_request("GET", f"/briefs/{self.created_brief_id}/events")
+            if response.status_code != 200 or not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                self.log_result("Jobs - Generation Events", False, f"Status: {response.status_code}, Content-Type: {response.headers.get('Content-Type')}")
+                return False
+            events = []
+            for block in response.text.split("\n\n"):
+                fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+                if "data" in fields:
+                    events.append((fields.get("event"), json.loads(fields["data"])))
+            if len(events) != 1 or events[0][0] != "snapshot" or events[0][1].get("status") == "generating":
+                self.log_result("Jobs - Generation Events", False, f"Unexpected events: {events}")
+                return False
+            
+            if self.make_request("GET", f"/briefs/{uuid.uuid4()}/events").status_code != 404:
+                self.log_result("Jobs - Generation Events", False, "Unknown brief did not 404")
+                return False
+            
+            self.log_result("Jobs - Generation Events", True, f"Snapshot with status {events[0][1]['status']}, stream closed")
+            return True
+        except Exception as e:
+            self.log_result("Jobs - Generation Events", False, f"Exception: {str(e)}")
+        
+        return False
+    
     def test_verify_pre_generated_brief(self):
         """Test GET /api/briefs/:id on pre-generated brief to verify generated content"""
         if not self.session_token:
@@ -398,6 +807,620 @@ class RegulaPMAPITester:
         
         return False
     
+    def run_node_checks(self, test_name: str, script: str, timeout: int = 60) -> bool:
+        """Run an inline ES module check script against lib/ under Node"""
+        if not shutil.which("node"):
+            self.log_result(test_name, False, "node is not on PATH")
+            return False
+        
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / "check.mjs"
+                path.write_text(NODE_CHECK_PRELUDE + script + NODE_CHECK_REPORT)
+                result = subprocess.run(["node", "--no-warnings", str(path)], cwd=REPO_ROOT,
+                                        capture_output=True, text=True, timeout=timeout)
+            if result.returncode != 0:
+                self.log_result(test_name, False, f"node exited {result.returncode}: {result.stderr.strip()[-500:]}")
+                return False
+            checks = json.loads(result.stdout.strip().splitlines()[-1])
+            failed = [f"{c['name']}: {c['detail']}" if c["detail"] else c["name"] for c in checks if not c["ok"]]
+            if checks and not failed:
+                self.log_result(test_name, True, f"{len(checks)} checks passed")
+                return True
+            self.log_result(test_name, False, f"Failed: {failed}" if failed else "No checks ran")
+        except Exception as e:
+            self.log_result(test_name, False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_import_briefs(self):
+        """Test POST /api/briefs/import (NDJSON) and GET /api/imports/:id"""
+        if not self.session_token:
+            self.log_result("Briefs - Import", False, "No session token available")
+            return False
+        
+        try:
+            rows = [
+                {"title": "Imported Brief A", "main_input": "Bulk import test A", "launch_type": "beta"},
+                {"title": "Imported Brief B"},  # missing main_input
+                {"title": "Imported Brief C", "main_input": "Bulk import test C", "risk_tolerance": "low"},
+            ]
+            body = "\n".join(json.dumps(r) for r in rows) + "\nnot json\n"
+            response = self.session.post(f"{self.base_url}/briefs/import", data=body.encode(),
+                                         headers={"Content-Type": "application/x-ndjson"},
+                                         cookies={"session_token": self.session_token}, timeout=60)
+            if response.status_code != 202:
+                self.log_result("Briefs - Import", False, f"Status: {response.status_code}, Body: {response.text}")
+                return False
+            lines = [json.loads(l) for l in response.text.splitlines() if l.strip()]
+            summary = lines[-1]
+            statuses = {l["line"]: l["status"] for l in lines if l.get("type") == "row"}
+            if summary.get("type") != "summary" or summary.get("created") != 2 or summary.get("invalid") != 2 \
+                    or statuses != {1: "created", 2: "invalid", 3: "created", 4: "invalid"}:
+                self.log_result("Briefs - Import", False, f"Unexpected progress: {lines}")
+                return False
+            
+            response = self.make_request("GET", f"/imports/{summary['import_id']}")
+            data = response.json() if response.status_code == 200 else {}
+            imported_ids = [b["id"] for b in data.get("briefs", [])]
+            for brief_id in imported_ids:
+                self.make_request("DELETE", f"/briefs/{brief_id}")
+            if data.get("import", {}).get("status") == "complete" and len(imported_ids) == 2:
+                self.log_result("Briefs - Import", True, "Imported 2 of 4 rows, invalid rows reported per line")
+                return True
+            self.log_result("Briefs - Import", False, f"Unexpected import status: {response.status_code}, Body: {response.text}")
+                
+        except Exception as e:
+            self.log_result("Briefs - Import", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_metrics(self):
+        """Test GET /api/metrics (Prometheus text format)"""
+        try:
+            token = os.environ.get("METRICS_TOKEN")
+            public = os.environ.get("METRICS_PUBLIC") == "true"
+            anonymous = self.make_request("GET", "/metrics", include_auth=False)
+            expected_status = 401 if token else (200 if public else 403)
+            if anonymous.status_code != expected_status:
+                self.log_result("Metrics - Prometheus", False, f"Unauthenticated scrape: expected {expected_status}, got {anonymous.status_code}")
+                return False
+            if not token and not public:
+                self.log_result("Metrics - Prometheus", True, "Disabled without METRICS_TOKEN (403)")
+                return True
+            
+            headers = {"Authorization": f"Bearer {token}"} if token else None
+            response = self.make_request("GET", "/metrics", include_auth=False, extra_headers=headers)
+            
+            if response.status_code == 200:
+                body = response.text
+                content_type = response.headers.get("Content-Type", "")
+                expected = ["regulapm_http_request_duration_seconds_bucket", "# TYPE regulapm_ai_cache_misses_total counter",
+                            "# TYPE regulapm_session_cache_entries gauge", "regulapm_generation_jobs_running"]
+                missing = [name for name in expected if name not in body]
+                if content_type.startswith("text/plain") and not missing:
+                    series = sum(1 for line in body.splitlines() if line and not line.startswith("#"))
+                    self.log_result("Metrics - Prometheus", True, f"{series} series exposed")
+                    return True
+                else:
+                    self.log_result("Metrics - Prometheus", False, f"Content-Type: {content_type}, missing: {missing}")
+            else:
+                self.log_result("Metrics - Prometheus", False, f"Status: {response.status_code}, Body: {response.text}")
+                
+        except Exception as e:
+            self.log_result("Metrics - Prometheus", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_stage_scheduler(self):
+        """Test lib/scheduler.js: stage DAG ordering, concurrency, failure and cancellation"""
+        return self.run_node_checks("Library - Stage Scheduler", r"""
+const { runStageGraph } = await lib('scheduler');
+
+// entities -> (graph, prd) -> summary, with graph and prd independent
+let active = 0, peak = 0;
+const order = [];
+const stage = (name, deps, ms, value = name) => ({ name, deps, run: async results => {
+  active++; peak = Math.max(peak, active); order.push(`start:${name}`);
+  await tick(ms);
+  active--; order.push(`end:${name}`);
+  return typeof value === 'function' ? value(results) : value;
+} });
+const results = await runStageGraph([
+  stage('summary', ['graph', 'prd'], 1, r => `${r.graph}+${r.prd}`),
+  stage('graph', ['entities'], 30),
+  stage('prd', ['entities'], 30),
+  stage('entities', [], 5),
+]);
+check('dependents see their inputs', results.summary === 'graph+prd', JSON.stringify(results));
+check('independent stages overlap', peak === 2, `peak ${peak}`);
+check('a stage starts only after its deps', order.indexOf('start:summary') > order.indexOf('end:graph')
+  && order.indexOf('start:summary') > order.indexOf('end:prd') && order.indexOf('start:graph') > order.indexOf('end:entities'), order.join(' '));
+
+active = 0; peak = 0;
+await runStageGraph([stage('a', [], 10), stage('b', [], 10), stage('c', [], 10)], { concurrency: 1 });
+check('concurrency limit is respected', peak === 1, `peak ${peak}`);
+
+const rejects = async (stages, pattern) => {
+  try { await runStageGraph(stages); return false; } catch (e) { return pattern.test(e.message); }
+};
+const noop = async () => null;
+check('cycles are rejected', await rejects([{ name: 'a', deps: ['b'], run: noop }, { name: 'b', deps: ['a'], run: noop }], /cycle/));
+check('unknown deps are rejected', await rejects([{ name: 'a', deps: ['missing'], run: noop }], /unknown stage/));
+check('duplicate stages are rejected', await rejects([{ name: 'a', run: noop }, { name: 'a', run: noop }], /Duplicate/));
+
+// A failure stops new stages; in-flight siblings settle before the rejection
+const ran = [];
+let error = null;
+try {
+  await runStageGraph([
+    { name: 'bad', run: async () => { await tick(5); throw new Error('boom'); } },
+    { name: 'slow', run: async () => { await tick(30); ran.push('slow'); } },
+    { name: 'after', deps: ['bad'], run: async () => { ran.push('after'); } },
+  ]);
+} catch (e) { error = e; }
+check('the first failure is rethrown', error?.message === 'boom', error?.message);
+check('dependents of a failed stage never run', !ran.includes('after'), ran.join(','));
+check('in-flight stages settle first', ran.includes('slow'), ran.join(','));
+
+// A completion hook still writing when a sibling fails finishes before the rejection
+const hooks = [];
+try {
+  await runStageGraph([
+    { name: 'done', run: async () => 'ok' },
+    { name: 'bad', run: async () => { await tick(5); throw new Error('boom'); } },
+  ], { onComplete: async name => { await tick(30); hooks.push(name); } });
+} catch (e) { error = e; }
+check('pending onComplete hooks settle first', error?.message === 'boom' && hooks.includes('done'), hooks.join(','));
+
+const controller = new AbortController();
+const started = [];
+try {
+  await runStageGraph([
+    { name: 'first', run: async () => { started.push('first'); controller.abort(new Error('cancelled')); } },
+    { name: 'second', deps: ['first'], run: async () => { started.push('second'); } },
+  ], { signal: controller.signal });
+  error = null;
+} catch (e) { error = e; }
+check('an aborted signal stops scheduling', error?.message === 'cancelled' && !started.includes('second'), `${error?.message} ${started}`);
+""")
+    
+    def test_index_bootstrap(self):
+        """Test lib/mongodb.js: required indexes with auto-indexing off, then the full bootstrap"""
+        if not os.environ.get("MONGO_URL"):
+            self.log_result("Library - Index Bootstrap", False, "MONGO_URL is not set")
+            return False
+        return self.run_node_checks("Library - Index Bootstrap", r"""
+// A scratch database, so both connects start from no indexes at all
+process.env.DB_NAME = `regulapm_index_check_${process.pid}`;
+const connectFresh = async autoIndex => {
+  process.env.MONGO_AUTO_INDEX = autoIndex;
+  // A new module instance per connect: the cached client would skip the bootstrap
+  const { connectToDatabase } = await import(`${pathToFileURL(process.cwd()).href}/lib/mongodb.js?auto=${autoIndex}`);
+  return connectToDatabase();
+};
+const indexes = async (db, name) => (await db.collection(name).listIndexes().toArray().catch(() => []));
+const hasIndex = (list, keys, unique) => list.some(i => JSON.stringify(i.key) === JSON.stringify(keys) && Boolean(i.unique) === unique);
+
+let db = await connectFresh('false');
+try {
+  check('session tokens are unique with auto-indexing off', hasIndex(await indexes(db, 'sessions'), { token: 1 }, true));
+  const jobIndexes = await indexes(db, 'generation_jobs');
+  check('one active job per brief with auto-indexing off', hasIndex(jobIndexes, { active_brief_id: 1 }, true)
+    && jobIndexes.some(i => i.partialFilterExpression?.active_brief_id), JSON.stringify(jobIndexes));
+  check('query indexes wait for the bootstrap', !hasIndex(await indexes(db, 'decision_briefs'), { user_id: 1, updated_at: -1, id: -1 }, false));
+  const sessions = db.collection('sessions');
+  await sessions.insertOne({ token: 'duplicate' });
+  const duplicate = await sessions.insertOne({ token: 'duplicate' }).then(() => null, e => e);
+  check('a duplicate session token is rejected', duplicate?.code === 11000, duplicate?.message);
+  await db.client.close();
+
+  db = await connectFresh('true');
+  const briefIndexes = await indexes(db, 'decision_briefs');
+  check('the bootstrap creates the brief list indexes', [{ user_id: 1, updated_at: -1, id: -1 }, { user_id: 1, status: 1, updated_at: -1, id: -1 }]
+    .every(keys => hasIndex(briefIndexes, keys, false)), briefIndexes.map(i => i.name).join());
+  check('the bootstrap adds session expiry', (await indexes(db, 'sessions')).some(i => i.expireAfterSeconds === 0));
+} finally {
+  await db.dropDatabase();
+  await db.client.close();
+}
+""")
+    
+    def test_lru_cache(self):
+        """Test lib/lru.js: recency order, size bound and per-entry TTL"""
+        return self.run_node_checks("Library - LRU Cache", r"""
+const { createLruCache } = await lib('lru');
+
+const cache = createLruCache({ max: 2 });
+cache.set('a', 1);
+cache.set('b', 2);
+cache.get('a'); // a is now the most recent
+cache.set('c', 3);
+check('the least recently used entry is evicted', !cache.has('b') && cache.get('a') === 1 && cache.get('c') === 3);
+check('size stays at max', cache.size === 2, cache.size);
+cache.set('a', 10);
+check('set replaces in place', cache.get('a') === 10 && cache.size === 2);
+cache.delete('a');
+check('delete removes the entry', !cache.has('a') && cache.size === 1);
+
+const timed = createLruCache({ max: 10, ttlMs: 30 });
+timed.set('short', 1);
+timed.set('long', 2, 1000);
+timed.set('forever', 3, 0);
+await tick(50);
+check('entries expire after the default TTL', timed.get('short') === undefined);
+check('per-entry TTLs override the default', timed.get('long') === 2 && timed.get('forever') === 3);
+check('expired entries are dropped on read', timed.size === 2, timed.size);
+""")
+    
+    def test_password_pool(self):
+        """Test lib/password.js: hashing on the worker pool without stalling the event loop"""
+        return self.run_node_checks("Library - Password Pool", r"""
+const { hashPassword, verifyPassword, needsRehash, passwordPoolStats } = await lib('password');
+
+// Largest gap between 10ms timer ticks while four cost-10 hashes run
+let last = performance.now(), worstGap = 0;
+const timer = setInterval(() => { const now = performance.now(); worstGap = Math.max(worstGap, now - last); last = now; }, 10);
+const hashes = await Promise.all(['a', 'b', 'c', 'd'].map(p => hashPassword(`secret-${p}`, 10)));
+clearInterval(timer);
+check('hashing leaves the event loop responsive', worstGap < 100, `${Math.round(worstGap)}ms gap`);
+check('hashes are bcrypt at the requested cost', hashes.every(h => /^\$2[aby]\$10\$/.test(h)), hashes[0]);
+check('the right password verifies', await verifyPassword('secret-a', hashes[0]));
+check('a wrong password does not', !(await verifyPassword('secret-b', hashes[0])));
+check('a missing hash never verifies', !(await verifyPassword('secret-a', null)));
+check('cost changes call for a rehash', needsRehash(hashes[0], 12) && !needsRehash(hashes[0], 10));
+const stats = passwordPoolStats();
+check('work ran on the pool', !stats.fallback && stats.workers > 0 && stats.queued === 0, JSON.stringify(stats));
+""")
+    
+    def test_stub_model_backend(self):
+        """Test lib/model-backend.js: deterministic stub responses, latency and 429 injection"""
+        return self.run_node_checks("Library - Stub Model Backend", r"""
+const { createStubGenAI, stubResponseFor } = await lib('model-backend');
+
+const prompt = 'Generate a concise executive decision summary for this product decision.\nTitle: Payouts\nGeography: EU\nKey Risks: fraud, chargebacks';
+const first = stubResponseFor(prompt);
+check('prompts map to their stage', first.stage === 'summary', first.stage);
+check('responses are deterministic', JSON.stringify(stubResponseFor(prompt)) === JSON.stringify(first));
+check('responses read the prompt', first.value.top_risks.join() === 'fraud,chargebacks' && first.value.overview.includes('EU'), JSON.stringify(first.value));
+check('unknown prompts still answer', stubResponseFor('hello').stage === 'unknown');
+
+// The regenerate endpoints' prompts get the same shapes as the full-pipeline stages
+const section = stubResponseFor('Regenerate ONLY the "rollout_plan" section of a PRD for: Payouts\n\nContext: x\nIndustry: Fintech\n\nReturn JSON: {"rollout_plan": "..."}');
+check('section regeneration returns that section', section.stage === 'regenerate_section'
+  && Object.keys(section.value).join() === 'rollout_plan' && section.value.rollout_plan.includes('Payouts'), JSON.stringify(section));
+const pack = stubResponseFor('Regenerate critique for the Legal stakeholder regarding: Payouts\n\nContext: x\nIndustry: Fintech');
+check('stakeholder regeneration returns one critique pack', pack.stage === 'regenerate_stakeholder'
+  && ['concerns', 'required_controls', 'required_approvals', 'questions'].every(k => Array.isArray(pack.value[k]) && pack.value[k].length)
+  && pack.value.concerns[0].startsWith('Legal'), JSON.stringify(pack));
+
+const genAI = createStubGenAI({ latency: 'fixed:0,slow=fixed:40', rateLimitRate: '0,flaky=1', seed: 7 });
+const response = await genAI.models.generateContent({ model: 'fast', contents: prompt });
+check('the SDK response shape is kept', JSON.parse(response.text).recommendation && response.usageMetadata.totalTokenCount > 0);
+const started = Date.now();
+await genAI.models.generateContent({ model: 'slow', contents: prompt });
+check('per-model latency applies', Date.now() - started >= 35, `${Date.now() - started}ms`);
+let error = null;
+try { await genAI.models.generateContent({ model: 'flaky', contents: prompt }); } catch (e) { error = e; }
+check('injected errors look like SDK 429s', error?.status === 429 && /RESOURCE_EXHAUSTED/.test(error.message), error?.message);
+const stats = genAI.stats();
+check('stats count calls, 429s and stages', stats.calls === 3 && stats.rate_limited === 1 && stats.by_stage.summary === 2, JSON.stringify(stats));
+""")
+    
+    def test_model_router(self):
+        """Test lib/model-router.js: token buckets, fallback and the per-model circuit breaker"""
+        return self.run_node_checks("Library - Model Router", r"""
+const { createModelRouter, perModelLimits } = await lib('model-router');
+const rateLimited = () => Object.assign(new Error('429 RESOURCE_EXHAUSTED'), { status: 429 });
+console.log = () => {}; // the router logs retries and breaker trips
+
+const limits = perModelLimits('10,b=5', ['a', 'b']);
+check('a bare limit applies to models without their own', limits.a === 10 && limits.b === 5, JSON.stringify(limits));
+
+// 600 rpm with a bucket of one: the second call waits ~100ms for a token
+let router = createModelRouter({ models: ['a'], rpm: { a: 600 }, burst: { a: 1 } });
+let started = Date.now();
+await router.call(async () => 'ok');
+const first = Date.now() - started;
+await router.call(async () => 'ok');
+const second = Date.now() - started;
+check('a full bucket is not throttled', first < 50, `${first}ms`);
+check('an empty bucket waits for its refill', second >= 80 && second < 400, `${second}ms`);
+check('throttle time is counted', router.stats().throttle_ms > 0, router.stats().throttle_ms);
+
+// A throttled model is skipped for an unthrottled one when the wait is too long
+router = createModelRouter({ models: ['a', 'b'], rpm: { a: 1 }, burst: { a: 1 }, tokenWaitMs: 0 });
+const used = [];
+await router.call(async m => used.push(m));
+await router.call(async m => used.push(m));
+check('throttled model falls back', used.join() === 'a,b', used.join());
+
+// Two 429s open a's breaker; the call moves on to b and later calls skip a
+router = createModelRouter({ models: ['a', 'b'], retries: 3, retryBaseMs: 1, failureThreshold: 2, cooldownMs: 60 });
+const attempts = [];
+let failA = true;
+const attempt = async m => { attempts.push(m); if (m === 'a' && failA) throw rateLimited(); return m; };
+check('the call succeeds on the fallback model', await router.call(attempt) === 'b', attempts.join());
+check('the breaker opens after the threshold', attempts.join() === 'a,a,b' && router.stats().models.a.breaker === 'open', attempts.join());
+attempts.length = 0;
+await router.call(attempt);
+check('an open breaker short-circuits', attempts.join() === 'b' && router.stats().short_circuits > 0, attempts.join());
+
+// After the cool-down one probe goes to a; a failed probe doubles the cool-down
+await tick(70);
+attempts.length = 0;
+await router.call(attempt);
+check('a half-open probe is sent after the cool-down', attempts[0] === 'a', attempts.join());
+const reopened = router.stats().models.a;
+check('a failed probe doubles the cool-down', reopened.breaker === 'open' && reopened.open_for_ms > 60, JSON.stringify(reopened));
+await tick(130);
+failA = false;
+attempts.length = 0;
+await router.call(attempt);
+check('a successful probe closes the breaker', attempts.join() === 'a' && router.stats().models.a.breaker === 'closed', attempts.join());
+
+// Other errors are not retried
+router = createModelRouter({ models: ['a', 'b'], retryBaseMs: 1 });
+attempts.length = 0;
+let error = null;
+try { await router.call(async m => { attempts.push(m); throw new Error('bad request'); }); } catch (e) { error = e; }
+check('non-429 errors are thrown at once', error?.message === 'bad request' && attempts.length === 1, attempts.join());
+
+// The in-flight cap queues attempts beyond maxInFlight
+router = createModelRouter({ models: ['a'], maxInFlight: 1 });
+let active = 0, peak = 0;
+const slow = async () => { active++; peak = Math.max(peak, active); await tick(20); active--; };
+await Promise.all([router.call(slow), router.call(slow), router.call(slow)]);
+check('the in-flight cap serialises attempts', peak === 1 && router.stats().queue_wait_ms > 0, `peak ${peak}`);
+""")
+    
+    def test_keyset_cursor(self):
+        """Test lib/keyset.js: cursor encoding and the (sort value, id) tie-break across pages"""
+        return self.run_node_checks("Library - Keyset Cursors", r"""
+const { encodeCursor, decodeCursor, keysetAfter, keysetPage, clampLimit } = await lib('keyset');
+
+const cursor = encodeCursor({ id: 'b2', updated_at: '2024-05-01T00:00:00.000Z' }, 'updated_at');
+check('cursors are url-safe', /^[A-Za-z0-9_-]+$/.test(cursor), cursor);
+const decoded = decodeCursor(cursor);
+check('cursors round-trip', decoded?.value === '2024-05-01T00:00:00.000Z' && decoded?.id === 'b2', JSON.stringify(decoded));
+check('malformed cursors decode to null', [null, '', 'not-a-cursor', Buffer.from('[1,2]').toString('base64url'), Buffer.from('{}').toString('base64url')]
+  .every(c => decodeCursor(c) === null));
+check('no cursor means no filter', JSON.stringify(keysetAfter(null, 'updated_at')) === '{}');
+check('the filter breaks ties on id', JSON.stringify(keysetAfter(cursor, 'updated_at')) === JSON.stringify(
+  { $or: [{ updated_at: { $lt: '2024-05-01T00:00:00.000Z' } }, { updated_at: '2024-05-01T00:00:00.000Z', id: { $lt: 'b2' } }] }));
+check('limits are clamped', clampLimit('500', 50, 100) === 100 && clampLimit('-5', 50, 100) === 1 && clampLimit('x', 50, 100) === 50);
+
+// In-memory collection that understands the query shapes keysetPage builds
+const matches = (doc, q) => Object.entries(q).every(([k, v]) => {
+  if (k === '$or') return v.some(sub => matches(doc, sub));
+  if (v && typeof v === 'object' && '$lt' in v) return doc[k] < v.$lt;
+  return doc[k] === v;
+});
+const collection = docs => ({ find: query => {
+  let rows = docs.filter(d => matches(d, query));
+  const cursor = {
+    sort: spec => { const [[f], [g]] = Object.entries(spec); rows.sort((a, b) => (b[f] > a[f]) - (b[f] < a[f]) || (b[g] > a[g]) - (b[g] < a[g])); return cursor; },
+    limit: n => { rows = rows.slice(0, n); return cursor; },
+    toArray: async () => rows,
+  };
+  return cursor;
+} });
+
+// Five rows share one timestamp, so every page boundary falls inside a tie
+const docs = ['a', 'b', 'c', 'd', 'e'].map(id => ({ id, updated_at: '2024-05-01' }))
+  .concat([{ id: 'f', updated_at: '2024-06-01' }, { id: 'g', updated_at: '2024-04-01' }]);
+const seen = [];
+let next = null, pages = 0;
+do {
+  const page = await keysetPage(collection(docs), {}, { field: 'updated_at', cursor: next, limit: 2 });
+  seen.push(...page.items.map(d => d.id));
+  next = page.next_cursor;
+  pages++;
+} while (next && pages < 10);
+check('paging visits every row once, newest first', seen.join('') === 'fedcbag', seen.join(''));
+check('the last page has no next cursor', pages === 4, `${pages} pages`);
+""")
+    
+    def test_export_brief(self):
+        """Test GET /api/briefs/:id/export in each format, with ETag revalidation"""
+        if not self.session_token or not self.created_brief_id:
+            self.log_result("Export - Single Brief", False, "No session token or created brief available")
+            return False
+        
+        try:
+            endpoint = f"/briefs/{self.created_brief_id}/export"
+            for fmt, content_type in [("md", "text/markdown"), ("json", "application/json"), ("csv", "text/csv")]:
+                response = self.make_request("GET", f"{endpoint}?format={fmt}")
+                if response.status_code != 200 or not response.headers.get("Content-Type", "").startswith(content_type):
+                    self.log_result("Export - Single Brief", False, f"{fmt}: Status {response.status_code}, Content-Type {response.headers.get('Content-Type')}")
+                    return False
+            if response.text.splitlines()[0] != "kind,group,text,checked,owner":
+                self.log_result("Export - Single Brief", False, f"Unexpected CSV header: {response.text[:80]}")
+                return False
+            
+            response = self.make_request("GET", f"{endpoint}?format=md")
+            etag = response.headers.get("ETag")
+            if not response.text.startswith("# ") or not etag:
+                self.log_result("Export - Single Brief", False, f"Markdown body: {response.text[:80]}, ETag: {etag}")
+                return False
+            response = self.make_request("GET", f"{endpoint}?format=md", extra_headers={"If-None-Match": etag})
+            if response.status_code != 304:
+                self.log_result("Export - Single Brief", False, f"Expected 304 for matching ETag, got {response.status_code}")
+                return False
+            
+            response = self.make_request("GET", f"{endpoint}?format=pdf")
+            if response.status_code == 400:
+                self.log_result("Export - Single Brief", True, f"md/json/csv rendered, 304 on {etag}, unknown format rejected")
+                return True
+            self.log_result("Export - Single Brief", False, f"Unknown format not rejected: {response.status_code}")
+                
+        except Exception as e:
+            self.log_result("Export - Single Brief", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_export_archive(self):
+        """Test GET /api/exports as NDJSON and zip"""
+        if not self.session_token:
+            self.log_result("Export - Archive", False, "No session token available")
+            return False
+        
+        try:
+            response = self.make_request("GET", "/exports?format=ndjson", timeout=120)
+            if response.status_code != 200:
+                self.log_result("Export - Archive", False, f"NDJSON status: {response.status_code}, Body: {response.text[:200]}")
+                return False
+            briefs = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+            leaked = [b["id"] for b in briefs if "user_id" in b or "pipeline_checkpoints" in b]
+            excluded = [item for b in briefs for items in (b.get("checklist") or {}).values() for item in items if item.get("include_in_export") is False]
+            if leaked or excluded:
+                self.log_result("Export - Archive", False, f"Internal fields in {leaked}, {len(excluded)} excluded checklist items exported")
+                return False
+            
+            response = self.make_request("GET", "/exports?format=zip", timeout=120)
+            if response.status_code != 200:
+                self.log_result("Export - Archive", False, f"Zip status: {response.status_code}")
+                return False
+            archive = zipfile.ZipFile(io.BytesIO(response.content))
+            bad_member = archive.testzip()
+            names = archive.namelist()
+            if bad_member is None and len(names) == 2 * len(briefs):
+                self.log_result("Export - Archive", True, f"{len(briefs)} briefs as NDJSON, {len(names)} zip members")
+                return True
+            self.log_result("Export - Archive", False, f"Corrupt member: {bad_member}, {len(names)} members for {len(briefs)} briefs")
+                
+        except Exception as e:
+            self.log_result("Export - Archive", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_portfolio_readiness(self):
+        """Test GET /api/portfolio/readiness"""
+        if not self.session_token:
+            self.log_result("Portfolio - Readiness", False, "No session token available")
+            return False
+        
+        try:
+            response = self.make_request("GET", "/portfolio/readiness")
+            
+            if response.status_code == 200:
+                data = response.json()
+                required_fields = ["briefs", "scored", "unscored", "tiers", "distribution", "top_blockers"]
+                missing_fields = [field for field in required_fields if field not in data]
+                if not missing_fields and len(data["distribution"]) == 5:
+                    self.log_result("Portfolio - Readiness", True, f"{data['briefs']} briefs, {data['scored']} scored, tiers: {data['tiers']}")
+                    return True
+                else:
+                    self.log_result("Portfolio - Readiness", False, f"Missing fields: {missing_fields}, Body: {data}")
+            elif response.status_code == 401:
+                self.log_result("Portfolio - Readiness", False, "Authentication failed")
+            else:
+                self.log_result("Portfolio - Readiness", False, f"Status: {response.status_code}, Body: {response.text}")
+                
+        except Exception as e:
+            self.log_result("Portfolio - Readiness", False, f"Exception: {str(e)}")
+        
+        return False
+    
+    def test_import_parsers(self):
+        """Test lib/brief-import.js: CSV quoting, multibyte text split across chunks, NDJSON and row validation"""
+        return self.run_node_checks("Library - Import Parsers", r'''
+const { parseCsv, parseNdjson, validateImportRow } = await lib('brief-import');
+
+// A request body delivered as the given byte chunks
+const body = (...chunks) => new ReadableStream({ start(c) { chunks.forEach(b => c.enqueue(b)); c.close(); } });
+const bytes = text => new TextEncoder().encode(text);
+const collect = async gen => { const out = []; for await (const r of gen) out.push(r); return out; };
+
+const csv = 'title,main_input,data_sensitivity\r\n'
+  + '"Payouts","Line one\nline two, with a comma",PII; Financial\r\n'
+  + '"Say ""hi""",plain,\r\n'
+  + 'short\r\n'
+  + 'Café ☕ 🚀,Ünïcödé input,\r\n';
+const rows = await collect(parseCsv(body(bytes(csv))));
+check('quoted fields keep newlines and commas', rows[0].row?.main_input === 'Line one\nline two, with a comma', JSON.stringify(rows[0]));
+check('lists split on semicolons', JSON.stringify(rows[0].row?.data_sensitivity) === '["PII","Financial"]', JSON.stringify(rows[0]));
+check('doubled quotes unescape', rows[1].row?.title === 'Say "hi"' && !('data_sensitivity' in rows[1].row), JSON.stringify(rows[1]));
+check('records report their first line', rows.map(r => r.line).join() === '2,4,5,6', rows.map(r => r.line).join());
+check('short records are reported', /Expected 3 columns, got 1/.test(rows[2].error), JSON.stringify(rows[2]));
+check('CRLF is stripped', rows[3].row?.main_input === 'Ünïcödé input', JSON.stringify(rows[3]));
+
+// Every split point, including inside the 2-, 3- and 4-byte sequences
+const encoded = bytes(csv);
+let splitOk = true;
+for (let i = 1; i < encoded.length; i++) {
+  const split = await collect(parseCsv(body(encoded.slice(0, i), encoded.slice(i))));
+  if (JSON.stringify(split) !== JSON.stringify(rows)) { splitOk = false; check(`split at byte ${i}`, false, JSON.stringify(split)); break; }
+}
+check('multibyte characters survive any chunk boundary', splitOk && rows[3].row?.title === 'Café ☕ 🚀');
+const oneByteChunks = await collect(parseCsv(body(...[...encoded].map(b => Uint8Array.of(b)))));
+check('one-byte chunks parse the same', JSON.stringify(oneByteChunks) === JSON.stringify(rows));
+
+let error = null;
+try { await collect(parseCsv(body(bytes('title\n"never closed\n')))); } catch (e) { error = e; }
+check('unterminated quotes are an error', /Unterminated quoted field starting on line 2/.test(error?.message), error?.message);
+
+const ndjson = await collect(parseNdjson(body(bytes('{"title":"a"}\n\n[1]\n{oops\n{"title":"b"}'))));
+check('NDJSON rows keep their line numbers', ndjson.map(r => r.line).join() === '1,3,4,5', ndjson.map(r => r.line).join());
+check('NDJSON rejects non-objects and bad JSON', /JSON object/.test(ndjson[1].error) && /Invalid JSON/.test(ndjson[2].error) && ndjson[3].row?.title === 'b');
+
+check('valid rows are trimmed', validateImportRow({ title: ' T ', main_input: 'x', launch_type: 'beta', extra: 1 }).brief?.title === 'T');
+check('enums are enforced', /launch_type must be one of/.test(validateImportRow({ title: 'T', main_input: 'x', launch_type: 'soon' }).error));
+check('title and main_input are required', validateImportRow({ title: 'T' }).error === 'main_input is required');
+''')
+    
+    def test_export_engine(self):
+        """Test lib/export.js: crc32, the streaming zip writer and the renderers"""
+        return self.run_node_checks("Library - Export Engine", r'''
+const { inflateRawSync } = await import('node:zlib');
+const { crc32, createZipWriter, renderExport, exportFilename } = await lib('export');
+
+check('crc32 check value', crc32(Buffer.from('123456789')) === 0xCBF43926, crc32(Buffer.from('123456789')).toString(16));
+check('crc32 of nothing', crc32(Buffer.alloc(0)) === 0);
+
+const files = [
+  ['briefs/payouts-1a2b3c4d.md', '# Payouts\n\n' + 'compressible '.repeat(500)],
+  ['briefs/café-☕.json', JSON.stringify({ title: 'Café ☕' })],
+  ['empty.csv', ''],
+];
+const zip = createZipWriter();
+const archive = Buffer.concat([...files.map(([name, content]) => zip.entry(name, content, new Date(2024, 4, 1, 12, 30, 10))), zip.finish()]);
+
+// Read it back from the end-of-central-directory record, as an unzipper would
+const end = archive.length - 22;
+check('archive ends with an EOCD record', archive.readUInt32LE(end) === 0x06054B50);
+check('EOCD counts every entry', archive.readUInt16LE(end + 10) === files.length, archive.readUInt16LE(end + 10));
+let at = archive.readUInt32LE(end + 16);
+check('central directory sits right before the EOCD', at + archive.readUInt32LE(end + 12) === end);
+files.forEach(([name, content]) => {
+  const ok = archive.readUInt32LE(at) === 0x02014B50;
+  const nameLength = archive.readUInt16LE(at + 28);
+  const storedName = archive.subarray(at + 46, at + 46 + nameLength).toString();
+  const crc = archive.readUInt32LE(at + 16);
+  const size = archive.readUInt32LE(at + 24);
+  const local = archive.readUInt32LE(at + 42);
+  const compressedSize = archive.readUInt32LE(local + 18);
+  const dataStart = local + 30 + archive.readUInt16LE(local + 26) + archive.readUInt16LE(local + 28);
+  const data = inflateRawSync(archive.subarray(dataStart, dataStart + compressedSize));
+  check(`${name} round-trips`, ok && storedName === name && archive.readUInt32LE(local) === 0x04034B50
+    && data.toString() === content && size === Buffer.byteLength(content) && crc === crc32(data), storedName);
+  check(`${name} is flagged UTF-8`, (archive.readUInt16LE(at + 8) & 0x0800) !== 0);
+  at += 46 + nameLength;
+});
+const dosTime = archive.readUInt16LE(10), dosDate = archive.readUInt16LE(12);
+check('modification time is DOS-encoded', dosTime === ((12 << 11) | (30 << 5) | 5) && dosDate === (((2024 - 1980) << 9) | (5 << 5) | 1));
+check('content is deflated', archive.readUInt32LE(18) < Buffer.byteLength(files[0][1]) / 10);
+
+const brief = { id: '1a2b3c4d-0000', title: 'Payouts: "v2", EU/UK', industry_context: 'Fintech',
+  prd_sections: { goals: 'G', problem_statement: 'P' },
+  checklist: { Legal: [{ item: 'DPA, signed', checked: true, owner: 'Ann' }, { item: 'Hidden', include_in_export: false }] } };
+const md = renderExport(brief, 'md');
+check('markdown follows section order', md.indexOf('## Problem Statement') < md.indexOf('## Goals') && md.includes('- [x] DPA, signed (Owner: Ann)'));
+check('excluded checklist items are dropped', !md.includes('Hidden') && !renderExport(brief, 'json').includes('Hidden'));
+check('CSV fields are quoted when needed', renderExport(brief, 'csv').includes('checklist_item,Legal,"DPA, signed",true,Ann\r\n'));
+check('download names are ASCII slugs', exportFilename(brief, 'md') === 'Payouts-v2-EUUK-1a2b3c4d.md', exportFilename(brief, 'md'));
+''')
+    
     def test_logout(self):
         """Test POST /api/auth/logout"""
         if not self.session_token:
@@ -431,7 +1454,7 @@ class RegulaPMAPITester:
     def run_all_tests(self):
         """Run all backend API tests in proper sequence"""
         print(f"\n🚀 Starting RegulaPM Nexus Backend API Tests")
-        print(f"Base URL: {BASE_URL}")
+        print(f"Base URL: {self.base_url}")
         print(f"Test Account: {TEST_ACCOUNT['email']}")
         print("-" * 60)
         
@@ -440,12 +1463,35 @@ class RegulaPMAPITester:
         self.test_signup()
         self.test_login()
         self.test_auth_me()
+        self.test_session_revocation()
         self.test_list_briefs()
+        self.test_list_briefs_pagination()
         self.test_create_brief()
         self.test_get_brief()
+        self.test_get_brief_conditional()
         self.test_update_brief()
+        self.test_invalidate_downstream()
+        self.test_patch_checklist()
+        self.test_generation_job()
+        self.test_generation_events()
         self.test_verify_pre_generated_brief()  # Verify pre-generated instead of generate
+        self.test_readiness_revalidation()
+        self.test_brief_history_paging()
         self.test_seed_briefs()
+        self.test_import_briefs()
+        self.test_export_brief()
+        self.test_export_archive()
+        self.test_portfolio_readiness()
+        self.test_metrics()
+        self.test_stage_scheduler()
+        self.test_lru_cache()
+        self.test_index_bootstrap()
+        self.test_password_pool()
+        self.test_stub_model_backend()
+        self.test_model_router()
+        self.test_keyset_cursor()
+        self.test_import_parsers()
+        self.test_export_engine()
         self.test_delete_brief()
         self.test_logout()
         
@@ -470,13 +1516,323 @@ class RegulaPMAPITester:
             print(f"⚠️  {total - passed} tests failed")
             return False
 
+# ========== BENCHMARK MODE ==========
+# Weighted operation mix for virtual users; override with --mix op=weight,...
+DEFAULT_BENCH_MIX = {
+    "list_briefs": 30,
+    "get_brief": 30,
+    "create_brief": 8,
+    "update_brief": 10,
+    "section_status": 8,
+    "add_assumption": 8,
+    "delete_brief": 6,
+    # Full AI pipeline per call; enable with e.g. --mix ...,generate=2 against a
+    # server running GEMINI_BACKEND=stub to measure end-to-end generation throughput
+    "generate": 0,
+}
+
+# Operations that need an existing brief fall back to creating one
+BRIEF_OPERATIONS = {"get_brief", "update_brief", "section_status", "add_assumption", "delete_brief", "generate"}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BenchmarkVirtualUser(RegulaPMAPITester):
+    """One simulated user with its own account, session and briefs"""
+
+    def __init__(self, base_url: str, index: int, samples: List[Dict[str, Any]], lock: threading.Lock):
+        super().__init__(base_url)
+        self.index = index
+        self.samples = samples
+        self.lock = lock
+        self.brief_ids: List[str] = []
+
+    def timed_request(self, operation: str, endpoint_label: str, method: str, endpoint: str,
+                      data: Optional[Dict] = None, timeout: int = 30) -> Optional[requests.Response]:
+        """Issue a request and record its latency; network errors count as status 0"""
+        url = f"{self.base_url}{endpoint}"
+        cookies = {"session_token": self.session_token} if self.session_token else {}
+        start = time.perf_counter()
+        response = None
+        status = 0
+        try:
+            response = self.session.request(method, url, json=data, cookies=cookies, timeout=timeout)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            pass
+        self.record(operation, endpoint_label, status, 200 <= status < 400, (time.perf_counter() - start) * 1000)
+        return response
+
+    def record(self, operation: str, endpoint_label: str, status: int, ok: bool, latency_ms: float) -> None:
+        with self.lock:
+            self.samples.append({
+                "operation": operation,
+                "endpoint": endpoint_label,
+                "status": status,
+                "ok": ok,
+                "latency_ms": latency_ms,
+                "finished_at": time.time(),
+            })
+
+    def setup(self) -> bool:
+        """Sign up a fresh account so every virtual user has its own session"""
+        signup_data = {
+            "email": f"bench_{uuid.uuid4().hex[:10]}@regulapm.io",
+            "password": "benchpass123",
+            "name": f"Bench User {self.index}",
+        }
+        response = self.timed_request("signup", "POST /auth/signup", "POST", "/auth/signup", signup_data)
+        if response is None or response.status_code != 200:
+            return False
+        self.session_token = response.cookies.get("session_token")
+        return bool(self.session_token) and self.op_create_brief()
+
+    def op_list_briefs(self) -> bool:
+        response = self.timed_request("list_briefs", "GET /briefs", "GET", "/briefs")
+        return response is not None and response.ok
+
+    def op_get_brief(self) -> bool:
+        brief_id = random.choice(self.brief_ids)
+        response = self.timed_request("get_brief", "GET /briefs/:id", "GET", f"/briefs/{brief_id}")
+        return response is not None and response.ok
+
+    def op_create_brief(self) -> bool:
+        brief_data = {
+            "title": f"Bench Brief {self.index}-{uuid.uuid4().hex[:6]}",
+            "input_type": "feature_idea",
+            "main_input": "Benchmark feature - export audit logs to customer-managed storage buckets",
+            "industry_context": random.choice(["Fintech", "Healthcare", "Insurance", "Enterprise SaaS"]),
+            "data_sensitivity": ["PII"],
+            "geography": random.choice(["US", "EU", "Global"]),
+            "launch_type": "beta",
+            "risk_tolerance": "medium",
+        }
+        response = self.timed_request("create_brief", "POST /briefs", "POST", "/briefs", brief_data)
+        if response is not None and response.ok:
+            self.brief_ids.append(response.json()["brief"]["id"])
+            return True
+        return False
+
+    def op_update_brief(self) -> bool:
+        brief_id = random.choice(self.brief_ids)
+        update_data = {"title": f"Bench Brief {self.index} (rev {datetime.now().strftime('%H%M%S%f')})"}
+        response = self.timed_request("update_brief", "PUT /briefs/:id", "PUT", f"/briefs/{brief_id}", update_data)
+        return response is not None and response.ok
+
+    def op_section_status(self) -> bool:
+        brief_id = random.choice(self.brief_ids)
+        status_data = {
+            "section": random.choice(["problem_statement", "goals", "rollout_plan"]),
+            "status": random.choice(["approved", "needs_review", "risk_identified"]),
+        }
+        response = self.timed_request("section_status", "PUT /briefs/:id/section-status", "PUT",
+                                      f"/briefs/{brief_id}/section-status", status_data)
+        return response is not None and response.ok
+
+    def op_add_assumption(self) -> bool:
+        brief_id = random.choice(self.brief_ids)
+        assumption_data = {
+            "description": f"Benchmark assumption {uuid.uuid4().hex[:8]}",
+            "source": "user",
+            "confidence": random.choice(["high", "medium", "low"]),
+        }
+        response = self.timed_request("add_assumption", "POST /briefs/:id/assumptions", "POST",
+                                      f"/briefs/{brief_id}/assumptions", assumption_data)
+        return response is not None and response.ok
+
+    def op_delete_brief(self) -> bool:
+        # Keep at least one brief around for the read-heavy operations
+        if len(self.brief_ids) < 2:
+            return self.op_create_brief()
+        brief_id = self.brief_ids.pop(random.randrange(len(self.brief_ids)))
+        response = self.timed_request("delete_brief", "DELETE /briefs/:id", "DELETE", f"/briefs/{brief_id}")
+        return response is not None and response.ok
+
+    def op_generate(self, poll_interval: float = 0.5, timeout: float = 300) -> bool:
+        """Enqueue a fresh generation and wait for the job; records enqueue and end-to-end latency"""
+        brief_id = random.choice(self.brief_ids)
+        start = time.perf_counter()
+        response = self.timed_request("generate", "POST /briefs/:id/generate", "POST",
+                                      f"/briefs/{brief_id}/generate", {"fresh": True})
+        if response is None or response.status_code != 202:
+            return False
+        job_id = response.json()["job"]["id"]
+        cookies = {"session_token": self.session_token}
+        status = "queued"
+        while status not in JOB_TERMINAL_STATUSES and time.perf_counter() - start < timeout:
+            time.sleep(poll_interval)
+            try:
+                poll = self.session.get(f"{self.base_url}/jobs/{job_id}", cookies=cookies, timeout=30)
+                if poll.ok:
+                    status = poll.json()["job"]["status"]
+            except requests.exceptions.RequestException:
+                pass
+        ok = status == "succeeded"
+        self.record("generate", "generate (end-to-end)", 200 if ok else 500, ok, (time.perf_counter() - start) * 1000)
+        return ok
+
+    def run(self, mix: Dict[str, int], deadline: float, think_time: float) -> None:
+        operations = [op for op, weight in mix.items() if weight > 0]
+        weights = [mix[op] for op in operations]
+        while time.time() < deadline:
+            operation = random.choices(operations, weights=weights)[0]
+            if operation in BRIEF_OPERATIONS and not self.brief_ids:
+                operation = "create_brief"
+            getattr(self, f"op_{operation}")()
+            if think_time > 0:
+                time.sleep(random.uniform(0, think_time))
+
+
+class RegulaPMBenchmark:
+    """Runs N virtual users against the API and reports per-endpoint latency"""
+
+    def __init__(self, base_url: str, users: int, duration: float, mix: Dict[str, int],
+                 think_time: float = 0.0, ramp_up: float = 0.0):
+        self.base_url = base_url
+        self.users = users
+        self.duration = duration
+        self.mix = mix
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.samples: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def _virtual_user(self, index: int, start_at: float, deadline: float) -> bool:
+        time.sleep(max(0.0, start_at - time.time()))
+        user = BenchmarkVirtualUser(self.base_url, index, self.samples, self.lock)
+        if not user.setup():
+            return False
+        user.run(self.mix, deadline, self.think_time)
+        return True
+
+    def run(self) -> Dict[str, Any]:
+        print(f"\n📈 Benchmarking {self.base_url}")
+        print(f"Virtual users: {self.users}, duration: {self.duration}s, ramp-up: {self.ramp_up}s")
+        print(f"Mix: {self.mix}")
+        print("-" * 60)
+        started_at = datetime.now().isoformat()
+        start = time.time()
+        deadline = start + self.ramp_up + self.duration
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            futures = [
+                pool.submit(self._virtual_user, i, start + self.ramp_up * i / max(1, self.users), deadline)
+                for i in range(self.users)
+            ]
+            setup_ok = sum(1 for f in futures if f.result())
+        elapsed = time.time() - start
+        return self.build_report(started_at, elapsed, setup_ok)
+
+    def build_report(self, started_at: str, elapsed: float, setup_ok: int) -> Dict[str, Any]:
+        by_endpoint: Dict[str, List[Dict[str, Any]]] = {}
+        for sample in self.samples:
+            by_endpoint.setdefault(sample["endpoint"], []).append(sample)
+
+        def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+            latencies = [s["latency_ms"] for s in samples]
+            errors = sum(1 for s in samples if not s["ok"])
+            return {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+                "latency_ms": {
+                    "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                    "p50": round(percentile(latencies, 50), 2),
+                    "p95": round(percentile(latencies, 95), 2),
+                    "p99": round(percentile(latencies, 99), 2),
+                    "max": round(max(latencies), 2) if latencies else 0.0,
+                },
+                "status_codes": {str(code): sum(1 for s in samples if s["status"] == code)
+                                 for code in sorted({s["status"] for s in samples})},
+            }
+
+        return {
+            "base_url": self.base_url,
+            "started_at": started_at,
+            "elapsed_seconds": round(elapsed, 2),
+            "virtual_users": self.users,
+            "virtual_users_ready": setup_ok,
+            "duration_seconds": self.duration,
+            "ramp_up_seconds": self.ramp_up,
+            "think_time_seconds": self.think_time,
+            "mix": self.mix,
+            "overall": summarize(self.samples),
+            "endpoints": {endpoint: summarize(samples) for endpoint, samples in sorted(by_endpoint.items())},
+        }
+
+    @staticmethod
+    def print_report(report: Dict[str, Any]) -> None:
+        print("\n" + "=" * 96)
+        print("🏁 BENCHMARK SUMMARY")
+        print("=" * 96)
+        header = f"{'Endpoint':<36}{'reqs':>7}{'err%':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+        print(header)
+        rows = list(report["endpoints"].items()) + [("ALL", report["overall"])]
+        for endpoint, stats in rows:
+            lat = stats["latency_ms"]
+            print(f"{endpoint:<36}{stats['requests']:>7}{stats['error_rate'] * 100:>6.1f}%{stats['throughput_rps']:>8.1f}"
+                  f"{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}{lat['max']:>9.1f}")
+        print(f"\nVirtual users ready: {report['virtual_users_ready']}/{report['virtual_users']}, "
+              f"elapsed: {report['elapsed_seconds']}s (latencies in ms)")
+
+    @staticmethod
+    def write_report(report: Dict[str, Any], output: Optional[str] = None) -> Path:
+        path = Path(output) if output else REPORTS_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        return path
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """Parse "op=weight,op=weight" into a mix, validating operation names"""
+    if not value:
+        return dict(DEFAULT_BENCH_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_BENCH_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (choose from {', '.join(DEFAULT_BENCH_MIX)})")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one operation needs a positive weight")
+    return mix
+
+
 def main():
     """Main test runner"""
-    tester = RegulaPMAPITester()
+    parser = argparse.ArgumentParser(description="RegulaPM Nexus backend API tests and load benchmark")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL, e.g. http://localhost:3000/api (env REGULAPM_BASE_URL)")
+    parser.add_argument("--bench", action="store_true", help="Run the concurrent load benchmark instead of the functional pass")
+    parser.add_argument("--users", type=int, default=10, help="Number of virtual users (benchmark mode)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds each virtual user keeps issuing requests")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which virtual users are started")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between a user's requests, in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Weighted operation mix, e.g. list_briefs=40,get_brief=40,create_brief=20")
+    parser.add_argument("--output", default=None, help="Report path (default: test_reports/benchmark_<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark = RegulaPMBenchmark(args.base_url, args.users, args.duration, args.mix or dict(DEFAULT_BENCH_MIX),
+                                      think_time=args.think_time, ramp_up=args.ramp_up)
+        report = benchmark.run()
+        RegulaPMBenchmark.print_report(report)
+        path = RegulaPMBenchmark.write_report(report, args.output)
+        print(f"Report written to {path}")
+        exit(0 if report["virtual_users_ready"] > 0 else 1)
+
+    tester = RegulaPMAPITester(args.base_url)
     success = tester.run_all_tests()
     
     # Exit with proper code
     exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
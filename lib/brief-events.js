@@ -0,0 +1,42 @@
+import { EventEmitter } from 'events';
+
+// In-process pub/sub for generation progress, used by the SSE endpoint.
+// Every event carries the brief's `generation_seq` after the write that
+// produced it; a short per-brief replay buffer lets reconnecting clients resume
+// from their Last-Event-ID without re-reading the document.
+const REPLAY_LIMIT = 100;
+const REPLAY_RETENTION_MS = 5 * 60 * 1000;
+const TERMINAL_EVENTS = ['complete', 'error', 'cancelled'];
+
+const bus = new EventEmitter();
+bus.setMaxListeners(0);
+const buffers = new Map(); // brief id -> { events, expiry }
+
+export function publishBriefEvent(briefId, event) {
+  let buffer = buffers.get(briefId);
+  if (!buffer) { buffer = { events: [], expiry: null }; buffers.set(briefId, buffer); }
+  buffer.events.push(event);
+  if (buffer.events.length > REPLAY_LIMIT) buffer.events.shift();
+  // Kept for REPLAY_RETENTION_MS after the latest event, terminal or not, so a
+  // run that dies without a terminal event does not keep its buffer forever
+  clearTimeout(buffer.expiry);
+  buffer.expiry = setTimeout(() => buffers.delete(briefId), REPLAY_RETENTION_MS);
+  buffer.expiry.unref?.();
+  bus.emit(briefId, event);
+}
+
+export function subscribeBriefEvents(briefId, listener) {
+  bus.on(briefId, listener);
+  return () => bus.off(briefId, listener);
+}
+
+// Events after `lastSeq`, or null when the buffer no longer covers that point
+export function replayBriefEvents(briefId, lastSeq) {
+  const events = buffers.get(briefId)?.events || [];
+  if (events.length === 0 || events[0].seq > lastSeq + 1) return null;
+  return events.filter(e => e.seq > lastSeq);
+}
+
+export function isTerminalBriefEvent(event) {
+  return TERMINAL_EVENTS.includes(event.type);
+}
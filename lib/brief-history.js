@@ -0,0 +1,63 @@
+import { randomUUID } from 'crypto';
+import { keysetPage, clampLimit } from '@/lib/keyset';
+
+// Append-only history for decision briefs.
+// Timeline events, revisions and regeneration diffs live in their own
+// collections, keyed by (brief_id, timestamp, id); the brief document embeds only
+// the most recent BRIEF_HISTORY_TAIL events and revisions, and only
+// { id, timestamp } references to each section's latest diff.
+export const BRIEF_HISTORY_TAIL = parseInt(process.env.BRIEF_HISTORY_TAIL || '20', 10);
+
+export const HISTORY_COLLECTIONS = {
+  timeline_events: 'brief_timeline_events',
+  revisions: 'brief_revisions',
+  regeneration_diffs: 'brief_regeneration_diffs',
+};
+
+const MAX_PAGE_SIZE = 200;
+
+// `$push` clause that appends to the embedded tails and trims them
+export function historyPush({ timeline_events = [], revisions = [] }) {
+  const push = {};
+  if (timeline_events.length) push.timeline_events = { $each: timeline_events, $slice: -BRIEF_HISTORY_TAIL };
+  if (revisions.length) push.revisions = { $each: revisions, $slice: -BRIEF_HISTORY_TAIL };
+  return push;
+}
+
+// Persists the full records; call after the brief update that embedded them
+export async function appendBriefHistory(db, briefId, { timeline_events = [], revisions = [] }) {
+  const writes = [];
+  if (timeline_events.length) {
+    writes.push(db.collection(HISTORY_COLLECTIONS.timeline_events).insertMany(timeline_events.map(e => ({ ...e, brief_id: briefId })), { ordered: false }));
+  }
+  if (revisions.length) {
+    writes.push(db.collection(HISTORY_COLLECTIONS.revisions).insertMany(revisions.map(r => ({ ...r, brief_id: briefId })), { ordered: false }));
+  }
+  await Promise.all(writes);
+}
+
+// Stores a section's old/new text; returns the { id, timestamp } reference to embed
+export async function recordRegenerationDiff(db, briefId, section, { old_content, new_content, timestamp }) {
+  const diff = { id: randomUUID(), brief_id: briefId, section, old_content, new_content, timestamp };
+  await db.collection(HISTORY_COLLECTIONS.regeneration_diffs).insertOne(diff);
+  return { id: diff.id, timestamp };
+}
+
+// Newest-first keyset page: { items, next_cursor }. `filter` narrows the
+// brief's records (e.g. { section } for diffs); `cursor` is the previous next_cursor.
+export async function listBriefHistory(db, kind, briefId, { cursor, limit, filter = {}, projection = {} } = {}) {
+  return keysetPage(db.collection(HISTORY_COLLECTIONS[kind]), { brief_id: briefId, ...filter }, {
+    field: 'timestamp',
+    cursor,
+    limit: clampLimit(limit, 50, MAX_PAGE_SIZE),
+    projection: { _id: 0, brief_id: 0, ...projection },
+  });
+}
+
+export async function getRegenerationDiff(db, briefId, diffId) {
+  return db.collection(HISTORY_COLLECTIONS.regeneration_diffs).findOne({ id: diffId, brief_id: briefId }, { projection: { _id: 0 } });
+}
+
+export async function deleteBriefHistory(db, briefId) {
+  await Promise.all(Object.values(HISTORY_COLLECTIONS).map(name => db.collection(name).deleteMany({ brief_id: briefId })));
+}
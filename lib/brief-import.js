@@ -0,0 +1,148 @@
+// Streaming parsers and row validation for POST /api/briefs/import.
+// Rows are read off the request body one at a time, so an import of any size
+// holds at most one chunk of briefs in memory.
+//
+//   NDJSON: one JSON object per line
+//   CSV:    header row naming the columns; quoted fields may span lines;
+//           data_sensitivity lists are separated with ";"
+
+export const IMPORT_FIELDS = ['title', 'input_type', 'main_input', 'industry_context', 'data_sensitivity', 'geography', 'launch_type', 'risk_tolerance'];
+
+const ENUMS = {
+  input_type: ['feature_idea', 'prd_excerpt'],
+  launch_type: ['internal', 'beta', 'GA'],
+  risk_tolerance: ['low', 'medium', 'high'],
+};
+const MAX_LENGTHS = { title: 200, main_input: 20000, industry_context: 100, geography: 100 };
+const MAX_ROW_BYTES = 64 * 1024;
+
+// Yields decoded text chunks from a web ReadableStream
+async function* textChunks(body) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  try {
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      yield decoder.decode(value, { stream: true });
+    }
+    const rest = decoder.decode();
+    if (rest) yield rest;
+  } finally {
+    reader.releaseLock();
+  }
+}
+
+// { line, row } per non-blank line, or { line, error } if it is not a JSON object
+export async function* parseNdjson(body) {
+  let buffer = '';
+  let line = 0;
+  const parse = text => {
+    line++;
+    if (!text.trim()) return null;
+    if (text.length > MAX_ROW_BYTES) return { line, error: `Row exceeds ${MAX_ROW_BYTES} bytes` };
+    try {
+      const row = JSON.parse(text);
+      return row && typeof row === 'object' && !Array.isArray(row) ? { line, row } : { line, error: 'Row must be a JSON object' };
+    } catch (error) {
+      return { line, error: `Invalid JSON: ${error.message}` };
+    }
+  };
+  for await (const chunk of textChunks(body)) {
+    buffer += chunk;
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+      const result = parse(buffer.slice(0, newline).replace(/\r$/, ''));
+      buffer = buffer.slice(newline + 1);
+      if (result) yield result;
+    }
+    if (buffer.length > MAX_ROW_BYTES) throw new Error(`Line ${line + 1} exceeds ${MAX_ROW_BYTES} bytes`);
+  }
+  const result = parse(buffer);
+  if (result) yield result;
+}
+
+// RFC 4180 records: yields { line, fields } with `line` the record's first line
+async function* csvRecords(body) {
+  let fields = [];
+  let field = '';
+  let quoted = false;
+  let pendingQuote = false; // saw a quote inside a quoted field; next char decides
+  let line = 1;
+  let start = 1;
+  let size = 0;
+  for await (const chunk of textChunks(body)) {
+    for (const ch of chunk) {
+      size += ch.length;
+      if (size > MAX_ROW_BYTES) throw new Error(`Record starting on line ${start} exceeds ${MAX_ROW_BYTES} bytes`);
+      if (pendingQuote) {
+        pendingQuote = false;
+        if (ch === '"') { field += '"'; continue; }
+        quoted = false;
+      }
+      if (quoted) {
+        if (ch === '"') pendingQuote = true;
+        else { if (ch === '\n') line++; field += ch; }
+      } else if (ch === '"' && field === '') {
+        quoted = true;
+      } else if (ch === ',') {
+        fields.push(field);
+        field = '';
+      } else if (ch === '\n') {
+        fields.push(field.replace(/\r$/, ''));
+        yield { line: start, fields };
+        fields = [];
+        field = '';
+        size = 0;
+        start = ++line;
+      } else {
+        field += ch;
+      }
+    }
+  }
+  if (quoted && !pendingQuote) throw new Error(`Unterminated quoted field starting on line ${start}`);
+  if (field !== '' || fields.length) {
+    fields.push(field.replace(/\r$/, ''));
+    yield { line: start, fields };
+  }
+}
+
+export async function* parseCsv(body) {
+  let header = null;
+  for await (const { line, fields } of csvRecords(body)) {
+    if (fields.length === 1 && !fields[0].trim()) continue;
+    if (!header) { header = fields.map(f => f.trim()); continue; }
+    if (fields.length !== header.length) {
+      yield { line, error: `Expected ${header.length} columns, got ${fields.length}` };
+      continue;
+    }
+    const row = {};
+    header.forEach((name, i) => {
+      if (fields[i] === '') return;
+      row[name] = name === 'data_sensitivity' ? fields[i].split(';').map(s => s.trim()).filter(Boolean) : fields[i];
+    });
+    yield { line, row };
+  }
+}
+
+// Returns { brief } with the importable fields, or { error }. Unknown columns are ignored.
+export function validateImportRow(row) {
+  const brief = {};
+  for (const key of IMPORT_FIELDS) {
+    const value = row[key];
+    if (value === undefined || value === null || value === '') continue;
+    if (key === 'data_sensitivity') {
+      if (!Array.isArray(value) || value.some(v => typeof v !== 'string')) return { error: 'data_sensitivity must be a list of strings' };
+      brief[key] = value;
+      continue;
+    }
+    if (typeof value !== 'string') return { error: `${key} must be a string` };
+    const text = value.trim();
+    if (ENUMS[key] && !ENUMS[key].includes(text)) return { error: `${key} must be one of ${ENUMS[key].join(', ')}` };
+    if (text.length > (MAX_LENGTHS[key] || Infinity)) return { error: `${key} exceeds ${MAX_LENGTHS[key]} characters` };
+    brief[key] = text;
+  }
+  if (!brief.title) return { error: 'title is required' };
+  if (!brief.main_input) return { error: 'main_input is required' };
+  return { brief };
+}
@@ -0,0 +1,14 @@
+// PRD sections in display order, shared by the brief page and the server-side
+// exports so both render the same headings
+export const SECTION_LABELS = {
+  problem_statement: 'Problem Statement',
+  goals: 'Goals',
+  non_goals: 'Non-Goals',
+  user_stories: 'User Stories',
+  functional_requirements: 'Functional Requirements',
+  compliance_risk_requirements: 'Compliance & Risk Requirements',
+  stakeholder_notes: 'Stakeholder Notes',
+  rollout_plan: 'Rollout Plan',
+  metrics: 'Metrics',
+  open_questions: 'Open Questions',
+};
@@ -0,0 +1,181 @@
+import { deflateRawSync } from 'zlib';
+import { SECTION_LABELS } from '@/lib/brief-sections';
+
+// Server-side brief renderings for GET /api/briefs/:id/export and the
+// all-briefs archive at GET /api/exports. Renderers are pure functions of the
+// brief document, so a rendering is cacheable for as long as the brief's
+// version is unchanged.
+
+export const EXPORT_FORMATS = {
+  md: { contentType: 'text/markdown; charset=utf-8', extension: 'md' },
+  json: { contentType: 'application/json; charset=utf-8', extension: 'json' },
+  csv: { contentType: 'text/csv; charset=utf-8', extension: 'csv' },
+};
+
+const CRITIQUE_FIELDS = {
+  concerns: 'Concerns',
+  required_controls: 'Required Controls',
+  required_approvals: 'Required Approvals',
+  questions: 'Questions',
+};
+
+// Internal bookkeeping that never leaves the server
+export const EXPORT_PROJECTION = {
+  _id: 0, user_id: 0, pipeline_checkpoints: 0, stage_metrics: 0, generation_seq: 0, generation_job_id: 0,
+  generation_stage: 0, generation_running: 0, error_message: 0, import_id: 0, import_line: 0,
+  status_before_generation: 0,
+};
+
+// Items unticked from "include in export" are dropped; items predating the flag are kept
+export function exportableChecklist(checklist) {
+  if (!checklist) return checklist;
+  return Object.fromEntries(Object.entries(checklist).map(([category, items]) => [category, (items || []).filter(item => item?.include_in_export !== false)]));
+}
+
+export function exportDocument(brief) {
+  return { ...brief, checklist: exportableChecklist(brief.checklist) };
+}
+
+function renderMarkdown(brief) {
+  let md = `# ${brief.title}\n\n**Industry:** ${brief.industry_context} | **Geography:** ${brief.geography} | **Risk:** ${brief.risk_tolerance} | **Launch:** ${brief.launch_type}\n\n---\n\n`;
+  if (!brief.prd_sections) md += `## Product Input\n\n${brief.main_input || ''}\n\n`;
+  Object.entries(SECTION_LABELS).forEach(([key, label]) => { if (brief.prd_sections?.[key]) md += `## ${label}\n\n${brief.prd_sections[key]}\n\n`; });
+  if (brief.stakeholder_critiques) {
+    md += `---\n\n# Stakeholder Critiques\n\n`;
+    Object.entries(brief.stakeholder_critiques).forEach(([name, data]) => {
+      md += `## ${name}\n\n`;
+      Object.entries(CRITIQUE_FIELDS).forEach(([key, label]) => {
+        if (data?.[key]?.length) md += `### ${label}\n${data[key].map(c => `- ${c}`).join('\n')}\n\n`;
+      });
+    });
+  }
+  const checklist = exportableChecklist(brief.checklist);
+  if (checklist) {
+    md += `---\n\n# Checklist\n\n`;
+    Object.entries(checklist).forEach(([cat, items]) => {
+      md += `## ${cat}\n`;
+      items.forEach(item => { md += `- [${item.checked ? 'x' : ' '}] ${item.item}${item.owner ? ` (Owner: ${item.owner})` : ''}\n`; });
+      md += '\n';
+    });
+  }
+  return md;
+}
+
+const csvField = value => {
+  const text = value === undefined || value === null ? '' : String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+// One row per PRD section, critique entry and checklist item
+function renderCsv(brief) {
+  const rows = [['kind', 'group', 'text', 'checked', 'owner']];
+  Object.entries(SECTION_LABELS).forEach(([key, label]) => { if (brief.prd_sections?.[key]) rows.push(['prd_section', label, brief.prd_sections[key], '', '']); });
+  Object.entries(brief.stakeholder_critiques || {}).forEach(([name, data]) => {
+    Object.keys(CRITIQUE_FIELDS).forEach(key => (data?.[key] || []).forEach(text => rows.push([key.replace(/s$/, ''), name, text, '', ''])));
+  });
+  Object.entries(exportableChecklist(brief.checklist) || {}).forEach(([category, items]) => {
+    items.forEach(item => rows.push(['checklist_item', category, item.item, Boolean(item.checked), item.owner || '']));
+  });
+  return `${rows.map(row => row.map(csvField).join(',')).join('\r\n')}\r\n`;
+}
+
+const RENDERERS = {
+  md: renderMarkdown,
+  json: brief => JSON.stringify(exportDocument(brief), null, 2),
+  csv: renderCsv,
+};
+
+// `brief` must be read with EXPORT_PROJECTION
+export function renderExport(brief, format) {
+  return RENDERERS[format](brief);
+}
+
+// ASCII-safe download name: "<title-slug>-<id prefix>.<ext>"
+export function exportFilename(brief, format) {
+  const slug = String(brief.title || 'brief').normalize('NFKD').replace(/[^\w\s-]/g, '').trim().replace(/[\s_]+/g, '-').slice(0, 60) || 'brief';
+  return `${slug}-${String(brief.id).slice(0, 8)}.${EXPORT_FORMATS[format].extension}`;
+}
+
+// ---------- Zip archive ----------
+const CRC_TABLE = Array.from({ length: 256 }, (_, n) => {
+  let c = n;
+  for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+  return c >>> 0;
+});
+
+export function crc32(buf) {
+  let crc = 0xFFFFFFFF;
+  for (let i = 0; i < buf.length; i++) crc = CRC_TABLE[(crc ^ buf[i]) & 0xFF] ^ (crc >>> 8);
+  return (crc ^ 0xFFFFFFFF) >>> 0;
+}
+
+function dosDateTime(date) {
+  const d = Number.isNaN(date.getTime()) || date.getFullYear() < 1980 ? new Date(1980, 0, 1) : date;
+  return {
+    time: (d.getHours() << 11) | (d.getMinutes() << 5) | Math.floor(d.getSeconds() / 2),
+    date: ((d.getFullYear() - 1980) << 9) | ((d.getMonth() + 1) << 5) | d.getDate(),
+  };
+}
+
+// Incremental zip writer: entry() returns the bytes of one deflated member,
+// finish() the central directory. Only per-entry offsets and checksums are
+// kept between calls, so an archive's members never sit in memory together.
+// Plain zip32: up to 65535 entries and 4 GiB.
+export function createZipWriter() {
+  const central = [];
+  let offset = 0;
+
+  function entry(name, content, modified = new Date()) {
+    if (central.length >= 0xFFFF) throw new Error('Archive exceeds 65535 entries');
+    const data = Buffer.from(content);
+    const compressed = deflateRawSync(data);
+    const nameBytes = Buffer.from(name);
+    const { time, date } = dosDateTime(modified);
+    const crc = crc32(data);
+    const header = Buffer.alloc(30);
+    header.writeUInt32LE(0x04034B50, 0);
+    header.writeUInt16LE(20, 4); // version needed: 2.0 (deflate)
+    header.writeUInt16LE(0x0800, 6); // UTF-8 names
+    header.writeUInt16LE(8, 8); // deflate
+    header.writeUInt16LE(time, 10);
+    header.writeUInt16LE(date, 12);
+    header.writeUInt32LE(crc, 14);
+    header.writeUInt32LE(compressed.length, 18);
+    header.writeUInt32LE(data.length, 22);
+    header.writeUInt16LE(nameBytes.length, 26);
+    header.writeUInt16LE(0, 28);
+    if (offset + header.length + nameBytes.length + compressed.length > 0xFFFFFFFF) throw new Error('Archive exceeds 4 GiB');
+    central.push({ nameBytes, crc, time, date, compressedSize: compressed.length, size: data.length, offset });
+    offset += header.length + nameBytes.length + compressed.length;
+    return Buffer.concat([header, nameBytes, compressed]);
+  }
+
+  function finish() {
+    const records = central.map(e => {
+      const record = Buffer.alloc(46);
+      record.writeUInt32LE(0x02014B50, 0);
+      record.writeUInt16LE(20, 4); // version made by
+      record.writeUInt16LE(20, 6);
+      record.writeUInt16LE(0x0800, 8);
+      record.writeUInt16LE(8, 10);
+      record.writeUInt16LE(e.time, 12);
+      record.writeUInt16LE(e.date, 14);
+      record.writeUInt32LE(e.crc, 16);
+      record.writeUInt32LE(e.compressedSize, 20);
+      record.writeUInt32LE(e.size, 24);
+      record.writeUInt16LE(e.nameBytes.length, 28);
+      record.writeUInt32LE(e.offset, 42);
+      return Buffer.concat([record, e.nameBytes]);
+    });
+    const directory = Buffer.concat(records);
+    const end = Buffer.alloc(22);
+    end.writeUInt32LE(0x06054B50, 0);
+    end.writeUInt16LE(central.length, 8);
+    end.writeUInt16LE(central.length, 10);
+    end.writeUInt32LE(directory.length, 12);
+    end.writeUInt32LE(offset, 16);
+    return Buffer.concat([directory, end]);
+  }
+
+  return { entry, finish };
+}
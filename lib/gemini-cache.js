@@ -0,0 +1,98 @@
+import { createHash } from 'crypto';
+import { connectToDatabase } from '@/lib/mongodb';
+import { createLruCache } from '@/lib/lru';
+
+// Content-addressed cache for model responses.
+// Tier 1 is a per-process LRU, tier 2 is the `gemini_cache` collection, which
+// expires entries through a TTL index on `expires_at` and is trimmed to
+// GEMINI_CACHE_MAX_ENTRIES by least recent use.
+const CACHE_ENABLED = process.env.GEMINI_CACHE !== 'off';
+const CACHE_TTL_SECONDS = parseInt(process.env.GEMINI_CACHE_TTL_SECONDS || String(60 * 60 * 24 * 7), 10);
+const CACHE_MAX_ENTRIES = parseInt(process.env.GEMINI_CACHE_MAX_ENTRIES || '5000', 10);
+const CACHE_LRU_SIZE = parseInt(process.env.GEMINI_CACHE_LRU_SIZE || '200', 10);
+const TRIM_EVERY_WRITES = 50;
+
+const memory = createLruCache({ max: CACHE_LRU_SIZE, ttlMs: CACHE_TTL_SECONDS * 1000 });
+const stats = { memory_hits: 0, mongo_hits: 0, misses: 0, writes: 0, evictions: 0, errors: 0 };
+let writesSinceTrim = TRIM_EVERY_WRITES;
+
+export function geminiCacheKey(model, prompt, config) {
+  return createHash('sha256').update(JSON.stringify([model, prompt, config || {}])).digest('hex');
+}
+
+async function cacheCollection() {
+  const db = await connectToDatabase();
+  return db.collection('gemini_cache');
+}
+
+// Returns the first cached entry among `keys` (in order) as { key, model, value }, or null
+export async function getCachedResponse(keys) {
+  if (!CACHE_ENABLED || keys.length === 0) return null;
+  for (const key of keys) {
+    const hit = memory.get(key);
+    if (hit) {
+      stats.memory_hits++;
+      return { key, model: hit.model, value: structuredClone(hit.value) };
+    }
+  }
+  try {
+    const col = await cacheCollection();
+    const docs = await col.find({ key: { $in: keys }, expires_at: { $gt: new Date() } }).project({ _id: 0, key: 1, model: 1, value: 1 }).toArray();
+    const doc = keys.map(k => docs.find(d => d.key === k)).find(Boolean);
+    if (doc) {
+      stats.mongo_hits++;
+      memory.set(doc.key, { model: doc.model, value: doc.value });
+      col.updateOne({ key: doc.key }, { $set: { last_used_at: new Date() }, $inc: { hits: 1 } }).catch(() => {});
+      return { key: doc.key, model: doc.model, value: structuredClone(doc.value) };
+    }
+  } catch (error) {
+    stats.errors++;
+    console.error('Gemini cache read failed:', error?.message || error);
+  }
+  stats.misses++;
+  return null;
+}
+
+export async function setCachedResponse(key, model, value) {
+  if (!CACHE_ENABLED) return;
+  memory.set(key, { model, value: structuredClone(value) });
+  try {
+    const col = await cacheCollection();
+    const now = new Date();
+    await col.updateOne(
+      { key },
+      { $set: { model, value, last_used_at: now, expires_at: new Date(now.getTime() + CACHE_TTL_SECONDS * 1000) }, $setOnInsert: { created_at: now, hits: 0 } },
+      { upsert: true }
+    );
+    stats.writes++;
+    if (++writesSinceTrim >= TRIM_EVERY_WRITES) {
+      writesSinceTrim = 0;
+      await trimCache(col);
+    }
+  } catch (error) {
+    stats.errors++;
+    console.error('Gemini cache write failed:', error?.message || error);
+  }
+}
+
+async function trimCache(col) {
+  const excess = (await col.estimatedDocumentCount()) - CACHE_MAX_ENTRIES;
+  if (excess <= 0) return;
+  const stale = await col.find({}).sort({ last_used_at: 1 }).limit(excess).project({ _id: 1 }).toArray();
+  const { deletedCount } = await col.deleteMany({ _id: { $in: stale.map(d => d._id) } });
+  stats.evictions += deletedCount;
+}
+
+export async function invalidateCachedResponses(keys) {
+  keys.forEach(k => memory.delete(k));
+  if (!CACHE_ENABLED) return 0;
+  const col = await cacheCollection();
+  const { deletedCount } = await col.deleteMany({ key: { $in: keys } });
+  return deletedCount;
+}
+
+export function getGeminiCacheStats() {
+  const hits = stats.memory_hits + stats.mongo_hits;
+  const lookups = hits + stats.misses;
+  return { ...stats, hits, hit_rate: lookups > 0 ? hits / lookups : 0, memory_entries: memory.size, enabled: CACHE_ENABLED };
+}
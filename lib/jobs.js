@@ -0,0 +1,252 @@
+import { randomUUID } from 'crypto';
+import { connectToDatabase } from '@/lib/mongodb';
+
+// Mongo-backed job queue with an in-process worker pool.
+// Jobs are claimed with a lease (`lease_owner`, `lease_expires_at`) that the
+// running worker extends on every heartbeat. A job whose lease lapses — e.g.
+// because the server restarted mid-run — is reclaimed by the next sweep,
+// up to `maxAttempts` times.
+//
+// `concurrency` bounds this process's worker pool; `perUserConcurrency` is a
+// cap across every instance, enforced from the running jobs in Mongo.
+const WORKER_ID = `${process.env.HOSTNAME || 'local'}:${process.pid}:${randomUUID().slice(0, 8)}`;
+
+const iso = (ms = Date.now()) => new Date(ms).toISOString();
+
+// Abort reason when another worker has reclaimed the job. The handler must
+// leave shared state alone: the new owner is still working on it.
+export class LeaseLostError extends Error {}
+
+export function createJobQueue({
+  collection = 'generation_jobs',
+  handler,
+  concurrency = 2,
+  perUserConcurrency = 1,
+  leaseMs = 60000,
+  heartbeatMs = 10000,
+  pollMs = 5000,
+  maxAttempts = 3,
+  onExpired,
+}) {
+  const running = new Map(); // job id -> { controller, user_id }
+  let pumping = false;
+  let pumpAgain = false;
+  let timer = null;
+  let indexChecked = null;
+
+  // Indexes are created in lib/mongodb.js. One active job per brief rests on the
+  // unique active_brief_id index: without it enqueue would start duplicate runs,
+  // so the queue refuses to work until the index exists.
+  async function jobs() {
+    const db = await connectToDatabase();
+    const col = db.collection(collection);
+    if (!indexChecked) {
+      indexChecked = col.indexes().then(indexes => {
+        const guarded = indexes.some(ix => ix.unique && Object.keys(ix.key).join() === 'active_brief_id');
+        if (!guarded) throw new Error(`${collection} has no unique active_brief_id index; job queue not started`);
+      }).catch(error => { indexChecked = null; throw error; });
+    }
+    await indexChecked;
+    return col;
+  }
+
+  function start() {
+    if (timer) return;
+    timer = setInterval(() => { sweep().catch(err => console.error('Job sweep failed:', err)); }, pollMs);
+    timer.unref?.();
+    sweep().catch(err => console.error('Job sweep failed:', err));
+  }
+
+  function newJob({ id = randomUUID(), type, brief_id, user_id, options = {} }) {
+    return {
+      id, type, brief_id, user_id, options, active_brief_id: brief_id,
+      status: 'queued', attempts: 0, cancel_requested: false, error: null,
+      lease_owner: null, lease_expires_at: null, heartbeat_at: null,
+      created_at: iso(), started_at: null, finished_at: null,
+    };
+  }
+
+  async function enqueue(spec) {
+    const col = await jobs();
+    const job = newJob(spec);
+    const { brief_id } = job;
+    try {
+      await col.insertOne(job);
+    } catch (error) {
+      if (error?.code !== 11000) throw error;
+      const existing = await col.findOne({ active_brief_id: brief_id }, { projection: { _id: 0 } });
+      if (existing) return { job: existing, created: false };
+      throw error;
+    }
+    delete job._id;
+    start();
+    pump().catch(err => console.error('Job pump failed:', err));
+    return { job, created: true };
+  }
+
+  // Inserts many jobs in one write; `id` may be preassigned. Returns the ids of
+  // jobs that were not created because their brief already has an active job.
+  async function enqueueMany(specs) {
+    if (!specs.length) return { skipped: [] };
+    const col = await jobs();
+    const batch = specs.map(newJob);
+    let skipped = [];
+    try {
+      await col.insertMany(batch, { ordered: false });
+    } catch (error) {
+      const writeErrors = [].concat(error?.writeErrors || []);
+      if (!writeErrors.length || writeErrors.some(e => e.code !== 11000)) throw error;
+      skipped = writeErrors.map(e => batch[e.index].id);
+    }
+    start();
+    pump().catch(err => console.error('Job pump failed:', err));
+    return { skipped };
+  }
+
+  async function get(id, user_id) {
+    const col = await jobs();
+    return col.findOne({ id, user_id }, { projection: { _id: 0 } });
+  }
+
+  async function cancel(id, user_id) {
+    const col = await jobs();
+    // Queued jobs are cancelled outright; running ones are flagged and stopped on the next heartbeat
+    const queued = await col.findOneAndUpdate(
+      { id, user_id, status: 'queued' },
+      { $set: { status: 'cancelled', cancel_requested: true, finished_at: iso() }, $unset: { active_brief_id: '' } },
+      { returnDocument: 'after', projection: { _id: 0 } }
+    );
+    if (queued) return queued;
+    const job = await col.findOneAndUpdate(
+      { id, user_id, status: 'running' },
+      { $set: { cancel_requested: true } },
+      { returnDocument: 'after', projection: { _id: 0 } }
+    );
+    const local = running.get(id);
+    if (job && local && !local.controller.signal.aborted) local.controller.abort(new Error('Generation cancelled'));
+    return job || col.findOne({ id, user_id }, { projection: { _id: 0 } });
+  }
+
+  // Closes out jobs that have exhausted their attempts, then fills free worker slots
+  async function sweep() {
+    const col = await jobs();
+    const now = iso();
+    const expiredFilter = { status: 'running', lease_expires_at: { $lt: now }, $or: [{ attempts: { $gte: maxAttempts } }, { cancel_requested: true }] };
+    const expired = await col.find(expiredFilter).project({ _id: 0 }).toArray();
+    for (const job of expired) {
+      const update = job.cancel_requested ? { status: 'cancelled', error: null } : { status: 'failed', error: 'Worker lease expired too many times' };
+      const { modifiedCount } = await col.updateOne({ id: job.id, ...expiredFilter }, { $set: { ...update, finished_at: now, lease_owner: null }, $unset: { active_brief_id: '' } });
+      if (modifiedCount && onExpired) await onExpired({ ...job, ...update }).catch(err => console.error(`onExpired failed for job ${job.id}:`, err));
+    }
+    await pump();
+  }
+
+  // Users already at their cap, counting live jobs on every instance
+  async function busyUsers(col, now) {
+    const rows = await col.aggregate([
+      { $match: { status: 'running', lease_expires_at: { $gte: iso(now) } } },
+      { $group: { _id: '$user_id', running: { $sum: 1 } } },
+      { $match: { running: { $gte: perUserConcurrency } } },
+    ]).toArray();
+    return rows.map(r => r._id);
+  }
+
+  // Instances can claim for the same user at once. Every claimant keeps its job
+  // only if it is among the user's earliest-started live jobs, so all of them
+  // agree on which claims to hand back.
+  async function withinUserCap(col, job) {
+    const earliest = await col.find({ user_id: job.user_id, status: 'running', lease_expires_at: { $gte: iso() } })
+      .project({ _id: 0, id: 1 })
+      .sort({ started_at: 1, id: 1 })
+      .limit(perUserConcurrency)
+      .toArray();
+    return earliest.some(j => j.id === job.id);
+  }
+
+  async function release(col, job) {
+    await col.updateOne(
+      { id: job.id, lease_owner: WORKER_ID },
+      { $set: { status: 'queued', lease_owner: null, lease_expires_at: null, heartbeat_at: null, started_at: null }, $inc: { attempts: -1 } }
+    );
+  }
+
+  async function claim(col) {
+    const now = Date.now();
+    return col.findOneAndUpdate(
+      {
+        user_id: { $nin: await busyUsers(col, now) },
+        $or: [
+          { status: 'queued' },
+          { status: 'running', lease_expires_at: { $lt: iso(now) }, attempts: { $lt: maxAttempts }, cancel_requested: false },
+        ],
+      },
+      { $set: { status: 'running', lease_owner: WORKER_ID, lease_expires_at: iso(now + leaseMs), heartbeat_at: iso(now), started_at: iso(now) }, $inc: { attempts: 1 } },
+      { sort: { created_at: 1 }, returnDocument: 'after', projection: { _id: 0 } }
+    );
+  }
+
+  async function pump() {
+    if (pumping) { pumpAgain = true; return; }
+    pumping = true;
+    try {
+      do {
+        pumpAgain = false;
+        const col = await jobs();
+        while (running.size < concurrency) {
+          const job = await claim(col);
+          if (!job) break;
+          if (!(await withinUserCap(col, job))) {
+            // Lost a race for the user's last slot; the next pump retries
+            await release(col, job);
+            break;
+          }
+          runJob(col, job);
+        }
+      } while (pumpAgain && running.size < concurrency);
+    } finally {
+      pumping = false;
+    }
+  }
+
+  async function runJob(col, job) {
+    const controller = new AbortController();
+    const abort = reason => { if (!controller.signal.aborted) controller.abort(reason); };
+    running.set(job.id, { controller, user_id: job.user_id });
+    const owned = { id: job.id, lease_owner: WORKER_ID };
+
+    const heartbeat = setInterval(async () => {
+      try {
+        const now = Date.now();
+        const renewed = await col.findOneAndUpdate(owned, { $set: { heartbeat_at: iso(now), lease_expires_at: iso(now + leaseMs) } }, { returnDocument: 'after', projection: { cancel_requested: 1 } });
+        if (!renewed) abort(new LeaseLostError('Job lease lost'));
+        else if (renewed.cancel_requested) abort(new Error('Generation cancelled'));
+      } catch (err) {
+        console.error(`Heartbeat failed for job ${job.id}:`, err?.message || err);
+      }
+    }, heartbeatMs);
+    heartbeat.unref?.();
+
+    let update;
+    try {
+      await handler(job, { signal: controller.signal });
+      update = { status: 'succeeded', error: null };
+    } catch (error) {
+      update = controller.signal.aborted
+        ? { status: 'cancelled', error: null }
+        : { status: 'failed', error: (error?.message || String(error)).slice(0, 500) };
+    } finally {
+      clearInterval(heartbeat);
+      running.delete(job.id);
+    }
+    // Matches nothing if the lease was lost and another worker owns the job now
+    await col.updateOne(owned, { $set: { ...update, finished_at: iso(), lease_owner: null, lease_expires_at: null }, $unset: { active_brief_id: '' } })
+      .catch(err => console.error(`Failed to record result for job ${job.id}:`, err?.message || err));
+    pump().catch(err => console.error('Job pump failed:', err));
+  }
+
+  function stats() {
+    return { worker_id: WORKER_ID, running: running.size, concurrency, per_user_concurrency: perUserConcurrency };
+  }
+
+  return { start, enqueue, enqueueMany, get, cancel, stats };
+}
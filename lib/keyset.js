@@ -0,0 +1,36 @@
+// Opaque cursors for keyset pagination over a (sort field, id) pair, newest first.
+// A cursor is the base64url JSON of the last row's [sort value, id].
+
+export function encodeCursor(doc, field) {
+  return Buffer.from(JSON.stringify([doc[field], doc.id])).toString('base64url');
+}
+
+export function decodeCursor(cursor) {
+  if (!cursor) return null;
+  try {
+    const [value, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString());
+    return typeof value === 'string' && typeof id === 'string' ? { value, id } : null;
+  } catch { return null; }
+}
+
+// Filter for rows strictly after `cursor` in { [field]: -1, id: -1 } order
+export function keysetAfter(cursor, field) {
+  const after = decodeCursor(cursor);
+  if (!after) return {};
+  return { $or: [{ [field]: { $lt: after.value } }, { [field]: after.value, id: { $lt: after.id } }] };
+}
+
+export function clampLimit(limit, fallback, max) {
+  return Math.max(1, Math.min(max, parseInt(limit, 10) || fallback));
+}
+
+// Runs a newest-first page query and returns { items, next_cursor }
+export async function keysetPage(collection, query, { field, cursor, limit, projection }) {
+  const docs = await collection
+    .find({ ...query, ...keysetAfter(cursor, field) }, { projection })
+    .sort({ [field]: -1, id: -1 })
+    .limit(limit + 1)
+    .toArray();
+  const items = docs.slice(0, limit);
+  return { items, next_cursor: docs.length > limit ? encodeCursor(items[items.length - 1], field) : null };
+}
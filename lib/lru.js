@@ -0,0 +1,33 @@
+// Small in-process LRU cache with optional per-entry TTL.
+// Map iteration order is insertion order, so re-inserting on read keeps the
+// least recently used entry at the front.
+export function createLruCache({ max = 500, ttlMs = 0 } = {}) {
+  const entries = new Map();
+
+  function get(key) {
+    const entry = entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt && entry.expiresAt <= Date.now()) {
+      entries.delete(key);
+      return undefined;
+    }
+    entries.delete(key);
+    entries.set(key, entry);
+    return entry.value;
+  }
+
+  function set(key, value, entryTtlMs = ttlMs) {
+    entries.delete(key);
+    entries.set(key, { value, expiresAt: entryTtlMs ? Date.now() + entryTtlMs : 0 });
+    while (entries.size > max) entries.delete(entries.keys().next().value);
+  }
+
+  return {
+    get,
+    set,
+    has: key => get(key) !== undefined,
+    delete: key => entries.delete(key),
+    clear: () => entries.clear(),
+    get size() { return entries.size; },
+  };
+}
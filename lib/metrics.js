@@ -0,0 +1,152 @@
+// In-process Prometheus metrics, rendered by GET /api/metrics in the text
+// exposition format (0.0.4). Counters and histograms live for the life of the
+// process; each worker process exposes its own.
+
+const DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120];
+const BYTE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576];
+
+const registry = new Map();
+
+const escapeLabel = value => String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+function labelString(labels) {
+  const entries = Object.entries(labels).filter(([, v]) => v !== undefined && v !== null);
+  return entries.length ? `{${entries.map(([k, v]) => `${k}="${escapeLabel(v)}"`).join(',')}}` : '';
+}
+
+// Series are keyed by their rendered label set
+function series(metric, labels) {
+  const key = labelString(labels);
+  if (!metric.series.has(key)) metric.series.set(key, metric.create(labels));
+  return metric.series.get(key);
+}
+
+export function counter(name, help) {
+  const metric = { name, help, type: 'counter', series: new Map(), create: () => ({ value: 0 }) };
+  registry.set(name, metric);
+  return {
+    inc(labels = {}, n = 1) { if (n > 0) series(metric, labels).value += n; },
+  };
+}
+
+export function histogram(name, help, buckets = DURATION_BUCKETS) {
+  const metric = { name, help, type: 'histogram', buckets, series: new Map(), create: () => ({ counts: buckets.map(() => 0), sum: 0, count: 0 }) };
+  registry.set(name, metric);
+  return {
+    observe(labels = {}, value) {
+      if (!Number.isFinite(value)) return;
+      const s = series(metric, labels);
+      buckets.forEach((b, i) => { if (value <= b) s.counts[i]++; });
+      s.sum += value;
+      s.count++;
+    },
+  };
+}
+
+// ---------- Application metrics ----------
+export const metrics = {
+  httpRequests: histogram('regulapm_http_request_duration_seconds', 'API request latency until the response is returned'),
+  pipelineRuns: histogram('regulapm_pipeline_duration_seconds', 'Full generation pipeline wall time'),
+  pipelineStages: histogram('regulapm_pipeline_stage_duration_seconds', 'Pipeline stage wall time, including queueing for the model'),
+  geminiCalls: histogram('regulapm_gemini_call_duration_seconds', 'callGemini wall time including cache lookups, retries and backoff'),
+  geminiAttempts: histogram('regulapm_gemini_attempt_duration_seconds', 'Single generateContent round trip'),
+  geminiRetries: counter('regulapm_gemini_retries_total', 'Attempts beyond the first within one callGemini'),
+  geminiPromptBytes: histogram('regulapm_gemini_prompt_bytes', 'Prompt size per attempt', BYTE_BUCKETS),
+  geminiResponseBytes: histogram('regulapm_gemini_response_bytes', 'Response text size per successful attempt', BYTE_BUCKETS),
+  geminiTokens: counter('regulapm_gemini_tokens_total', 'Tokens reported by the model in usageMetadata'),
+  mongoCommands: histogram('regulapm_mongo_command_duration_seconds', 'MongoDB command round trip'),
+};
+
+// Token counts from the SDK's usageMetadata, by kind
+export function tokenUsage(usage) {
+  if (!usage) return null;
+  const tokens = {
+    prompt: usage.promptTokenCount || 0,
+    response: usage.candidatesTokenCount || 0,
+    thoughts: usage.thoughtsTokenCount || 0,
+    cached: usage.cachedContentTokenCount || 0,
+    total: usage.totalTokenCount || 0,
+  };
+  return tokens.total || tokens.prompt || tokens.response ? tokens : null;
+}
+
+const STALE_COMMAND_MS = parseInt(process.env.METRICS_MONGO_STALE_MS || '600000', 10);
+const MAX_IN_FLIGHT_COMMANDS = 10000;
+
+// Times every command on `client` (it must be created with monitorCommands: true)
+export function observeMongoCommands(client) {
+  const started = new Map();
+  client.on('commandStarted', event => {
+    const at = performance.now();
+    // A command on a dropped connection may never report back. Entries are in
+    // start order, so stale ones (or the oldest, past the cap) are at the front.
+    for (const [id, s] of started) {
+      if (at - s.at < STALE_COMMAND_MS && started.size < MAX_IN_FLIGHT_COMMANDS) break;
+      started.delete(id);
+    }
+    const target = event.command?.[event.commandName];
+    started.set(event.requestId, { at, collection: typeof target === 'string' && target.length < 64 ? target : undefined });
+  });
+  const finish = outcome => event => {
+    const start = started.get(event.requestId);
+    if (!start) return;
+    started.delete(event.requestId);
+    metrics.mongoCommands.observe({ command: event.commandName, collection: start.collection, outcome }, (performance.now() - start.at) / 1000);
+  };
+  client.on('commandSucceeded', finish('ok'));
+  client.on('commandFailed', finish('error'));
+}
+
+// Stats fields that only ever grow (until the process restarts); they are
+// exposed as counters so rate() and increase() handle resets. Everything else
+// (sizes, ratios, in-flight counts, limits) is a gauge.
+const STATS_COUNTERS = new Set([
+  'hits', 'misses', 'memory_hits', 'mongo_hits', 'writes', 'evictions', 'errors', 'invalidations',
+  'calls', 'attempts', 'successes', 'failures', 'retries', 'fallbacks', 'rate_limited', 'breaker_trips',
+  'short_circuits', 'rejected', 'backoff_ms', 'throttle_ms', 'queue_wait_ms', 'latency_ms', 'by_stage',
+]);
+
+// Numeric leaves of a stats object: { hits: 3, models: { a: { tokens: 1 } } }
+// -> prefix_hits_total 3, prefix_models_tokens{model="a"} 1 (objects one level
+// down become a label; a field's name decides counter or gauge)
+function statsMetrics(prefix, stats, label) {
+  const lines = new Map();
+  const add = (key, field, labels, value) => {
+    if (typeof value === 'boolean') value = Number(value);
+    if (typeof value !== 'number' || !Number.isFinite(value)) return;
+    const type = STATS_COUNTERS.has(field) ? 'counter' : 'gauge';
+    const name = `${prefix}_${key}${type === 'counter' ? '_total' : ''}`.replace(/[^a-zA-Z0-9_]/g, '_');
+    if (!lines.has(name)) lines.set(name, { type, values: [] });
+    lines.get(name).values.push(`${name}${labelString(labels)} ${value}`);
+  };
+  Object.entries(stats || {}).forEach(([key, value]) => {
+    if (value && typeof value === 'object' && !Array.isArray(value)) {
+      Object.entries(value).forEach(([child, inner]) => {
+        if (inner && typeof inner === 'object') Object.entries(inner).forEach(([k, v]) => add(`${key}_${k}`, k, { [label || 'key']: child }, v));
+        else add(key, key, { [label || 'key']: child }, inner);
+      });
+    } else {
+      add(key, key, {}, value);
+    }
+  });
+  return [...lines].map(([name, { type, values }]) => `# TYPE ${name} ${type}\n${values.join('\n')}`);
+}
+
+// `snapshots`: { prefix: statsObject } from the caches, router and queue
+export function renderMetrics(snapshots = {}) {
+  const out = [];
+  for (const metric of registry.values()) {
+    out.push(`# HELP ${metric.name} ${metric.help}`, `# TYPE ${metric.name} ${metric.type}`);
+    for (const [key, s] of metric.series) {
+      if (metric.type === 'counter') {
+        out.push(`${metric.name}${key} ${s.value}`);
+        continue;
+      }
+      const inner = key ? key.slice(1, -1) + ',' : '';
+      metric.buckets.forEach((b, i) => out.push(`${metric.name}_bucket{${inner}le="${b}"} ${s.counts[i]}`));
+      out.push(`${metric.name}_bucket{${inner}le="+Inf"} ${s.count}`, `${metric.name}_sum${key} ${s.sum}`, `${metric.name}_count${key} ${s.count}`);
+    }
+  }
+  Object.entries(snapshots).forEach(([prefix, stats]) => out.push(...statsMetrics(prefix, stats, prefix.endsWith('router') ? 'model' : 'key')));
+  return `${out.join('\n')}\n`;
+}
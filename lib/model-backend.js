@@ -0,0 +1,256 @@
+import { createHash } from 'crypto';
+
+// Offline stand-in for the Gemini SDK, selected with GEMINI_BACKEND=stub.
+// It exposes the same `models.generateContent({ model, contents, config })`
+// surface as GoogleGenAI and answers each pipeline prompt with deterministic,
+// schema-valid JSON derived from a hash of the prompt, so the pipeline, the
+// response cache and callGemini's retry/fallback path all run unchanged.
+//
+//   GEMINI_STUB_LATENCY   latency distribution(s), e.g. "lognormal:800:0.5"
+//                         or "uniform:200:1200,gemini-2.0-flash-lite=fixed:150"
+//                         fixed:<ms> | uniform:<min>:<max> | normal:<mean>:<sd> | lognormal:<median>:<sigma>
+//   GEMINI_STUB_429_RATE  probability of a RESOURCE_EXHAUSTED error, e.g.
+//                         "0.1" or "0.05,gemini-2.5-flash=0.5"
+//   GEMINI_STUB_SEED      seed for latency and error injection (default 1)
+//
+// Entries without a model prefix are the default for every model.
+
+// mulberry32: small, fast, good enough for load shaping
+function seededRandom(seed) {
+  let a = seed >>> 0;
+  return () => {
+    a = (a + 0x6D2B79F5) >>> 0;
+    let t = a;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function gaussian(random) {
+  const u = Math.max(random(), Number.EPSILON);
+  return Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * random());
+}
+
+function parseLatency(spec) {
+  const [kind, a, b] = spec.split(':');
+  const x = parseFloat(a);
+  const y = parseFloat(b);
+  switch (kind) {
+    case 'fixed': return () => x;
+    case 'uniform': return random => x + random() * (y - x);
+    case 'normal': return random => x + gaussian(random) * y;
+    case 'lognormal': return random => x * Math.exp(gaussian(random) * y);
+    default: throw new Error(`Unknown GEMINI_STUB_LATENCY distribution "${spec}"`);
+  }
+}
+
+// "default,model=value,..." -> lookup(model)
+function parsePerModel(value, parse, fallback) {
+  const byModel = new Map();
+  let defaultValue = fallback;
+  for (const entry of (value || '').split(',').map(s => s.trim()).filter(Boolean)) {
+    const eq = entry.indexOf('=');
+    if (eq < 0) defaultValue = parse(entry);
+    else byModel.set(entry.slice(0, eq).trim(), parse(entry.slice(eq + 1).trim()));
+  }
+  return model => (byModel.has(model) ? byModel.get(model) : defaultValue);
+}
+
+// ---------- Deterministic stage responses ----------
+const RISKS = [
+  ['Unauthorized data access', 'Access controls may not cover every new data path'],
+  ['Regulatory non-compliance', 'Requirements in some jurisdictions may not be met at launch'],
+  ['Data retention drift', 'Copied data may outlive the retention policy'],
+  ['Third-party processor exposure', 'A new vendor processes customer data'],
+  ['Fraud and abuse', 'New flows can be abused for account takeover or fraud'],
+  ['Operational outage', 'New dependencies add failure modes to a critical path'],
+  ['Audit trail gaps', 'Changes may not be attributable to an actor'],
+];
+const REGULATIONS = ['GDPR', 'SOC 2', 'HIPAA', 'PCI DSS', 'CCPA', 'ISO 27001', 'DORA'];
+const STAKEHOLDERS = ['Security', 'Compliance', 'Legal', 'Finance', 'Engineering', 'Support'];
+const PRD_SECTIONS = ['problem_statement', 'goals', 'non_goals', 'user_stories', 'functional_requirements', 'compliance_risk_requirements', 'stakeholder_notes', 'rollout_plan', 'metrics', 'open_questions'];
+const CHECKLIST_CATEGORIES = ['Approvals', 'Security Controls', 'Testing Requirements', 'Monitoring and Alerts', 'Documentation Updates', 'Release Steps'];
+const SEVERITIES = ['high', 'medium', 'low'];
+const RECOMMENDATIONS = ['go', 'go_with_conditions', 'no_go', 'needs_further_review'];
+
+function promptField(prompt, label) {
+  return prompt.match(new RegExp(`^${label}: (.*)$`, 'm'))?.[1]?.trim() || '';
+}
+
+function promptJson(prompt, label, fallback) {
+  try { return JSON.parse(promptField(prompt, label)); } catch { return fallback; }
+}
+
+// Picks `count` distinct items, deterministically for a given random stream
+function pick(random, items, count) {
+  const pool = [...items];
+  const out = [];
+  while (out.length < count && pool.length) out.push(pool.splice(Math.floor(random() * pool.length), 1)[0]);
+  return out;
+}
+
+const bullets = (lines) => lines.map(l => `- ${l}`).join('\n');
+
+function prdSection(section, feature, prompt) {
+  return bullets([
+    `${feature}: ${section.replace(/_/g, ' ')} point one`,
+    `Accounts for ${promptField(prompt, 'Compliance') || 'applicable regulations'}`,
+    `Scoped to ${promptField(prompt, 'Geography') || 'launch regions'}`,
+  ]);
+}
+
+function critique(name, feature, random) {
+  const concerns = 1 + Math.floor(random() * 4);
+  return {
+    concerns: Array.from({ length: concerns }, (_, i) => `${name} concern ${i + 1} about ${feature}`),
+    required_controls: [`${name} control for ${feature}`],
+    required_approvals: [`${name} lead sign-off`],
+    questions: [`What does ${name} need before launch?`],
+  };
+}
+
+const STAGE_RESPONSES = [
+  {
+    stage: 'entities',
+    match: /extract structured entities/,
+    build(prompt, random) {
+      const title = promptField(prompt, 'Title') || 'the feature';
+      return {
+        feature_summary: `${title} introduces a new capability for ${promptField(prompt, 'Industry') || 'customers'}. It touches ${promptField(prompt, 'Data Sensitivity') || 'customer data'} and launches as ${promptField(prompt, 'Launch Type') || 'a beta'}.`,
+        entities: [title, 'Customer data', 'Audit log', 'Admin console'],
+        risks: pick(random, RISKS, 3).map(([name, description], i) => ({ name, severity: SEVERITIES[Math.min(i, 2)], description })),
+        compliance_signals: pick(random, REGULATIONS, 2).map(regulation => ({ regulation, relevance: pick(random, SEVERITIES, 1)[0], description: `${regulation} obligations apply to the data this feature processes.` })),
+        stakeholders: STAKEHOLDERS,
+        metrics: [
+          { name: 'Adoption rate', type: 'success', description: 'Share of eligible accounts using the feature within 30 days' },
+          { name: 'Incident count', type: 'guardrail', description: 'Security or compliance incidents attributed to the feature' },
+        ],
+        rollout_hints: ['Start with an internal pilot', 'Gate behind a per-tenant feature flag'],
+      };
+    },
+  },
+  {
+    stage: 'prd',
+    match: /Generate a comprehensive PRD/,
+    build(prompt) {
+      const feature = promptField(prompt, 'Feature') || 'The feature';
+      return Object.fromEntries(PRD_SECTIONS.map(section => [section, prdSection(section, feature, prompt)]));
+    },
+  },
+  {
+    // POST /briefs/:id/regenerate { type: 'section' }: { [section]: markdown }
+    stage: 'regenerate_section',
+    match: /Regenerate ONLY the "(\w+)" section of a PRD for: (.*)/,
+    build(prompt) {
+      const [, section, title] = prompt.match(this.match);
+      return { [section]: prdSection(section, title.trim() || 'The feature', prompt) };
+    },
+  },
+  {
+    stage: 'stakeholders',
+    match: /Generate stakeholder critique packs/,
+    build(prompt, random) {
+      const feature = promptField(prompt, 'Feature') || 'the feature';
+      return Object.fromEntries(STAKEHOLDERS.map(name => [name, critique(name, feature, random)]));
+    },
+  },
+  {
+    // POST /briefs/:id/regenerate { type: 'stakeholder' }: one critique pack
+    stage: 'regenerate_stakeholder',
+    match: /Regenerate critique for the (.+?) stakeholder regarding: (.*)/,
+    build(prompt, random) {
+      const [, name, title] = prompt.match(this.match);
+      return critique(name, title.trim() || 'the feature', random);
+    },
+  },
+  {
+    stage: 'checklist',
+    match: /Generate a launch and compliance checklist/,
+    build(prompt, random) {
+      const feature = promptField(prompt, 'Feature') || 'the feature';
+      return Object.fromEntries(CHECKLIST_CATEGORIES.map(category => [
+        category,
+        Array.from({ length: 3 + Math.floor(random() * 3) }, (_, i) => ({ item: `${category} item ${i + 1} for ${feature}`, checked: false, owner: '', include_in_export: true })),
+      ]));
+    },
+  },
+  {
+    stage: 'traceability',
+    match: /Map PRD requirements to graph nodes/,
+    build(prompt, random) {
+      const sections = promptJson(prompt, 'PRD Sections', PRD_SECTIONS);
+      const nodes = promptJson(prompt, 'Graph Nodes', []);
+      return Array.from({ length: 8 + Math.floor(random() * 5) }, (_, i) => {
+        const section = sections[i % sections.length] || 'functional_requirements';
+        const linked = pick(random, nodes, Math.min(nodes.length, 2));
+        return {
+          requirement: `Requirement ${i + 1} from ${section.replace(/_/g, ' ')}`,
+          prd_section: section,
+          linked_node_ids: linked.map(n => n.id),
+          rationale: linked.length ? `Addresses ${linked.map(n => n.label).join(' and ')}` : 'General requirement',
+        };
+      });
+    },
+  },
+  {
+    stage: 'summary',
+    match: /executive decision summary/,
+    build(prompt, random) {
+      const risks = promptField(prompt, 'Key Risks').split(',').map(s => s.trim()).filter(Boolean);
+      return {
+        overview: `${promptField(prompt, 'Title') || 'This decision'} is ready for review in ${promptField(prompt, 'Geography') || 'its launch regions'}.`,
+        top_risks: risks.length ? risks.slice(0, 3) : ['Unassessed risk'],
+        required_approvals: ['Security sign-off', 'Compliance sign-off'],
+        recommendation: RECOMMENDATIONS[Math.floor(random() * RECOMMENDATIONS.length)],
+        recommendation_rationale: 'Derived from the stubbed risk profile.',
+        key_dependencies: ['Audit logging', 'Feature flag service'],
+      };
+    },
+  },
+];
+
+export function stubResponseFor(prompt) {
+  const digest = createHash('sha256').update(prompt).digest();
+  const random = seededRandom(digest.readUInt32LE(0));
+  const responder = STAGE_RESPONSES.find(r => r.match.test(prompt));
+  return { stage: responder?.stage || 'unknown', value: responder ? responder.build(prompt, random) : {} };
+}
+
+// ---------- Stub client ----------
+export function createStubGenAI({
+  latency = process.env.GEMINI_STUB_LATENCY,
+  rateLimitRate = process.env.GEMINI_STUB_429_RATE,
+  seed = parseInt(process.env.GEMINI_STUB_SEED || '1', 10),
+} = {}) {
+  const latencyFor = parsePerModel(latency, parseLatency, () => 0);
+  const rateLimitFor = parsePerModel(rateLimitRate, parseFloat, 0);
+  const random = seededRandom(seed);
+  const stats = { calls: 0, rate_limited: 0, latency_ms: 0, by_stage: {} };
+
+  async function generateContent({ model, contents }) {
+    stats.calls++;
+    const delay = Math.max(0, latencyFor(model)(random));
+    stats.latency_ms += delay;
+    await new Promise(r => setTimeout(r, delay));
+    if (random() < rateLimitFor(model)) {
+      stats.rate_limited++;
+      // Same shape as the SDK's ApiError, so callGemini's 429 detection applies
+      const error = new Error(`got status: 429 Too Many Requests. ${JSON.stringify({ error: { code: 429, message: `Stub quota exceeded for ${model}`, status: 'RESOURCE_EXHAUSTED' } })}`);
+      error.status = 429;
+      throw error;
+    }
+    const { stage, value } = stubResponseFor(String(contents));
+    stats.by_stage[stage] = (stats.by_stage[stage] || 0) + 1;
+    const text = JSON.stringify(value);
+    // Rough 4-bytes-per-token estimate so token metrics move under the stub too
+    const promptTokenCount = Math.ceil(String(contents).length / 4);
+    const candidatesTokenCount = Math.ceil(text.length / 4);
+    return { text, usageMetadata: { promptTokenCount, candidatesTokenCount, totalTokenCount: promptTokenCount + candidatesTokenCount } };
+  }
+
+  return {
+    models: { generateContent },
+    stats: () => ({ ...stats, by_stage: { ...stats.by_stage } }),
+  };
+}
@@ -0,0 +1,256 @@
+// Process-wide routing for model calls, shared by every concurrent request.
+// - a token bucket per model keeps us under its requests-per-minute limit
+// - a circuit breaker per model opens after repeated 429s, so callers skip
+//   straight to the next healthy model until the cool-down ends; the first
+//   call after the cool-down is a single half-open probe
+// - a global in-flight cap queues attempts FIFO beyond `maxInFlight`
+// Slots are held only while an attempt is on the wire, never during backoff.
+
+const sleep = (ms, signal) => new Promise((resolve, reject) => {
+  if (ms <= 0) return resolve();
+  if (signal?.aborted) return reject(signal.reason || new Error('Aborted'));
+  const timer = setTimeout(() => { signal?.removeEventListener('abort', onAbort); resolve(); }, ms);
+  function onAbort() { clearTimeout(timer); reject(signal.reason || new Error('Aborted')); }
+  signal?.addEventListener('abort', onAbort, { once: true });
+});
+
+const PROBE_POLL_MS = 250;
+
+export function isRateLimitError(error) {
+  const msg = error?.message || String(error);
+  return error?.status === 429 || msg.includes('429') || msg.includes('RESOURCE_EXHAUSTED') || msg.includes('quota');
+}
+
+// "10" or "10,gemini-2.5-flash=5" -> { model: value } for every model
+export function perModelLimits(value, models) {
+  const limits = {};
+  for (const entry of (value || '').split(',').map(s => s.trim()).filter(Boolean)) {
+    const [model, limit] = entry.includes('=') ? entry.split('=') : [null, entry];
+    if (model) limits[model.trim()] = parseFloat(limit);
+    else models.forEach(m => { if (!(m in limits)) limits[m] = parseFloat(limit); });
+  }
+  return limits;
+}
+
+export function createModelRouter({
+  models,
+  rpm = {}, // model -> requests per minute; missing models are unthrottled
+  burst = {}, // model -> bucket capacity (default: one second's worth, at least 1)
+  maxInFlight = 8,
+  maxQueue = Infinity,
+  retries = 3,
+  retryBaseMs = 1000,
+  failureThreshold = 2, // 429s within `failureWindowMs` that open the breaker
+  failureWindowMs = 60000,
+  cooldownMs = 30000,
+  maxCooldownMs = 10 * 60 * 1000,
+  tokenWaitMs = 2000, // prefer waiting this long for a throttled model over falling back
+  maxWaitMs = 60000, // longest a call waits for any model to become available
+}) {
+  const states = new Map(models.map(model => {
+    const rate = rpm[model] > 0 ? rpm[model] / 60000 : Infinity;
+    const capacity = burst[model] || Math.max(1, Math.ceil((rpm[model] || 0) / 60));
+    return [model, {
+      rate, capacity, tokens: capacity, refilled_at: Date.now(),
+      breaker: 'closed', open_until: 0, cooldown_ms: cooldownMs, probing: false, recent_429s: [],
+      calls: 0, successes: 0, rate_limited: 0,
+    }];
+  }));
+  const counters = {
+    calls: 0, attempts: 0, successes: 0, failures: 0, retries: 0, fallbacks: 0,
+    rate_limited: 0, breaker_trips: 0, short_circuits: 0, rejected: 0,
+    backoff_ms: 0, throttle_ms: 0, queue_wait_ms: 0,
+  };
+  let inFlight = 0;
+  const waiters = [];
+
+  // ---------- global in-flight cap ----------
+  async function acquireSlot(signal) {
+    if (inFlight < maxInFlight) { inFlight++; return; }
+    if (waiters.length >= maxQueue) {
+      counters.rejected++;
+      throw new Error('AI request queue is full (429 RESOURCE_EXHAUSTED)');
+    }
+    const start = Date.now();
+    await new Promise((resolve, reject) => {
+      const waiter = { resolve, reject };
+      waiters.push(waiter);
+      signal?.addEventListener('abort', () => {
+        const i = waiters.indexOf(waiter);
+        if (i >= 0) { waiters.splice(i, 1); reject(signal.reason || new Error('Aborted')); }
+      }, { once: true });
+    });
+    counters.queue_wait_ms += Date.now() - start;
+  }
+
+  function releaseSlot() {
+    const next = waiters.shift();
+    if (next) next.resolve(); // hand the slot over without decrementing
+    else inFlight--;
+  }
+
+  // ---------- token buckets ----------
+  function refill(state, now) {
+    if (state.rate === Infinity) { state.tokens = state.capacity; return; }
+    state.tokens = Math.min(state.capacity, state.tokens + (now - state.refilled_at) * state.rate);
+    state.refilled_at = now;
+  }
+
+  function tokenWait(state, now) {
+    refill(state, now);
+    return state.tokens >= 1 ? 0 : Math.ceil((1 - state.tokens) / state.rate);
+  }
+
+  // ---------- circuit breakers ----------
+  function available(state, now) {
+    if (state.breaker === 'closed') return true;
+    if (now < state.open_until || state.probing) return false;
+    state.breaker = 'half_open';
+    return true;
+  }
+
+  function recordRateLimit(model, now) {
+    const state = states.get(model);
+    state.rate_limited++;
+    counters.rate_limited++;
+    if (state.breaker === 'open') return; // stragglers from before the trip
+    state.recent_429s = state.recent_429s.filter(t => now - t < failureWindowMs);
+    state.recent_429s.push(now);
+    if (state.breaker === 'half_open' || state.recent_429s.length >= failureThreshold) {
+      // A failed probe doubles the cool-down; a fresh trip starts from the base
+      state.cooldown_ms = state.breaker === 'half_open' ? Math.min(maxCooldownMs, state.cooldown_ms * 2) : cooldownMs;
+      state.breaker = 'open';
+      state.open_until = now + state.cooldown_ms;
+      state.recent_429s = [];
+      counters.breaker_trips++;
+      console.log(`Circuit open for ${model} for ${Math.round(state.cooldown_ms / 1000)}s after repeated rate limits`);
+    }
+  }
+
+  function recordSuccess(model) {
+    const state = states.get(model);
+    state.successes++;
+    state.breaker = 'closed';
+    state.cooldown_ms = cooldownMs;
+    state.recent_429s = [];
+  }
+
+  // Picks the most preferred model that is available now (or after a short
+  // throttle wait), starting at `from`; returns { model, wait } or null
+  function choose(from, now) {
+    let best = null;
+    for (const model of models.slice(from)) {
+      const state = states.get(model);
+      if (!available(state, now)) { counters.short_circuits++; continue; }
+      const wait = tokenWait(state, now);
+      if (wait <= tokenWaitMs) return { model, wait };
+      if (!best || wait < best.wait) best = { model, wait };
+    }
+    return best;
+  }
+
+  function nextReopen(from) {
+    return Math.min(...models.slice(from).map(m => states.get(m).open_until));
+  }
+
+  // Runs `attempt(model)` against the best model, retrying 429s with backoff
+  // and falling back down `models` as breakers open. Other errors are thrown.
+  async function call(attempt, { signal, retries: maxTries = retries } = {}) {
+    counters.calls++;
+    const started = Date.now();
+    let from = 0;
+    let lastModel = null;
+    let tries = 0;
+    let lastError = null;
+    for (;;) {
+      if (signal?.aborted) throw signal.reason || new Error('Aborted');
+      const now = Date.now();
+      if (lastError && now - started > maxWaitMs) break;
+      const choice = choose(from, now);
+      if (!choice) {
+        // Every remaining model is cooling down (or being probed); wait for the first to reopen
+        const wait = Math.max(PROBE_POLL_MS, nextReopen(from) - now);
+        if (now + wait - started > maxWaitMs) break;
+        counters.backoff_ms += wait;
+        await sleep(wait, signal);
+        from = 0;
+        continue;
+      }
+      const { model, wait } = choice;
+      const state = states.get(model);
+      if (lastModel && model !== lastModel) { counters.fallbacks++; tries = 0; }
+      lastModel = model;
+      if (wait > 0) {
+        if (Date.now() + wait - started > maxWaitMs) break;
+        counters.throttle_ms += wait;
+      }
+      state.tokens -= 1; // reserve before sleeping so concurrent callers queue behind us
+      const probe = state.breaker === 'half_open';
+      if (probe) state.probing = true;
+      try {
+        await sleep(wait, signal);
+        await acquireSlot(signal);
+      } catch (error) {
+        if (probe) state.probing = false;
+        throw error;
+      }
+      counters.attempts++;
+      state.calls++;
+      try {
+        const result = await attempt(model);
+        recordSuccess(model);
+        counters.successes++;
+        return result;
+      } catch (error) {
+        if (!isRateLimitError(error)) { counters.failures++; throw error; }
+        lastError = error;
+        recordRateLimit(model, Date.now());
+      } finally {
+        if (probe) state.probing = false;
+        releaseSlot();
+      }
+
+      tries++;
+      if (state.breaker === 'open' || tries >= maxTries) {
+        // Move on to the next model; wrap around only once everything is cooling down
+        from = models.indexOf(model) + 1;
+        if (from >= models.length) from = 0;
+        if (tries >= maxTries && from === 0) break;
+        tries = 0;
+        continue;
+      }
+      const delay = Math.pow(2, tries - 1) * retryBaseMs + Math.random() * retryBaseMs / 2;
+      console.log(`Rate limited on ${model}, retrying in ${Math.round(delay)}ms (attempt ${tries}/${maxTries})`);
+      counters.retries++;
+      counters.backoff_ms += delay;
+      await sleep(delay, signal);
+    }
+    counters.failures++;
+    throw lastError || new Error('All AI models exhausted (429 RESOURCE_EXHAUSTED). Please try again later.');
+  }
+
+  function stats() {
+    const now = Date.now();
+    return {
+      ...counters,
+      in_flight: inFlight,
+      queued: waiters.length,
+      max_in_flight: maxInFlight,
+      models: Object.fromEntries(models.map(model => {
+        const s = states.get(model);
+        refill(s, now);
+        return [model, {
+          breaker: s.breaker === 'open' && now >= s.open_until ? 'half_open' : s.breaker,
+          open_for_ms: Math.max(0, s.open_until - now),
+          tokens: s.rate === Infinity ? null : Math.floor(s.tokens),
+          rpm: s.rate === Infinity ? null : Math.round(s.rate * 60000),
+          calls: s.calls,
+          successes: s.successes,
+          rate_limited: s.rate_limited,
+        }];
+      })),
+    };
+  }
+
+  return { call, stats };
+}
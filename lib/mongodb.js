@@ -1,15 +1,139 @@
 import { MongoClient } from 'mongodb';
+import { observeMongoCommands } from '@/lib/metrics';
 
 let cachedClient = null;
 let cachedDb = null;
+let connecting = null;
 
-export async function connectToDatabase() {
-  if (cachedDb) return cachedDb;
-  const client = new MongoClient(process.env.MONGO_URL);
+export const SESSION_TTL_SECONDS = 60 * 60 * 24 * 7;
+
+const envInt = (name) => (process.env[name] ? parseInt(process.env[name], 10) : undefined);
+
+function clientOptions() {
+  const options = {
+    maxPoolSize: envInt('MONGO_MAX_POOL_SIZE') ?? 20,
+    minPoolSize: envInt('MONGO_MIN_POOL_SIZE') ?? 0,
+    maxIdleTimeMS: envInt('MONGO_MAX_IDLE_TIME_MS'),
+    connectTimeoutMS: envInt('MONGO_CONNECT_TIMEOUT_MS') ?? 10000,
+    serverSelectionTimeoutMS: envInt('MONGO_SERVER_SELECTION_TIMEOUT_MS') ?? 10000,
+    socketTimeoutMS: envInt('MONGO_SOCKET_TIMEOUT_MS'),
+    // e.g. "zstd,snappy,zlib" — zstd and snappy need their optional packages installed
+    compressors: process.env.MONGO_COMPRESSORS || undefined,
+    // Command timings for /api/metrics; MONGO_MONITOR_COMMANDS=false turns them off
+    monitorCommands: process.env.MONGO_MONITOR_COMMANDS !== 'false',
+  };
+  return Object.fromEntries(Object.entries(options).filter(([, v]) => v !== undefined));
+}
+
+// Indexes for every hot query path. createIndex is a no-op when an identical
+// index already exists, so this is safe to run on every cold start.
+const INDEXES = {
+  decision_briefs: [
+    [{ id: 1 }, { unique: true }],
+    // Brief list keyset pagination, unfiltered, by status and by industry
+    [{ user_id: 1, updated_at: -1, id: -1 }],
+    [{ user_id: 1, status: 1, updated_at: -1, id: -1 }],
+    [{ user_id: 1, industry_context: 1, updated_at: -1, id: -1 }],
+    // Import batch status (POST /briefs/import)
+    [{ import_id: 1, import_line: 1 }, { partialFilterExpression: { import_id: { $exists: true } } }],
+  ],
+  brief_imports: [
+    [{ id: 1 }, { unique: true }],
+    [{ user_id: 1, created_at: -1 }],
+  ],
+  users: [
+    [{ email: 1 }, { unique: true }],
+    [{ id: 1 }, { unique: true }],
+  ],
+  sessions: [
+    [{ expires_at: 1 }, { expireAfterSeconds: 0 }],
+  ],
+  gemini_cache: [
+    [{ key: 1 }, { unique: true }],
+    [{ expires_at: 1 }, { expireAfterSeconds: 0 }],
+    [{ last_used_at: 1 }],
+  ],
+  // Append-only brief history (lib/brief-history.js), paged newest-first
+  brief_timeline_events: [
+    [{ id: 1 }, { unique: true }],
+    [{ brief_id: 1, timestamp: 1, id: 1 }],
+  ],
+  brief_revisions: [
+    [{ id: 1 }, { unique: true }],
+    [{ brief_id: 1, timestamp: 1, id: 1 }],
+  ],
+  brief_regeneration_diffs: [
+    [{ id: 1 }, { unique: true }],
+    [{ brief_id: 1, timestamp: 1, id: 1 }],
+    [{ brief_id: 1, section: 1, timestamp: 1, id: 1 }],
+  ],
+  generation_jobs: [
+    [{ id: 1 }, { unique: true }],
+    [{ status: 1, created_at: 1 }],
+    [{ brief_id: 1, created_at: -1 }],
+    // Per-user cap across instances (lib/jobs.js)
+    [{ user_id: 1, status: 1, started_at: 1, id: 1 }],
+  ],
+};
+
+// Unique indexes that enforce invariants rather than speed up queries. They are
+// ensured on every connect, whatever MONGO_AUTO_INDEX says, and a failure fails
+// the connect instead of letting the app run without them.
+const REQUIRED_INDEXES = {
+  sessions: [
+    [{ token: 1 }, { unique: true }],
+  ],
+  generation_jobs: [
+    // At most one queued/running job per brief (lib/jobs.js relies on the duplicate-key error)
+    [{ active_brief_id: 1 }, { unique: true, partialFilterExpression: { active_brief_id: { $exists: true } } }],
+  ],
+};
+
+async function ensureRequiredIndexes(db) {
+  await Promise.all(Object.entries(REQUIRED_INDEXES).flatMap(([name, specs]) =>
+    specs.map(([keys, options]) => db.collection(name).createIndex(keys, options))
+  ));
+}
+
+async function bootstrapIndexes(db) {
+  const tasks = Object.entries(INDEXES).flatMap(([name, specs]) =>
+    specs.map(([keys, options = {}]) => db.collection(name).createIndex(keys, options).catch(error => {
+      // A failed index (e.g. existing duplicate emails) must not take the app down
+      console.error(`Index ${name} ${JSON.stringify(keys)} not created:`, error?.message || error);
+    }))
+  );
+  // Sessions created before server-side expiry get the cookie's lifetime
+  tasks.push(db.collection('sessions').updateMany(
+    { expires_at: { $exists: false } },
+    [{ $set: { expires_at: { $add: [{ $toDate: '$created_at' }, SESSION_TTL_SECONDS * 1000] } } }]
+  ).catch(error => console.error('Session expiry backfill failed:', error?.message || error)));
+  await Promise.all(tasks);
+}
+
+async function connect() {
+  const options = clientOptions();
+  const client = new MongoClient(process.env.MONGO_URL, options);
+  if (options.monitorCommands) observeMongoCommands(client);
   await client.connect();
   const dbName = process.env.DB_NAME === 'your_database_name' ? 'regulapm_nexus' : (process.env.DB_NAME || 'regulapm_nexus');
   const db = client.db(dbName);
+  try {
+    await ensureRequiredIndexes(db);
+  } catch (error) {
+    await client.close().catch(() => {});
+    throw error;
+  }
+  if (process.env.MONGO_AUTO_INDEX !== 'false') await bootstrapIndexes(db);
   cachedClient = client;
   cachedDb = db;
   return db;
 }
+
+// Concurrent cold requests share one in-flight connect instead of each opening a client
+export async function connectToDatabase() {
+  if (cachedDb) return cachedDb;
+  if (!connecting) {
+    connecting = connect().finally(() => { connecting = null; });
+  }
+  return connecting;
+}
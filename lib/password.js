@@ -0,0 +1,118 @@
+import { Worker } from 'worker_threads';
+import { cpus } from 'os';
+import bcrypt from 'bcryptjs';
+
+// Password hashing on a small worker_threads pool so bcrypt's CPU work never
+// blocks the request event loop. If workers cannot be started, falls back to
+// bcryptjs's async API, which yields between rounds.
+export const PASSWORD_HASH_COST = parseInt(process.env.BCRYPT_COST || '10', 10);
+const POOL_SIZE = parseInt(process.env.PASSWORD_WORKERS || String(Math.max(1, Math.min(4, cpus().length - 1))), 10);
+
+const WORKER_SOURCE = `
+const { parentPort } = require('worker_threads');
+const bcrypt = require('bcryptjs');
+parentPort.on('message', ({ id, op, password, hash, cost }) => {
+  try {
+    const result = op === 'hash' ? bcrypt.hashSync(password, cost) : bcrypt.compareSync(password, hash);
+    parentPort.postMessage({ id, result });
+  } catch (error) {
+    parentPort.postMessage({ id, error: error.message });
+  }
+});
+`;
+
+const idle = [];
+const queue = [];
+const tasks = new Map(); // task id -> { resolve, reject }
+let workerCount = 0;
+let nextTaskId = 0;
+let workersUnavailable = false;
+
+function spawnWorker() {
+  const worker = new Worker(WORKER_SOURCE, { eval: true });
+  workerCount++;
+  worker.currentTask = null;
+  worker.on('message', ({ id, result, error }) => {
+    const task = tasks.get(id);
+    tasks.delete(id);
+    worker.currentTask = null;
+    if (error) task?.reject(new Error(error)); else task?.resolve(result);
+    release(worker);
+  });
+  worker.on('error', error => {
+    const task = tasks.get(worker.currentTask);
+    tasks.delete(worker.currentTask);
+    task?.reject(error);
+    // A worker that cannot load bcryptjs will never work; stop spawning more
+    if (/Cannot find module/.test(error?.message)) workersUnavailable = true;
+  });
+  worker.on('exit', () => {
+    workerCount--;
+    const i = idle.indexOf(worker);
+    if (i >= 0) idle.splice(i, 1);
+    drain();
+  });
+  return worker;
+}
+
+function release(worker) {
+  const next = queue.shift();
+  if (next) return dispatch(worker, next);
+  worker.unref();
+  idle.push(worker);
+}
+
+function dispatch(worker, { message, resolve, reject }) {
+  const id = nextTaskId++;
+  tasks.set(id, { resolve, reject });
+  worker.currentTask = id;
+  worker.ref();
+  worker.postMessage({ ...message, id });
+}
+
+function drain() {
+  if (workersUnavailable && idle.length === 0) {
+    queue.splice(0).forEach(t => t.reject(new Error('Password workers unavailable')));
+    return;
+  }
+  while (queue.length && (idle.length || workerCount < POOL_SIZE)) {
+    const worker = idle.pop() || spawnWorker();
+    dispatch(worker, queue.shift());
+  }
+}
+
+function runInPool(message) {
+  return new Promise((resolve, reject) => {
+    queue.push({ message, resolve, reject });
+    drain();
+  });
+}
+
+async function run(message, fallback) {
+  if (workersUnavailable || POOL_SIZE < 1) return fallback();
+  try {
+    return await runInPool(message);
+  } catch (error) {
+    if (!workersUnavailable) throw error;
+    console.error('Password workers unavailable, using async bcrypt:', error?.message || error);
+    return fallback();
+  }
+}
+
+export function hashPassword(password, cost = PASSWORD_HASH_COST) {
+  return run({ op: 'hash', password, cost }, () => bcrypt.hash(password, cost));
+}
+
+export function verifyPassword(password, hash) {
+  if (!hash) return Promise.resolve(false);
+  return run({ op: 'compare', password, hash }, () => bcrypt.compare(password, hash));
+}
+
+// True when a stored hash was made with a different cost than the configured one
+export function needsRehash(hash, cost = PASSWORD_HASH_COST) {
+  try { return bcrypt.getRounds(hash) !== cost; } catch { return false; }
+}
+
+export function passwordPoolStats() {
+  return { workers: workerCount, idle: idle.length, queued: queue.length, pool_size: POOL_SIZE, fallback: workersUnavailable };
+}
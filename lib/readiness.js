@@ -0,0 +1,65 @@
+// Decision readiness score, stored on each brief as `readiness` by the API and
+// aggregated by GET /api/portfolio/readiness. Pure, so the backfill script
+// (scripts/backfill-readiness.mjs) computes exactly what the API stores.
+
+// Bump when the shape or the scoring changes; stored scores with another
+// schema are recomputed (lazily on GET /briefs/:id, or by the backfill script)
+export const READINESS_SCHEMA = 1;
+
+// Stable keys for readiness penalties, so the portfolio view can group them
+export const READINESS_FACTORS = {
+  checklist_incomplete: 'Checklist incomplete',
+  high_risk_stakeholders: 'High-risk stakeholder concerns',
+  medium_risk_stakeholders: 'Medium-risk stakeholder concerns',
+  sections_at_risk: 'Sections with identified risk',
+  sections_pending_review: 'Sections pending review',
+  low_confidence_assumptions: 'Low-confidence assumptions',
+};
+// Brief fields computeReadinessScore reads
+export const READINESS_INPUTS = ['status', 'checklist', 'stakeholder_risk_levels', 'section_statuses', 'assumptions'];
+// Everything a readiness refresh reads, plus `version` so the caller can tell
+// whether its refresh was the one that landed
+export const READINESS_PROJECTION = { _id: 0, id: 1, updated_at: 1, version: 1, ...Object.fromEntries(READINESS_INPUTS.map(f => [f, 1])) };
+
+export function computeReadinessScore(brief) {
+  if (!brief || brief.status !== 'complete') return { schema: READINESS_SCHEMA, score: 0, tier: 'low', factors: [], blockers: [] };
+  const factors = [];
+  const blockers = [];
+  let score = 100;
+  const penalize = (key, penalty, label) => { score -= penalty; factors.push(label); blockers.push({ key, penalty }); };
+
+  // Checklist completion
+  if (brief.checklist) {
+    let total = 0, checked = 0;
+    Object.values(brief.checklist).forEach(items => { items.forEach(i => { total++; if (i.checked) checked++; }); });
+    const pct = total > 0 ? Math.round((checked / total) * 100) : 0;
+    if (pct < 50) penalize('checklist_incomplete', 25, `Checklist ${pct}% complete`);
+    else if (pct < 100) penalize('checklist_incomplete', 10, `Checklist ${pct}% complete`);
+  }
+
+  // Stakeholder risk levels
+  if (brief.stakeholder_risk_levels) {
+    const highCount = Object.values(brief.stakeholder_risk_levels).filter(v => v === 'high').length;
+    const medCount = Object.values(brief.stakeholder_risk_levels).filter(v => v === 'medium').length;
+    if (highCount > 0) penalize('high_risk_stakeholders', highCount * 10, `${highCount} high-risk stakeholder concern(s)`);
+    if (medCount > 0) penalize('medium_risk_stakeholders', medCount * 5, `${medCount} medium-risk stakeholder concern(s)`);
+  }
+
+  // Section statuses
+  if (brief.section_statuses) {
+    const riskCount = Object.values(brief.section_statuses).filter(v => v === 'risk_identified').length;
+    const needsReview = Object.values(brief.section_statuses).filter(v => v === 'needs_review').length;
+    if (riskCount > 0) penalize('sections_at_risk', riskCount * 8, `${riskCount} section(s) with identified risk`);
+    if (needsReview > 0) penalize('sections_pending_review', needsReview * 3, `${needsReview} section(s) pending review`);
+  }
+
+  // Unresolved assumptions
+  if (brief.assumptions?.length > 0) {
+    const lowConf = brief.assumptions.filter(a => a.confidence === 'low').length;
+    if (lowConf > 0) penalize('low_confidence_assumptions', lowConf * 5, `${lowConf} low-confidence assumption(s)`);
+  }
+
+  score = Math.max(0, Math.min(100, score));
+  const tier = score >= 75 ? 'high' : score >= 45 ? 'medium' : 'low';
+  return { schema: READINESS_SCHEMA, score, tier, factors, blockers };
+}
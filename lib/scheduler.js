@@ -0,0 +1,97 @@
+// Dependency-aware stage scheduler.
+// Each stage declares the stages it depends on; stages whose dependencies are
+// satisfied run concurrently, up to `concurrency` at a time.
+
+function validateStages(stages) {
+  const names = new Set();
+  stages.forEach(s => {
+    if (!s.name || typeof s.run !== 'function') throw new Error('Each stage needs a name and a run function');
+    if (names.has(s.name)) throw new Error(`Duplicate stage "${s.name}"`);
+    names.add(s.name);
+  });
+  stages.forEach(s => (s.deps || []).forEach(d => {
+    if (!names.has(d)) throw new Error(`Stage "${s.name}" depends on unknown stage "${d}"`);
+  }));
+  // Kahn's algorithm: every stage must be reachable without a cycle
+  const indegree = new Map(stages.map(s => [s.name, (s.deps || []).length]));
+  const queue = stages.filter(s => indegree.get(s.name) === 0).map(s => s.name);
+  let visited = 0;
+  while (queue.length) {
+    const name = queue.shift();
+    visited++;
+    stages.forEach(s => {
+      if ((s.deps || []).includes(name)) {
+        indegree.set(s.name, indegree.get(s.name) - 1);
+        if (indegree.get(s.name) === 0) queue.push(s.name);
+      }
+    });
+  }
+  if (visited !== stages.length) throw new Error('Stage graph contains a cycle');
+}
+
+// Runs `stages` ([{ name, deps, run(results) }]) and resolves with a
+// { [name]: value } map. Hooks receive a snapshot of scheduler state:
+//   onStart(name, state)            — stage was started
+//   onComplete(name, value, state)  — stage finished; newly unblocked stages
+//                                     have already been started when this fires
+// The first failing stage stops new stages from being scheduled; in-flight
+// stages and pending onComplete hooks are allowed to settle before the error
+// is rethrown, so no hook's write can land after the caller's failure handling.
+export function runStageGraph(stages, { concurrency = Infinity, onStart, onComplete, signal } = {}) {
+  validateStages(stages);
+  const limit = Math.max(1, concurrency || Infinity);
+  const results = {};
+  const done = new Set();
+  const running = new Set();
+  const pending = [...stages];
+  let completing = 0; // onComplete hooks still in flight
+  let failed = null;
+
+  const snapshot = () => ({ running: [...running], completed: [...done], pending: pending.map(s => s.name) });
+
+  return new Promise((resolve, reject) => {
+    function finish() {
+      if (running.size > 0 || completing > 0) return;
+      if (failed) reject(failed);
+      else if (pending.length === 0) resolve(results);
+    }
+
+    function launchReady() {
+      if (failed) return [];
+      if (signal?.aborted) { failed = signal.reason || new Error('Pipeline cancelled'); return []; }
+      const started = [];
+      for (let i = 0; i < pending.length && running.size < limit; i++) {
+        const stage = pending[i];
+        if (!(stage.deps || []).every(d => done.has(d))) continue;
+        pending.splice(i--, 1);
+        running.add(stage.name);
+        started.push(stage);
+      }
+      started.forEach(stage => {
+        Promise.resolve()
+          .then(() => onStart?.(stage.name, snapshot()))
+          .then(() => stage.run(results))
+          .then(async value => {
+            results[stage.name] = value;
+            running.delete(stage.name);
+            done.add(stage.name);
+            completing++;
+            try {
+              launchReady();
+              await onComplete?.(stage.name, value, snapshot());
+            } finally {
+              completing--;
+            }
+          })
+          .catch(error => {
+            running.delete(stage.name);
+            if (!failed) failed = error;
+          })
+          .finally(finish);
+      });
+      return started;
+    }
+
+    if (launchReady().length === 0) finish();
+  });
+}
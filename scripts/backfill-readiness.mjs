@@ -0,0 +1,56 @@
+#!/usr/bin/env node
+// One-off backfill: stores `readiness` on briefs that have none, or one
+// computed under an older READINESS_SCHEMA, so GET /api/portfolio/readiness
+// can serve every brief from its aggregation alone.
+//
+//   MONGO_URL=... DB_NAME=... node scripts/backfill-readiness.mjs [--dry-run] [--batch 500]
+//
+// Safe to re-run and to run against a live app: each write is conditional on
+// the brief's updated_at, so a brief edited meanwhile keeps the score its own
+// write stored, and it bumps version like the API does.
+import { MongoClient } from 'mongodb';
+import { READINESS_SCHEMA, READINESS_PROJECTION, computeReadinessScore } from '../lib/readiness.js';
+
+const args = Object.fromEntries(process.argv.slice(2).reduce((acc, a, i, all) => {
+  if (a.startsWith('--')) acc.push([a.slice(2), all[i + 1]?.startsWith('--') || all[i + 1] === undefined ? true : all[i + 1]]);
+  return acc;
+}, []));
+const DRY_RUN = Boolean(args['dry-run']);
+const BATCH = parseInt(args.batch || '500', 10);
+
+async function main() {
+  const client = new MongoClient(process.env.MONGO_URL);
+  await client.connect();
+  const dbName = process.env.DB_NAME === 'your_database_name' ? 'regulapm_nexus' : (process.env.DB_NAME || 'regulapm_nexus');
+  const briefs = client.db(dbName).collection('decision_briefs');
+
+  const totals = { scanned: 0, updated: 0, skipped: 0 };
+  const cursor = briefs.find({ 'readiness.schema': { $ne: READINESS_SCHEMA } }, { projection: READINESS_PROJECTION }).batchSize(BATCH);
+  let ops = [];
+  const flush = async () => {
+    if (!ops.length || DRY_RUN) { ops = []; return; }
+    const { modifiedCount } = await briefs.bulkWrite(ops, { ordered: false });
+    totals.updated += modifiedCount;
+    totals.skipped += ops.length - modifiedCount;
+    ops = [];
+  };
+  for await (const brief of cursor) {
+    totals.scanned++;
+    ops.push({
+      updateOne: {
+        filter: { id: brief.id, updated_at: brief.updated_at },
+        update: { $set: { readiness: computeReadinessScore(brief) }, $inc: { version: 1 } },
+      },
+    });
+    if (ops.length >= BATCH) await flush();
+  }
+  await flush();
+
+  console.log(`${DRY_RUN ? '[dry run] ' : ''}Scanned ${totals.scanned} briefs without a schema ${READINESS_SCHEMA} score: ${totals.updated} updated, ${totals.skipped} changed meanwhile and left to their own write`);
+  await client.close();
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,108 @@
+#!/usr/bin/env node
+// Login micro-benchmark: bcrypt verification latency and event-loop lag under
+// concurrent logins.
+//
+//   node scripts/bench-password.mjs [--logins 200] [--concurrency 25] [--cost 10]
+//       In-process: compares inline bcrypt.compareSync (the old login path)
+//       against the worker pool in lib/password.js.
+//   node scripts/bench-password.mjs --url http://localhost:3000/api [--logins 200] [--concurrency 25]
+//       Against a running server: login p50/p95/p99, with the health endpoint
+//       latency sampled alongside as a proxy for server event-loop lag.
+import { monitorEventLoopDelay, performance } from 'perf_hooks';
+import bcrypt from 'bcryptjs';
+import { hashPassword, verifyPassword } from '../lib/password.js';
+
+const args = Object.fromEntries(process.argv.slice(2).reduce((acc, a, i, all) => {
+  if (a.startsWith('--')) acc.push([a.slice(2), all[i + 1]?.startsWith('--') ? true : all[i + 1]]);
+  return acc;
+}, []));
+const LOGINS = parseInt(args.logins || '200', 10);
+const CONCURRENCY = parseInt(args.concurrency || '25', 10);
+const COST = parseInt(args.cost || process.env.BCRYPT_COST || '10', 10);
+
+function percentile(values, p) {
+  if (values.length === 0) return 0;
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+function summarize(label, latencies, extra = {}) {
+  const fmt = v => `${v.toFixed(1)}ms`;
+  console.log(`${label.padEnd(14)} p50 ${fmt(percentile(latencies, 50))}  p95 ${fmt(percentile(latencies, 95))}  p99 ${fmt(percentile(latencies, 99))}  max ${fmt(Math.max(...latencies))}`
+    + Object.entries(extra).map(([k, v]) => `  ${k} ${typeof v === 'number' ? fmt(v) : v}`).join(''));
+}
+
+// Runs `task` LOGINS times with CONCURRENCY in flight; returns per-call latencies
+async function drive(task) {
+  const latencies = [];
+  let next = 0;
+  async function lane() {
+    while (next < LOGINS) {
+      const i = next++;
+      // Each login arrives as its own macrotask, like separate HTTP requests
+      await new Promise(r => setImmediate(r));
+      const start = performance.now();
+      await task(i);
+      latencies.push(performance.now() - start);
+    }
+  }
+  await Promise.all(Array.from({ length: CONCURRENCY }, lane));
+  return latencies;
+}
+
+async function withLoopMonitor(fn) {
+  const histogram = monitorEventLoopDelay({ resolution: 5 });
+  histogram.enable();
+  const result = await fn();
+  histogram.disable();
+  return { result, lagP99: histogram.percentile(99) / 1e6, lagMax: histogram.max / 1e6 };
+}
+
+async function benchInProcess() {
+  console.log(`In-process: ${LOGINS} logins, concurrency ${CONCURRENCY}, cost ${COST}\n`);
+  const hash = await hashPassword('correct horse battery staple', COST);
+
+  const sync = await withLoopMonitor(() => drive(async () => { bcrypt.compareSync('correct horse battery staple', hash); }));
+  summarize('sync', sync.result, { 'loop-lag p99': sync.lagP99, 'loop-lag max': sync.lagMax });
+
+  const pooled = await withLoopMonitor(() => drive(() => verifyPassword('correct horse battery staple', hash)));
+  summarize('worker pool', pooled.result, { 'loop-lag p99': pooled.lagP99, 'loop-lag max': pooled.lagMax });
+}
+
+async function benchHttp(baseUrl) {
+  console.log(`HTTP ${baseUrl}: ${LOGINS} logins, concurrency ${CONCURRENCY}\n`);
+  const accounts = await Promise.all(Array.from({ length: Math.min(CONCURRENCY, 20) }, async (_, i) => {
+    const account = { email: `bench_${Date.now()}_${i}@regulapm.io`, password: 'benchpass123' };
+    const res = await fetch(`${baseUrl}/auth/signup`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(account) });
+    if (!res.ok) throw new Error(`Signup failed: ${res.status}`);
+    return account;
+  }));
+
+  const healthLatencies = [];
+  let probing = true;
+  const probe = (async () => {
+    while (probing) {
+      const start = performance.now();
+      await fetch(`${baseUrl}/`).catch(() => {});
+      healthLatencies.push(performance.now() - start);
+      await new Promise(r => setTimeout(r, 20));
+    }
+  })();
+
+  let failures = 0;
+  const logins = await drive(async i => {
+    const res = await fetch(`${baseUrl}/auth/login`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(accounts[i % accounts.length]) });
+    if (!res.ok) failures++;
+    await res.arrayBuffer();
+  });
+  probing = false;
+  await probe;
+
+  summarize('login', logins, { errors: String(failures) });
+  summarize('health probe', healthLatencies);
+}
+
+(args.url ? benchHttp(args.url.replace(/\/$/, '')) : benchInProcess()).catch(error => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,106 @@
+#!/usr/bin/env node
+// One-off migration: copies embedded brief history into the append-only
+// collections used by lib/brief-history.js and trims the brief documents.
+//
+//   MONGO_URL=... DB_NAME=... node scripts/migrate-brief-history.mjs [--dry-run] [--tail 20] [--batch 100]
+//
+// Safe to re-run: records are upserted by id (legacy entries without one get a
+// deterministic id), and tails are trimmed with $push/$slice so writes that
+// land while the migration runs are kept.
+import { MongoClient } from 'mongodb';
+
+const args = Object.fromEntries(process.argv.slice(2).reduce((acc, a, i, all) => {
+  if (a.startsWith('--')) acc.push([a.slice(2), all[i + 1]?.startsWith('--') || all[i + 1] === undefined ? true : all[i + 1]]);
+  return acc;
+}, []));
+const DRY_RUN = Boolean(args['dry-run']);
+const TAIL = parseInt(args.tail || process.env.BRIEF_HISTORY_TAIL || '20', 10);
+const BATCH = parseInt(args.batch || '100', 10);
+
+const COLLECTIONS = {
+  timeline_events: 'brief_timeline_events',
+  revisions: 'brief_revisions',
+  regeneration_diffs: 'brief_regeneration_diffs',
+};
+
+function upserts(records) {
+  return records.map(doc => ({ updateOne: { filter: { id: doc.id }, update: { $setOnInsert: doc }, upsert: true } }));
+}
+
+function historyRecords(brief, kind) {
+  return (brief[kind] || []).map((entry, i) => ({
+    ...entry,
+    id: entry.id || `${brief.id}:${kind}:${i}`,
+    timestamp: entry.timestamp || brief.created_at || new Date(0).toISOString(),
+    brief_id: brief.id,
+  }));
+}
+
+// Embedded diffs that still carry full text -> collection records + references
+function diffRecords(brief) {
+  return Object.entries(brief.regeneration_diffs || {})
+    .filter(([, diff]) => diff && ('old_content' in diff || 'new_content' in diff))
+    .map(([section, diff]) => ({
+      id: `${brief.id}:diff:${section}:${diff.timestamp}`,
+      brief_id: brief.id,
+      section,
+      old_content: diff.old_content ?? '',
+      new_content: diff.new_content ?? '',
+      timestamp: diff.timestamp,
+    }));
+}
+
+async function main() {
+  const client = new MongoClient(process.env.MONGO_URL);
+  await client.connect();
+  const dbName = process.env.DB_NAME === 'your_database_name' ? 'regulapm_nexus' : (process.env.DB_NAME || 'regulapm_nexus');
+  const db = client.db(dbName);
+  if (!DRY_RUN) {
+    await Promise.all(Object.values(COLLECTIONS).flatMap(name => [
+      db.collection(name).createIndex({ id: 1 }, { unique: true }),
+      db.collection(name).createIndex({ brief_id: 1, timestamp: 1, id: 1 }),
+    ]));
+  }
+
+  const totals = { briefs: 0, timeline_events: 0, revisions: 0, regeneration_diffs: 0, trimmed: 0 };
+  const cursor = db.collection('decision_briefs')
+    .find({}, { projection: { _id: 0, id: 1, created_at: 1, timeline_events: 1, revisions: 1, regeneration_diffs: 1 } })
+    .batchSize(BATCH);
+
+  for await (const brief of cursor) {
+    totals.briefs++;
+    const timeline = historyRecords(brief, 'timeline_events');
+    const revisions = historyRecords(brief, 'revisions');
+    const diffs = diffRecords(brief);
+    totals.timeline_events += timeline.length;
+    totals.revisions += revisions.length;
+    totals.regeneration_diffs += diffs.length;
+    const oversized = timeline.length > TAIL || revisions.length > TAIL;
+    if (oversized) totals.trimmed++;
+    if (DRY_RUN) continue;
+
+    if (timeline.length) await db.collection(COLLECTIONS.timeline_events).bulkWrite(upserts(timeline), { ordered: false });
+    if (revisions.length) await db.collection(COLLECTIONS.revisions).bulkWrite(upserts(revisions), { ordered: false });
+    if (diffs.length) await db.collection(COLLECTIONS.regeneration_diffs).bulkWrite(upserts(diffs), { ordered: false });
+
+    const update = {};
+    if (oversized) {
+      update.$push = {
+        timeline_events: { $each: [], $slice: -TAIL },
+        revisions: { $each: [], $slice: -TAIL },
+      };
+    }
+    if (diffs.length) {
+      update.$set = Object.fromEntries(diffs.map(d => [`regeneration_diffs.${d.section}`, { id: d.id, timestamp: d.timestamp }]));
+    }
+    if (Object.keys(update).length) await db.collection('decision_briefs').updateOne({ id: brief.id }, { ...update, $inc: { version: 1 } });
+  }
+
+  console.log(`${DRY_RUN ? '[dry run] ' : ''}Scanned ${totals.briefs} briefs: ${totals.timeline_events} timeline events, ${totals.revisions} revisions, ${totals.regeneration_diffs} diffs copied; ${totals.trimmed} briefs trimmed to the last ${TAIL} entries`);
+  await client.close();
+}
+
+main().catch(error => {
+  console.error(error);
+  process.exit(1);
+});